@@ -1,49 +1,41 @@
 import os
-import json
-import google.generativeai as genai
-import streamlit as st
+from ai.config import DEFAULT_MODEL, get_model
+from ai.jsonrepair import JSONRepairError, describe, parse_json
+from ai.tokens import TokenBudgetError, compact_template, preflight, settle
 
 
 class BaseAgent:
-    def __init__(self, model_name="gemini-2.5-flash"):
+    def __init__(self, model_name=DEFAULT_MODEL, temperature=None):
+        self.model_name = model_name
+        self.temperature = temperature
 
-        api_key = st.secrets["API_KEY"]
-        genai.configure(api_key=api_key)
-        self.model = genai.GenerativeModel(model_name)
+    @property
+    def model(self):
+        # Created on the first call, so building the agent team costs nothing
+        return get_model(self.model_name, self.temperature)
 
     def call_ai(self, system_instruction, user_prompt):
-        full_prompt = f"""
-        SYSTEM INSTRUCTION:
-        {system_instruction}
-
-        USER REQUEST:
-        {user_prompt}
-
-        Return ONLY valid JSON.
-        """
+        # Only the static instructions are compacted; the request carries user text and code verbatim
+        full_prompt = (f"SYSTEM INSTRUCTION:\n{compact_template(system_instruction)}\n\n"
+                       f"USER REQUEST:\n{user_prompt}\n\nReturn ONLY valid JSON.")
+        agent = type(self).__name__
         try:
-            response = self.model.generate_content(full_prompt)
+            prompt, estimate = preflight(agent, full_prompt, self.model_name)
+            response = self.model.generate_content(prompt)
+            settle(agent, prompt, estimate, response, model=self.model_name)
             return self._clean_json(response.text)
+        except TokenBudgetError:
+            raise
         except Exception as e:
             print(f"AI Error: {e}")
             return {}
 
     def _clean_json(self, text):
-        text = text.strip()
-        if text.startswith("```json"):
-            text = text.replace("```json", "").replace("```", "")
-        elif text.startswith("```"):
-            text = text.replace("```", "")
-
         try:
-            return json.loads(text)
-        except:
-            # Simple manual extraction if JSON is messy
-            start = text.find("{")
-            end = text.rfind("}") + 1
-            if start != -1 and end != -1:
-                try:
-                    return json.loads(text[start:end])
-                except:
-                    pass
-            return {}
\ No newline at end of file
+            data, diagnostics = parse_json(text)
+        except JSONRepairError as e:
+            print(f"AI Error: {e} ({describe(e.diagnostics)})")
+            return {}
+        if not diagnostics["fast_path"]:
+            print(f"{type(self).__name__}: {describe(diagnostics)}")
+        return data
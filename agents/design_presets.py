@@ -0,0 +1,206 @@
+# agents/design_presets.py
+# Curated design systems the Designer agent would otherwise regenerate on every
+# project, plus a local keyword matcher from the ProductManager plan to a preset.
+
+import copy
+import re
+
+PRESETS_VERSION = "1.0.0"
+
+# A match needs at least this score and must beat the runner-up by this margin
+MIN_SCORE = 2
+MIN_MARGIN = 1
+
+# Prompts that ask for specific colors/branding go to the LLM Designer
+CUSTOM_HINTS = re.compile(
+    r"#[0-9a-f]{3,6}\b|\b(custom|brand(ing)?|palette|colou?r scheme|unique (look|style|design)|"
+    r"red|blue|green|orange|pink|purple|yellow|teal|gold|beige|pastel|brown|violet|cyan|magenta)\b",
+    re.I,
+)
+
+
+def _css(p, t, extra=""):
+    """Global CSS shared by every preset, filled from its palette (p) and typography (t)."""
+    return f"""
+:root {{
+  --primary: {p['primary']}; --secondary: {p['secondary']}; --bg: {p['background']};
+  --surface: {p['surface']}; --error: {p['error']}; --success: {p['success']};
+  --text: {p['text']}; --muted: {p['muted']}; --radius: {t['radius']};
+}}
+* {{ box-sizing: border-box; }}
+body {{ margin: 0; background: var(--bg); color: var(--text); font-family: {t['font_family']}; line-height: 1.6; }}
+h1, h2, h3 {{ font-family: {t['headings']}; line-height: 1.2; }}
+.btn {{ display: inline-flex; align-items: center; gap: .5rem; padding: .65rem 1.2rem; border: none; border-radius: var(--radius);
+  background: var(--primary); color: var(--bg); font-weight: 700; cursor: pointer; transition: transform .15s ease, box-shadow .15s ease; }}
+.btn:hover {{ transform: translateY(-2px); }}
+.card {{ background: var(--surface); border-radius: var(--radius); padding: 1.25rem; }}
+input, select, textarea {{ width: 100%; padding: .6rem .8rem; border-radius: var(--radius); border: 1px solid var(--muted);
+  background: var(--surface); color: var(--text); font: inherit; }}
+input:focus, select:focus, textarea:focus {{ outline: 2px solid var(--primary); outline-offset: 1px; }}
+.loader {{ width: 36px; height: 36px; border: 3px solid var(--muted); border-top-color: var(--primary); border-radius: 50%;
+  animation: spin .8s linear infinite; }}
+.skeleton {{ background: linear-gradient(90deg, var(--surface), var(--muted), var(--surface)); background-size: 200% 100%;
+  animation: shimmer 1.2s infinite; border-radius: var(--radius); min-height: 1rem; }}
+.empty-state {{ text-align: center; padding: 3rem 1rem; color: var(--muted); border: 2px dashed var(--muted); border-radius: var(--radius); }}
+.toast {{ position: fixed; right: 1rem; bottom: 1rem; padding: .8rem 1.1rem; border-radius: var(--radius); color: #fff;
+  animation: slide-up .25s ease; }}
+.toast.success {{ background: var(--success); }}
+.toast.error {{ background: var(--error); }}
+.fade-in {{ animation: fade-in .3s ease both; }}
+@keyframes spin {{ to {{ transform: rotate(360deg); }} }}
+@keyframes shimmer {{ to {{ background-position: -200% 0; }} }}
+@keyframes fade-in {{ from {{ opacity: 0; }} to {{ opacity: 1; }} }}
+@keyframes slide-up {{ from {{ opacity: 0; transform: translateY(12px); }} to {{ opacity: 1; transform: none; }} }}
+{extra}""".strip()
+
+
+# Every color the Designer's palette contract has; the skeletons and Developer rely on all of them
+PALETTE_KEYS = ("primary", "secondary", "background", "surface", "error", "success", "text", "muted")
+
+
+def _preset(ui_style, palette, typography, components, animations, keywords, extra_css=""):
+    design = {
+        "color_palette": {k: palette[k] for k in PALETTE_KEYS},
+        "typography": {"font_family": typography["font_family"], "headings": typography["headings"]},
+        "ui_style": ui_style,
+        "animations": animations,
+        "components": components,
+        "css_rules": _css(palette, typography, extra_css),
+    }
+    return {"design": design, "keywords": keywords}
+
+
+PRESETS = {
+    "cyberpunk": _preset(
+        "Cyberpunk",
+        {"primary": "#00f3ff", "secondary": "#bc13fe", "background": "#0a0a12", "surface": "#141425",
+         "error": "#ff3860", "success": "#00ff99", "text": "#e0e6ff", "muted": "#3a3a5c"},
+        {"font_family": "'Rajdhani', 'Segoe UI', sans-serif", "headings": "'Orbitron', sans-serif", "radius": "4px"},
+        {"button": "Neon cyan fill, uppercase, glowing box-shadow on hover",
+         "card": "Dark surface, 1px neon border, subtle inner glow",
+         "input": "Dark field, neon focus ring",
+         "loader": "Spinning ring with neon top border"},
+        ["fade-in", "slide-up", "glow-effect", "spin"],
+        {"cyberpunk": 4, "neon": 3, "futuristic": 3, "sci-fi": 3, "hacker": 3, "gaming": 2, "game": 1,
+         "crypto": 2, "music": 1, "esports": 2, "synthwave": 3, "retro": 1},
+        ".btn { text-transform: uppercase; letter-spacing: .08em; box-shadow: 0 0 12px var(--primary); }\n"
+        ".card { border: 1px solid var(--primary); box-shadow: inset 0 0 18px rgba(0,243,255,.08); }\n"
+        ".glow-effect { text-shadow: 0 0 8px var(--primary), 0 0 16px var(--secondary); }",
+    ),
+    "glassmorphism": _preset(
+        "Glassmorphism",
+        {"primary": "#7c5cff", "secondary": "#00d4ff", "background": "#0f1226", "surface": "rgba(255,255,255,0.08)",
+         "error": "#ff5c7a", "success": "#2ee59d", "text": "#f2f4ff", "muted": "rgba(255,255,255,0.2)"},
+        {"font_family": "'Inter', 'Segoe UI', sans-serif", "headings": "'Poppins', sans-serif", "radius": "16px"},
+        {"button": "Gradient primary→secondary, pill radius, soft glow",
+         "card": "Frosted translucent panel with backdrop blur and light border",
+         "input": "Translucent field with blur, bright focus ring",
+         "loader": "Gradient ring spinner"},
+        ["fade-in", "slide-up", "glow-effect", "spin"],
+        {"glassmorphism": 4, "glass": 3, "frosted": 3, "modern": 1, "sleek": 1, "dark mode": 1, "dark": 1,
+         "todo": 1, "to-do": 1, "task": 1, "tasks": 1, "notes": 1, "habit": 1, "productivity": 1, "planner": 1,
+         "tracker": 1, "kanban": 1},
+        "body { background: radial-gradient(circle at 20% 20%, #2a1f6e, var(--bg) 60%); min-height: 100vh; }\n"
+        ".card { backdrop-filter: blur(14px); border: 1px solid rgba(255,255,255,.15); }\n"
+        ".btn { background: linear-gradient(135deg, var(--primary), var(--secondary)); color: #fff; border-radius: 999px; }",
+    ),
+    "minimalist": _preset(
+        "Minimalist",
+        {"primary": "#111111", "secondary": "#6b7280", "background": "#fafafa", "surface": "#ffffff",
+         "error": "#dc2626", "success": "#16a34a", "text": "#111111", "muted": "#e5e7eb"},
+        {"font_family": "'Inter', system-ui, sans-serif", "headings": "'Inter', system-ui, sans-serif", "radius": "8px"},
+        {"button": "Solid black, white text, no shadow, underline-free",
+         "card": "White surface, hairline border, generous padding",
+         "input": "Hairline border, dark focus outline",
+         "loader": "Thin grey ring spinner"},
+        ["fade-in", "slide-up", "spin"],
+        {"minimalist": 4, "minimal": 3, "clean": 2, "simple": 1, "light": 1, "white": 1, "portfolio": 2,
+         "blog": 2, "resume": 2, "cv": 1, "recipe": 1, "journal": 1, "writing": 1, "docs": 1, "landing": 1},
+        ".btn { color: #fff; }\n.card { border: 1px solid var(--muted); }",
+    ),
+    "corporate": _preset(
+        "Corporate",
+        {"primary": "#2563eb", "secondary": "#0ea5e9", "background": "#0b1220", "surface": "#111a2e",
+         "error": "#ef4444", "success": "#22c55e", "text": "#e2e8f0", "muted": "#334155"},
+        {"font_family": "'Inter', 'Segoe UI', sans-serif", "headings": "'Inter', 'Segoe UI', sans-serif", "radius": "10px"},
+        {"button": "Solid blue, medium weight, subtle shadow",
+         "card": "Dark slate panel, rounded, soft shadow, data-dense",
+         "input": "Slate field, blue focus ring",
+         "loader": "Blue ring spinner and table skeleton rows"},
+        ["fade-in", "slide-up", "spin"],
+        {"corporate": 4, "professional": 3, "business": 2, "enterprise": 3, "dashboard": 2, "analytics": 2,
+         "finance": 2, "financial": 2, "budget": 2, "expense": 2, "invoice": 2, "crm": 2, "inventory": 2,
+         "admin": 2, "sales": 1, "report": 1, "stock": 1, "accounting": 2},
+        ".btn { color: #fff; box-shadow: 0 4px 14px rgba(37,99,235,.25); }\n"
+        ".card { box-shadow: 0 8px 24px rgba(0,0,0,.25); }\n"
+        "table { width: 100%; border-collapse: collapse; } th, td { padding: .6rem; border-bottom: 1px solid var(--muted); text-align: left; }",
+    ),
+    "playful": _preset(
+        "Playful",
+        {"primary": "#ff6b6b", "secondary": "#ffd93d", "background": "#1b1036", "surface": "#2a1b52",
+         "error": "#ff4d6d", "success": "#6bcb77", "text": "#fff7e6", "muted": "#4b3a7a"},
+        {"font_family": "'Nunito', 'Segoe UI', sans-serif", "headings": "'Fredoka', 'Nunito', sans-serif", "radius": "20px"},
+        {"button": "Bright coral, chunky rounded, bouncy hover",
+         "card": "Rounded colorful panel with playful shadow offset",
+         "input": "Rounded thick-border field",
+         "loader": "Bouncing dots"},
+        ["fade-in", "slide-up", "bounce", "spin"],
+        {"playful": 4, "fun": 3, "colorful": 3, "kids": 3, "children": 3, "quiz": 2, "trivia": 2, "party": 2,
+         "pet": 1, "pets": 1, "flashcard": 2, "flashcards": 2, "learning": 1, "school": 1, "memory game": 2},
+        ".btn:hover { animation: bounce .4s; }\n.card { box-shadow: 6px 6px 0 var(--secondary); }\n"
+        "@keyframes bounce { 50% { transform: translateY(-4px) scale(1.04); } }",
+    ),
+}
+
+
+def _plan_text(plan, prompt=""):
+    parts = [prompt or ""]
+    if isinstance(plan, dict):
+        parts.append(str(plan.get("project_name", "")))
+        parts.extend(str(f) for f in plan.get("features", []) or [])
+        for page in plan.get("pages", []) or []:
+            if isinstance(page, dict):
+                parts.append(str(page.get("description", "")))
+    else:
+        parts.append(str(plan))
+    return " ".join(parts).lower()
+
+
+def wants_custom_design(prompt):
+    return bool(prompt and CUSTOM_HINTS.search(prompt))
+
+
+def score_presets(plan, prompt=""):
+    """{preset: score} from weighted keyword hits in the prompt and plan."""
+    text = _plan_text(plan, prompt)
+    scores = {}
+    for name, preset in PRESETS.items():
+        score = 0
+        for keyword, weight in preset["keywords"].items():
+            if re.search(rf"\b{re.escape(keyword)}\b", text):
+                score += weight
+        scores[name] = score
+    return scores
+
+
+def match_preset(plan, prompt=""):
+    """
+    Returns (preset_name, score) for a confident match, or (None, best_score) when the
+    LLM Designer should run (no clear winner or the user asked for specific styling).
+    """
+    if wants_custom_design(prompt):
+        return None, 0
+    scores = score_presets(plan, prompt)
+    ranked = sorted(scores.items(), key=lambda kv: kv[1], reverse=True)
+    (best, best_score), (_, runner_up) = ranked[0], ranked[1]
+    if best_score >= MIN_SCORE and best_score - runner_up >= MIN_MARGIN:
+        return best, best_score
+    return None, best_score
+
+
+def get_preset(name):
+    """A fresh copy of a preset's design system, tagged with its name and library version."""
+    design = copy.deepcopy(PRESETS[name]["design"])
+    design["preset"] = name
+    design["preset_version"] = PRESETS_VERSION
+    return design
@@ -1,8 +1,16 @@
 from .base_agent import BaseAgent
+from .design_presets import get_preset, match_preset
+from ai.compact import PLAN_FIELDS_FOR_DESIGN, handoff
 
 
 class Designer(BaseAgent):
-    def create_design_system(self, project_plan):
+    def create_design_system(self, project_plan, user_prompt="", use_presets=True):
+        # Most projects land on one of a few styles; use the curated preset when it clearly fits
+        if use_presets:
+            preset, _ = match_preset(project_plan, user_prompt)
+            if preset:
+                return get_preset(preset)
+
         system = """
         You are a Senior UI/UX Designer. 
         Create a high-end, modern design system based on the project plan.
@@ -22,7 +30,9 @@ class Designer(BaseAgent):
                 "background": "#hex", 
                 "surface": "#hex", 
                 "error": "#hex",
-                "success": "#hex"
+                "success": "#hex",
+                "text": "#hex (readable on background)",
+                "muted": "#hex"
             },
             "typography": {"font_family": "String", "headings": "String"},
             "ui_style": "String (e.g., Cyberpunk, Minimalist, Glassmorphism)",
@@ -36,4 +46,4 @@ class Designer(BaseAgent):
             "css_rules": "String (Critical global CSS to enforce this look, including keyframes)"
         }
         """
-        return self.call_ai(system, str(project_plan))
+        return self.call_ai(system, handoff("Project Plan", project_plan, PLAN_FIELDS_FOR_DESIGN))
@@ -1,27 +1,40 @@
 from .base_agent import BaseAgent
+from .templates import EDITABLE_FILES, apply_differential, match_archetype, template_brief
+from ai.compact import DESIGN_FIELDS_FOR_CODE, handoff
+from ai.datalayer import DATA_LAYER_API, strip_data_layer
 import json
 
 
 class Developer(BaseAgent):
-    def write_code(self, project_plan, design_system):
+    last_template = None  # archetype of the skeleton the last project was built on
+
+    def write_code(self, project_plan, design_system, use_templates=True, user_prompt=""):
+        # Common archetypes start from a tested skeleton; the model only writes the differences
+        self.last_template = None
+        if use_templates:
+            archetype, _ = match_archetype(project_plan, user_prompt)
+            if archetype:
+                self.last_template = archetype
+                return self._write_from_template(archetype, project_plan, design_system)
+
         system = f"""
         You are a Senior Full-Stack Developer.
         Write the COMPLETE code for the website based on the Plan and Design.
 
         ARCHITECTURE RULES:
         - **Client-Side Logic Only**: There is NO external Python backend.
-        - **Data Persistence**: You MUST implement a custom "backend" in JavaScript using `localStorage`.
-        - **CRUD Operations**: Implement functions to Create, Read, Update, and Delete data directly in the browser.
+        - **Data Persistence**: Use the provided `NexaData` library (IndexedDB/localStorage with an in-memory cache).
+        - **CRUD Operations**: Create, Read, Update, and Delete data through `NexaData` collections.
         - **No External API Calls**: Do NOT fetch from `/api/` or `http://localhost`. All logic must run in the browser.
 
+        DATA LAYER API:
+        {DATA_LAYER_API}
         IMPLEMENTATION DETAILS:
-        - Create a helper class or functions (e.g., `DataManager`) to handle `localStorage`.
-        - Example: `saveTask(task) {{ let tasks = JSON.parse(localStorage.getItem('tasks')||'[]'); tasks.push(task); localStorage.setItem('tasks', JSON.stringify(tasks)); }}`
-        - Ensure the UI updates immediately after data changes.
+        - Start the app inside an async init function that awaits `NexaData.open(...)` before the first render.
+        - Ensure the UI updates immediately after data changes (use `subscribe`).
 
         DESIGN RULES:
-        - Colors: {json.dumps(design_system.get('color_palette'))}
-        - Style: {design_system.get('ui_style')}
+        - Follow the Design System in the request exactly (palette, typography, ui_style, css_rules).
         - CSS: Use the `styles.css` file for all custom styling.
 
         OUTPUT FORMAT:
@@ -30,26 +43,56 @@ class Developer(BaseAgent):
         {{
             "index.html": "...",
             "styles.css": "...",
-            "script.js": "// Contains all logic and localStorage handling\\n..."
+            "script.js": "// App logic built on NexaData\\n..."
         }}
         """
 
         prompt = f"""
-        Project Plan: {json.dumps(project_plan)}
-        Design System: {json.dumps(design_system)}
+        {handoff("Project Plan", project_plan)}
+        {handoff("Design System", design_system, DESIGN_FIELDS_FOR_CODE)}
 
-        Generate the files. Build a fully functional, data-driven application using Client-Side Storage.
+        Generate the files. Build a fully functional, data-driven application on the NexaData API.
         """
         return self.call_ai(system, prompt)
 
-    def modify_code(self, user_msg, current_files):
-        system = """
+    def _write_from_template(self, archetype, project_plan, design_system):
+        editable = ", ".join(f'"{name}"' for name in EDITABLE_FILES)
+        system = f"""
+        You are a Senior Front-End Developer extending a tested project skeleton.
+        The skeleton (index.html, app.js, styles.css) is ALREADY WRITTEN and will be shipped as-is.
+        {template_brief(archetype)}
+        YOUR JOB:
+        - Implement ONLY the plan features the skeleton does not already cover.
+        - Put new logic in `features.js` (wrap it in `App.ready.then(app => {{ ... }})`) and new styles in `features.css`.
+        - Prefer `config` overrides (fields, labels, categories, seed data) over new code.
+        - Extra UI goes inside `#feature-root`. Never rewrite index.html, app.js or styles.css.
+        - Use `App` collections for data; if you need another collection, open it with
+          `NexaData.open(App.config.appId + "-extra", {{ ... }})`.
+
+        OUTPUT FORMAT:
+        Return a JSON object with only what you add: any of "config", {editable}
+        and new files. Return {{}} if the skeleton already covers the plan.
+        """
+
+        prompt = f"""
+        {handoff("Project Plan", project_plan)}
+        UI Style: {design_system.get('ui_style')}
+        """
+        diff = self.call_ai(system, prompt)
+        return apply_differential(archetype, project_plan, design_system, diff)
+
+    def modify_code(self, user_msg, current_files, edit_history=""):
+        """`edit_history` is EditMemory.as_prompt(): what earlier edits asked for and changed."""
+        system = f"""
         You are a Senior Developer. Update the code based on the request.
-        Maintain the Client-Side architecture (LocalStorage).
+        Maintain the Client-Side architecture: persist data only through the provided NexaData library.
         Do NOT add external API calls.
+        Keep the results of earlier edits unless the request says otherwise.
+        {DATA_LAYER_API}
         """
+        history = f"Edit History:\n{edit_history}\n" if edit_history else ""
         prompt = f"""
-        Request: {user_msg}
-        Current Files: {json.dumps(current_files)}
+        {history}Request: {user_msg}
+        Current Files: {json.dumps(strip_data_layer(current_files), sort_keys=True, separators=(",", ":"))}
         """
         return self.call_ai(system, prompt)
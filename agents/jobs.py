@@ -0,0 +1,357 @@
+# agents/jobs.py
+# Job queue and workers behind the headless API (server.py). A job is a JSON
+# record: what to run, its progress events, and its result. Workers hold no
+# state of their own, so any number of them -- threads or separate processes
+# sharing a DirectoryQueue -- can drain the same queue.
+
+import json
+import os
+import threading
+import time
+import uuid
+
+from .status import CallbackReporter
+
+JOB_KINDS = ("create", "edit", "optimize", "repair")
+TERMINAL = ("done", "failed")
+# Shared directory for multi-process deployments; unset = in-process queue
+QUEUE_DIR = os.environ.get("NEXABUILD_QUEUE_DIR", "")
+# A running job whose worker has been silent this long is handed to another worker;
+# workers renew the lease every HEARTBEAT_SECONDS while a job runs
+LEASE_SECONDS = int(os.environ.get("NEXABUILD_JOB_LEASE", "600"))
+HEARTBEAT_SECONDS = max(1, LEASE_SECONDS // 4)
+# Finished jobs are kept this long for result/stream requests
+RETENTION_SECONDS = int(os.environ.get("NEXABUILD_JOB_RETENTION", "3600"))
+
+
+def new_job(kind, params, session=None, tenant=None):
+    if kind not in JOB_KINDS:
+        raise ValueError(f"Unknown job kind '{kind}'. Use one of: {', '.join(JOB_KINDS)}")
+    if not str(params.get("prompt") or "").strip() and kind in ("create", "edit"):
+        raise ValueError("A prompt is required.")
+    if kind != "create" and not isinstance(params.get("files"), dict):
+        raise ValueError(f"'{kind}' jobs need the current project as a 'files' object.")
+    if kind in ("optimize", "repair") and not isinstance(params.get("report"), dict):
+        raise ValueError(f"'{kind}' jobs need an audit or validation 'report' object.")
+    if not isinstance(params.get("variants", 1), int) or not 1 <= params.get("variants", 1) <= 4:
+        raise ValueError("'variants' must be a whole number from 1 to 4.")
+    now = time.time()
+    return {"id": uuid.uuid4().hex, "kind": kind, "params": params, "session": session or "api", "tenant": tenant,
+            "status": "queued", "events": [], "result": None, "error": None, "worker": None,
+            "created": now, "started": None, "finished": None, "heartbeat": now}
+
+
+def public_view(job, with_result=False):
+    """The job as returned by the API: no input files, result only on request."""
+    view = {k: job[k] for k in ("id", "kind", "status", "error", "created", "started", "finished")}
+    view["events"] = len(job["events"])
+    view["last_event"] = job["events"][-1] if job["events"] else None
+    if with_result:
+        view["result"] = job["result"]
+    return view
+
+
+# -----------------------------------------------------
+# Queues
+# -----------------------------------------------------
+class MemoryQueue:
+    """In-process queue: the local stand-in for tests and single-process deployments."""
+
+    def __init__(self):
+        self._jobs = {}
+        self._pending = []
+        self._cond = threading.Condition()
+
+    def submit(self, kind, params, session=None, tenant=None):
+        job = new_job(kind, params, session, tenant)
+        with self._cond:
+            self._jobs[job["id"]] = job
+            self._pending.append(job["id"])
+            self._cond.notify()
+        return job["id"]
+
+    def claim(self, worker, timeout=1.0):
+        with self._cond:
+            self._requeue_stale()
+            if not self._pending:
+                self._cond.wait(timeout)
+            if not self._pending:
+                return None
+            job = self._jobs[self._pending.pop(0)]
+            job.update(status="running", worker=worker, started=time.time(), heartbeat=time.time())
+            return json.loads(json.dumps(job))
+
+    def _requeue_stale(self):
+        now = time.time()
+        for job_id, job in list(self._jobs.items()):
+            if job["status"] == "running" and now - job["heartbeat"] > LEASE_SECONDS:
+                # The retry starts over, so the dead worker's progress events go too
+                job.update(status="queued", worker=None, events=[])
+                self._pending.append(job_id)
+            elif job["status"] in TERMINAL and now - job["finished"] > RETENTION_SECONDS:
+                del self._jobs[job_id]
+
+    def heartbeat(self, job_id):
+        with self._cond:
+            job = self._jobs.get(job_id)
+            if job and job["status"] == "running":
+                job["heartbeat"] = time.time()
+
+    def add_event(self, job_id, event):
+        with self._cond:
+            job = self._jobs.get(job_id)
+            if job:
+                job["events"].append(event)
+                job["heartbeat"] = time.time()
+                self._cond.notify_all()
+
+    def finish(self, job_id, result=None, error=None):
+        with self._cond:
+            job = self._jobs.get(job_id)
+            if job:
+                job.update(status="failed" if error else "done", result=result, error=error,
+                           finished=time.time())
+                self._cond.notify_all()
+
+    def get(self, job_id):
+        with self._cond:
+            job = self._jobs.get(job_id)
+            return json.loads(json.dumps(job)) if job else None
+
+    def wait(self, job_id, seen, timeout=15.0):
+        """Blocks until the job has more than `seen` events or finishes; returns the job."""
+        with self._cond:
+            self._cond.wait_for(lambda: self._changed(job_id, seen), timeout)
+        return self.get(job_id)
+
+    def _changed(self, job_id, seen):
+        job = self._jobs.get(job_id)
+        return job is None or len(job["events"]) > seen or job["status"] in TERMINAL
+
+
+class DirectoryQueue:
+    """
+    Jobs as JSON files under queued/, running/ and done/ in a shared directory.
+    A worker claims a job with an atomic rename out of queued/, so several worker
+    processes (or hosts on a shared volume) never run the same job twice.
+    """
+
+    POLL_SECONDS = 0.25
+
+    def __init__(self, root):
+        self.root = root
+        for state in ("queued", "running", "done"):
+            os.makedirs(os.path.join(root, state), exist_ok=True)
+
+    def _path(self, state, job_id):
+        return os.path.join(self.root, state, f"{job_id}.json")
+
+    def _read(self, path):
+        try:
+            with open(path, encoding="utf-8") as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+
+    def _write(self, path, job):
+        tmp = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(job, f)
+        os.replace(tmp, path)
+
+    def submit(self, kind, params, session=None, tenant=None):
+        job = new_job(kind, params, session, tenant)
+        self._write(self._path("queued", job["id"]), job)
+        return job["id"]
+
+    def claim(self, worker, timeout=1.0):
+        deadline = time.time() + timeout
+        while True:
+            self._requeue_stale()
+            queued = os.path.join(self.root, "queued")
+            for name in sorted(os.listdir(queued), key=lambda n: _mtime(os.path.join(queued, n))):
+                if not name.endswith(".json"):
+                    continue
+                job_id = name[:-5]
+                running = self._path("running", job_id)
+                try:
+                    os.rename(os.path.join(queued, name), running)
+                except OSError:
+                    continue   # another worker got it first
+                _touch(running)   # rename keeps the queued mtime; start the lease now
+                job = self._read(running)
+                if job is None:
+                    continue
+                job.update(status="running", worker=worker, started=time.time(), heartbeat=time.time())
+                self._write(running, job)
+                return job
+            if time.time() >= deadline:
+                return None
+            time.sleep(self.POLL_SECONDS)
+
+    def _requeue_stale(self):
+        now = time.time()
+        running = os.path.join(self.root, "running")
+        for name in os.listdir(running):
+            path = os.path.join(running, name)
+            if name.endswith(".json") and now - _mtime(path) > LEASE_SECONDS:
+                job = self._read(path)
+                if job is None:
+                    continue
+                job.update(status="queued", worker=None, events=[])
+                try:
+                    self._write(path, job)
+                    os.rename(path, os.path.join(self.root, "queued", name))
+                except OSError:
+                    pass
+        done = os.path.join(self.root, "done")
+        for name in os.listdir(done):
+            path = os.path.join(done, name)
+            if now - _mtime(path) > RETENTION_SECONDS:
+                try:
+                    os.remove(path)
+                except OSError:
+                    pass
+
+    def heartbeat(self, job_id):
+        # The lease is the file's mtime; touching it never races with add_event's rewrite
+        _touch(self._path("running", job_id))
+
+    def add_event(self, job_id, event):
+        # Only the worker holding the job writes it, so read-modify-write is safe
+        path = self._path("running", job_id)
+        job = self._read(path)
+        if job:
+            job["events"].append(event)
+            job["heartbeat"] = time.time()
+            self._write(path, job)
+
+    def finish(self, job_id, result=None, error=None):
+        path = self._path("running", job_id)
+        job = self._read(path)
+        if job is None:
+            return
+        job.update(status="failed" if error else "done", result=result, error=error, finished=time.time())
+        self._write(self._path("done", job_id), job)
+        os.remove(path)
+
+    def get(self, job_id):
+        if not job_id.isalnum():
+            return None
+        for state in ("done", "running", "queued"):
+            job = self._read(self._path(state, job_id))
+            if job:
+                return job
+        return None
+
+    def wait(self, job_id, seen, timeout=15.0):
+        deadline = time.time() + timeout
+        while True:
+            job = self.get(job_id)
+            if job is None or len(job["events"]) > seen or job["status"] in TERMINAL or time.time() >= deadline:
+                return job
+            time.sleep(self.POLL_SECONDS)
+
+
+def _touch(path):
+    try:
+        os.utime(path)
+    except OSError:
+        pass
+
+
+def _mtime(path):
+    try:
+        return os.path.getmtime(path)
+    except OSError:
+        return 0
+
+
+_queue = None
+
+
+def get_queue():
+    """Process-wide queue: a DirectoryQueue when NEXABUILD_QUEUE_DIR is set, else in-memory."""
+    global _queue
+    if _queue is None:
+        _queue = DirectoryQueue(QUEUE_DIR) if QUEUE_DIR else MemoryQueue()
+    return _queue
+
+
+# -----------------------------------------------------
+# Workers
+# -----------------------------------------------------
+class _ClientHistory:
+    """Stands in for the UI's EditMemory: replays the history the client sent, records nothing."""
+
+    def __init__(self, text):
+        self.text = text or ""
+
+    def as_prompt(self):
+        return self.text
+
+    def record(self, *args, **kwargs):
+        pass
+
+
+def run_job(job, queue, manager_factory=None):
+    """Runs one claimed job to completion and stores its result (or error) on the queue."""
+    from ai.tokens import set_session
+    from .manager import ProjectManager
+
+    set_session(job["session"], job.get("tenant"))
+    reporter = CallbackReporter(lambda event: queue.add_event(job["id"], event))
+    manager = (manager_factory or ProjectManager)(reporter=reporter)
+    params = job["params"]
+    # Long model calls and rate-limit waits emit no events; keep the lease alive regardless
+    done = threading.Event()
+
+    def beat():
+        while not done.wait(HEARTBEAT_SECONDS):
+            queue.heartbeat(job["id"])
+    threading.Thread(target=beat, name=f"nexabuild-heartbeat-{job['id'][:8]}", daemon=True).start()
+    try:
+        if job["kind"] == "create":
+            result = manager.create_website(params["prompt"], variants=params.get("variants", 1))
+        elif job["kind"] == "edit":
+            result = manager.edit_website(params["prompt"], params["files"], _ClientHistory(params.get("edit_history")))
+        elif job["kind"] == "optimize":
+            result = manager.optimize_website(params["report"], params["files"], _ClientHistory(params.get("edit_history")))
+        else:
+            result = manager.repair_website(params["report"], params["files"], _ClientHistory(params.get("edit_history")))
+    except Exception as e:
+        print(f"Job {job['id']} failed: {e}")
+        queue.finish(job["id"], error=str(e))
+        return
+    finally:
+        done.set()
+    if job["kind"] == "create" and not result:
+        queue.finish(job["id"], error="Planning failed. Please try again.")
+    else:
+        queue.finish(job["id"], result=result or {})
+
+
+class Worker(threading.Thread):
+    """Claims and runs jobs until stopped."""
+
+    def __init__(self, queue, name=None, manager_factory=None):
+        super().__init__(name=name or f"nexabuild-worker-{uuid.uuid4().hex[:6]}", daemon=True)
+        self.queue = queue
+        self.manager_factory = manager_factory
+        self._stop_event = threading.Event()
+
+    def run(self):
+        while not self._stop_event.is_set():
+            job = self.queue.claim(self.name, timeout=1.0)
+            if job:
+                run_job(job, self.queue, self.manager_factory)
+
+    def stop(self):
+        self._stop_event.set()
+
+
+def start_workers(queue, count, manager_factory=None):
+    workers = [Worker(queue, f"nexabuild-worker-{os.getpid()}-{i}", manager_factory) for i in range(count)]
+    for worker in workers:
+        worker.start()
+    return workers
@@ -1,133 +1,138 @@
-import streamlit as st
-import time
 from .product_manager import ProductManager
 from .designer import Designer
 from .developer import Developer
+from .status import StreamlitReporter
+from .variants import generate_variants
+from ai.audit import optimization_request
+from ai.datalayer import DATA_LAYER_FILE, inject_data_layer, strip_data_layer
+from ai.validate import fix_request
 
 
 class ProjectManager:
-    def __init__(self):
+    def __init__(self, reporter=None):
+        # Progress goes to `reporter` (agents/status.py); the Streamlit card by default
+        self.reporter = reporter or StreamlitReporter()
         self.pm = ProductManager()
         self.designer = Designer()
         self.developer = Developer()
 
-    def _render_status(self, placeholder, role, action, color, icon):
-        """Renders an animated card for the active agent."""
-        html_code = f"""
-        <style>
-            @keyframes pulse-border {{
-                0% {{ border-color: {color}; box-shadow: 0 0 0px {color}; }}
-                50% {{ border-color: {color}; box-shadow: 0 0 20px {color}; }}
-                100% {{ border-color: {color}; box-shadow: 0 0 0px {color}; }}
-            }}
-            @keyframes blink {{
-                0% {{ opacity: 0.2; }}
-                20% {{ opacity: 1; }}
-                100% {{ opacity: 0.2; }}
-            }}
-            .agent-box {{
-                padding: 20px;
-                border-radius: 12px;
-                border: 2px solid {color};
-                background: linear-gradient(90deg, rgba(22, 27, 34, 0.9) 0%, rgba(22, 27, 34, 0.6) 100%);
-                display: flex;
-                align-items: center;
-                gap: 20px;
-                margin-bottom: 20px;
-                animation: pulse-border 2s infinite ease-in-out;
-            }}
-            .agent-icon {{
-                font-size: 2.5rem;
-                background: rgba(255,255,255,0.05);
-                padding: 10px;
-                border-radius: 50%;
-            }}
-            .agent-role {{
-                font-weight: bold;
-                font-size: 1.2rem;
-                color: {color};
-                margin-bottom: 5px;
-            }}
-            .agent-action {{
-                color: #c9d1d9;
-                font-family: monospace;
-            }}
-            .dot {{ font-weight: bold; font-size: 1.2rem; animation: blink 1.4s infinite both; }}
-            .d1 {{ animation-delay: 0s; }}
-            .d2 {{ animation-delay: 0.2s; }}
-            .d3 {{ animation-delay: 0.4s; }}
-        </style>
-
-        <div class="agent-box">
-            <div class="agent-icon">{icon}</div>
-            <div>
-                <div class="agent-role">{role}</div>
-                <div class="agent-action">
-                    {action}
-                    <span class="dot d1">.</span>
-                    <span class="dot d2">.</span>
-                    <span class="dot d3">.</span>
-                </div>
-            </div>
-        </div>
-        """
-        placeholder.markdown(html_code, unsafe_allow_html=True)
-
-    def create_website(self, prompt):
-        status_box = st.empty()
-
+    def create_website(self, prompt, variants=1):
+        """`variants` > 1 writes that many candidate projects concurrently and keeps the best-scoring one."""
         # Step 1: Plan (Cyan)
-        self._render_status(status_box, "Product Manager", "Analyzing requirements & planning structure", "#00f3ff",
-                            "👨‍💼")
+        self.reporter.update("Product Manager", "Analyzing requirements & planning structure", "#00f3ff", "👨‍💼")
         plan = self.pm.plan_project(prompt)
         if not plan:
-            status_box.error("Planning failed. Please try again.")
+            self.reporter.error("Planning failed. Please try again.")
             return None
 
         # Step 2: Design (Purple)
-        self._render_status(status_box, "Lead Designer", "Crafting visual identity & design system", "#bc13fe", "🎨")
-        design = self.designer.create_design_system(plan)
+        self.reporter.update("Lead Designer", "Crafting visual identity & design system", "#bc13fe", "🎨")
+        design = self.designer.create_design_system(plan, prompt)
 
         # Step 3: Develop (Green)
         # Initial status while waiting for AI API response
-        self._render_status(status_box, "Senior Developer", "Architecting solution & generating logic...", "#00ff99",
-                            "👨‍💻")
-
-        files = self.developer.write_code(plan, design)
+        self.reporter.update("Senior Developer", "Architecting solution & generating logic...", "#00ff99", "👨‍💻")
+
+        variant_report = None
+        if variants > 1:
+            files, developer, variant_report = generate_variants(
+                lambda model, temperature: Developer(model, temperature), plan, design, variants,
+                finish=lambda f: inject_data_layer(strip_data_layer(f)),
+                on_result=lambda v: self.reporter.update(
+                    "Senior Developer", f"Variant {v['variant']} of {variants} scored {v['score']}/100",
+                    "#00ff99", "🧪"),
+                prompt=prompt)
+            self.developer = developer
+        else:
+            files = self.developer.write_code(plan, design, user_prompt=prompt)
+            if files:
+                # Ship the prebuilt persistence library the code was written against
+                files = inject_data_layer(strip_data_layer(files))
 
         # --- Animated File Writing Effect ---
         if files:
             for filename in files:
                 # Update the UI to show exactly which file is being "written"
-                self._render_status(status_box, "Senior Developer", f"Writing {filename}...", "#00ff99", "👨‍💻")
+                self.reporter.update("Senior Developer", f"Writing {filename}...", "#00ff99", "👨‍💻")
                 # Add a small delay so the user can see it happen
-                time.sleep(0.7)
+                self.reporter.pace(0.7)
 
             # Final connection step
-            self._render_status(status_box, "Senior Developer", "Connecting Universal Backend API...", "#00ff99", "🔌")
-            time.sleep(0.8)
+            self.reporter.update("Senior Developer", "Connecting Universal Backend API...", "#00ff99", "🔌")
+            self.reporter.pace(0.8)
 
         # Clear the animation when done
-        status_box.empty()
+        self.reporter.clear()
 
         return {
             "files": files,
             "plan": plan,
+            "plan_reuse": self.pm.last_reuse,
+            "template": self.developer.last_template,
+            "variants": variant_report,
             "design": design
         }
 
-    def edit_website(self, prompt, current_files):
-        status_box = st.empty()
+    def edit_website(self, prompt, current_files, memory=None):
+        """`memory` is an ai.memory.EditMemory; it is fed to the Developer and updated with the outcome."""
         # Edit Mode (Orange)
-        self._render_status(status_box, "Senior Developer", "Reading code & applying changes", "#ffaa00", "🛠️")
+        self.reporter.update("Senior Developer", "Reading code & applying changes", "#ffaa00", "🛠️")
 
-        result = self.developer.modify_code(prompt, current_files)
+        result = _with_data_layer(
+            self.developer.modify_code(prompt, current_files, memory.as_prompt() if memory else ""), current_files)
+        if memory is not None:
+            memory.record(prompt, _changed_files(current_files, result))
 
         if result:
             # Simulate applying changes to specific files
             for filename in result:
-                self._render_status(status_box, "Senior Developer", f"Updating {filename}...", "#ffaa00", "🛠️")
-                time.sleep(0.5)
+                self.reporter.update("Senior Developer", f"Updating {filename}...", "#ffaa00", "🛠️")
+                self.reporter.pace(0.5)
+
+        self.reporter.clear()
+        return result
 
-        status_box.empty()
-        return result
\ No newline at end of file
+    def optimize_website(self, report, current_files, memory=None):
+        """Feeds static audit findings back to the Developer as one optimization pass."""
+        request = optimization_request(report)
+        if not request:
+            return None
+        # Optimize Mode (Yellow)
+        self.reporter.update("Senior Developer", "Fixing performance findings", "#ffe600", "⚡")
+        result = _with_data_layer(
+            self.developer.modify_code(request, current_files, memory.as_prompt() if memory else ""), current_files)
+        if memory is not None:
+            memory.record(f"Performance pass ({len(report['findings'])} audit findings)",
+                          _changed_files(current_files, result))
+        self.reporter.clear()
+        return result
+
+    def repair_website(self, report, current_files, memory=None):
+        """Sends validation errors (ai/validate.py) back to the Developer with only the files involved."""
+        request, involved = fix_request(report, current_files)
+        if not request:
+            return None
+        # Repair Mode (Red)
+        errors = report["counts"]["error"]
+        self.reporter.update("Senior Developer", f"Repairing {errors} validation error(s)", "#ff4d6d", "🩹")
+        result = _with_data_layer(
+            self.developer.modify_code(request, involved, memory.as_prompt() if memory else ""), current_files)
+        if memory is not None:
+            memory.record(f"Repair pass ({errors} validation errors)", _changed_files(current_files, result))
+        self.reporter.clear()
+        return result
+
+
+def _with_data_layer(result, current_files):
+    """Drops any model-written nexa-data.js and re-adds the prebuilt library and its tags."""
+    if not result:
+        return result
+    return inject_data_layer(strip_data_layer(result), include_library=DATA_LAYER_FILE not in current_files)
+
+
+def _changed_files(before, updates):
+    """Names in `updates` whose content differs from `before` (the library itself is not an edit)."""
+    if not isinstance(updates, dict):
+        return []
+    return [name for name, content in updates.items()
+            if name != DATA_LAYER_FILE and before.get(name) != content]
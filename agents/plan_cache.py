@@ -0,0 +1,284 @@
+# agents/plan_cache.py
+# Local near-duplicate index over previous prompts and their validated plans
+# (MinHash + LSH, no external service), so common requests skip the
+# ProductManager model call.
+
+import atexit
+import copy
+import hashlib
+import json
+import os
+import random
+import re
+import threading
+import time
+
+from ai.fileutil import locked_file
+
+PLAN_INDEX_PATH = os.environ.get("NEXABUILD_PLAN_INDEX", os.path.join(".nexabuild", "plan_index.json"))
+# Jaccard similarity needed to reuse a plan, and above which it is reused verbatim
+REUSE_THRESHOLD = float(os.environ.get("NEXABUILD_PLAN_REUSE_THRESHOLD", "0.6"))
+EXACT_THRESHOLD = 0.9
+MAX_ENTRIES = 2000
+# Lookups only bump counters; those are written out at most this often (new plans are saved at once)
+STATS_SAVE_SECONDS = 60
+
+NUM_PERM = 64
+BANDS = 16
+ROWS = NUM_PERM // BANDS
+_PRIME = (1 << 61) - 1
+_rng = random.Random(20250101)  # fixed seed: signatures must stay stable across restarts
+_PERMS = [(_rng.randrange(1, _PRIME), _rng.randrange(0, _PRIME)) for _ in range(NUM_PERM)]
+
+STOPWORDS = {"a", "an", "the", "and", "or", "for", "with", "that", "this", "to", "of", "in", "on", "my", "me",
+             "i", "can", "where", "which", "it", "is", "be", "app", "application", "website", "site", "web",
+             "build", "create", "make", "want", "need", "please", "simple", "using", "lets", "let", "should"}
+SYNONYMS = {"todo": "todo", "to-do": "todo", "todos": "todo", "task": "todo", "tasks": "todo",
+            "saves": "save", "saving": "save", "saved": "save", "permanently": "save", "persist": "save",
+            "tracker": "track", "tracking": "track", "dashboard": "dashboard"}
+
+
+def normalize_tokens(text):
+    words = re.findall(r"[a-z0-9]+(?:-[a-z0-9]+)*", text.lower())
+    out = []
+    for w in words:
+        w = SYNONYMS.get(w, w)
+        if w in STOPWORDS:
+            continue
+        if len(w) > 3 and w.endswith("s") and not w.endswith("ss"):
+            w = SYNONYMS.get(w[:-1], w[:-1])
+        out.append(w)
+    return out
+
+
+def shingles(text):
+    """Set of normalized content words; prompts are short, so word order adds noise rather than signal."""
+    return set(normalize_tokens(text))
+
+
+def _hash64(token):
+    return int.from_bytes(hashlib.blake2b(token.encode("utf-8"), digest_size=8).digest(), "big")
+
+
+def minhash(features):
+    if not features:
+        return [_PRIME] * NUM_PERM
+    hashes = [_hash64(f) for f in features]
+    return [min((a * h + b) % _PRIME for h in hashes) for a, b in _PERMS]
+
+
+def jaccard(a, b):
+    if not a and not b:
+        return 1.0
+    return len(a & b) / len(a | b)
+
+
+def is_valid_plan(plan):
+    """Only plans with the structure the later agents rely on are worth reusing."""
+    if not isinstance(plan, dict) or not plan.get("project_name"):
+        return False
+    pages = plan.get("pages")
+    if not isinstance(pages, list) or not pages:
+        return False
+    if not all(isinstance(p, dict) and p.get("filename") for p in pages):
+        return False
+    return isinstance(plan.get("features"), list)
+
+
+class PlanIndex:
+    def __init__(self, path=PLAN_INDEX_PATH, threshold=REUSE_THRESHOLD, exact_threshold=EXACT_THRESHOLD,
+                 max_entries=MAX_ENTRIES):
+        self.path = path
+        self.threshold = threshold
+        self.exact_threshold = exact_threshold
+        self.max_entries = max_entries
+        self.entries = []
+        self.buckets = {}
+        self.stats = {"lookups": 0, "hits": 0, "misses": 0, "stored": 0}
+        self.lock = threading.Lock()
+        self.dirty = False
+        self.saved_at = time.time()
+        # Changes since the last save, merged into whatever other processes wrote meanwhile
+        self.added = {}
+        self.hit_deltas = {}
+        self.stat_deltas = {}
+        self._load()
+
+    # ------------------------------
+    # Persistence
+    # ------------------------------
+    def _read(self):
+        if not self.path or not os.path.exists(self.path):
+            return {}
+        try:
+            with open(self.path, encoding="utf-8") as f:
+                return json.load(f)
+        except (OSError, ValueError) as e:
+            print(f"Plan index unreadable, starting empty: {e}")
+            return {}
+
+    def _load(self):
+        data = self._read()
+        self.stats.update(data.get("stats", {}))
+        for entry in data.get("entries", []):
+            self._insert(entry)
+
+    def _save(self):
+        """
+        Several processes (API workers, batch runs) share the file, so it is re-read
+        under a lock and this process's additions and counter increments are merged in.
+        """
+        if not self.path:
+            return
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        with locked_file(self.path + ".lock"):
+            data = self._read()
+            stats = dict({key: 0 for key in self.stats}, **data.get("stats", {}))
+            for key, delta in self.stat_deltas.items():
+                stats[key] = stats.get(key, 0) + delta
+            entries = {e["prompt"]: e for e in data.get("entries", [])}
+            for prompt, entry in self.added.items():
+                if prompt in entries:
+                    entry = dict(entry, hits=entries[prompt].get("hits", 0), last_hit=entries[prompt].get("last_hit"))
+                entries[prompt] = entry
+            for prompt, (hits, last_hit) in self.hit_deltas.items():
+                if prompt in entries:
+                    entries[prompt] = dict(entries[prompt], hits=entries[prompt].get("hits", 0) + hits,
+                                           last_hit=max(last_hit, entries[prompt].get("last_hit") or 0))
+            merged = self._evict(list(entries.values()))
+            tmp = f"{self.path}.{os.getpid()}.tmp"
+            with open(tmp, "w", encoding="utf-8") as f:
+                json.dump({"stats": stats, "entries": merged}, f)
+            os.replace(tmp, self.path)
+        self.stats = stats
+        self.entries = merged
+        self._rebuild()
+        self.added, self.hit_deltas, self.stat_deltas = {}, {}, {}
+        self.dirty = False
+        self.saved_at = time.time()
+
+    # ------------------------------
+    # Index
+    # ------------------------------
+    @staticmethod
+    def _band_keys(signature):
+        return [(i, tuple(signature[i * ROWS:(i + 1) * ROWS])) for i in range(BANDS)]
+
+    def _insert(self, entry):
+        self.entries.append(entry)
+        for key in self._band_keys(entry["signature"]):
+            self.buckets.setdefault(key, []).append(entry)
+
+    def _evict(self, entries):
+        # Keep the most useful (most hits, then newest)
+        if len(entries) <= self.max_entries:
+            return entries
+        entries.sort(key=lambda e: (e.get("hits", 0), e.get("created", 0)), reverse=True)
+        return entries[:self.max_entries]
+
+    def _count(self, key):
+        self.stats[key] += 1
+        self.stat_deltas[key] = self.stat_deltas.get(key, 0) + 1
+
+    def _rebuild(self):
+        entries, self.entries, self.buckets = self.entries, [], {}
+        for entry in entries:
+            self._insert(entry)
+
+    def lookup(self, prompt):
+        """
+        Returns (plan, similarity) for the closest stored prompt above threshold, else None.
+        The stored prompt itself is never returned: the index is shared by every user.
+        """
+        features = shingles(prompt)
+        signature = minhash(features)
+        with self.lock:
+            self._count("lookups")
+            candidates = {id(e): e for key in self._band_keys(signature) for e in self.buckets.get(key, [])}
+            best, best_sim = None, 0.0
+            for entry in candidates.values():
+                sim = jaccard(features, set(entry["features"]))
+                if sim > best_sim:
+                    best, best_sim = entry, sim
+            if best is None or best_sim < self.threshold:
+                self._count("misses")
+                self._touch()
+                return None
+            self._count("hits")
+            best["hits"] = best.get("hits", 0) + 1
+            best["last_hit"] = int(time.time())
+            hits, _ = self.hit_deltas.get(best["prompt"], (0, 0))
+            self.hit_deltas[best["prompt"]] = (hits + 1, best["last_hit"])
+            self._touch()
+            return copy.deepcopy(best["plan"]), best_sim
+
+    def add(self, prompt, plan):
+        if not is_valid_plan(plan):
+            return False
+        features = shingles(prompt)
+        if not features:
+            return False
+        entry = {
+            "prompt": prompt,
+            "features": sorted(features),
+            "signature": minhash(features),
+            # A copy: the caller goes on to adapt and edit the plan it was handed
+            "plan": copy.deepcopy(plan),
+            "created": int(time.time()),
+            "hits": 0,
+        }
+        with self.lock:
+            self._insert(entry)
+            self.added[prompt] = entry
+            self._count("stored")
+            if len(self.entries) > self.max_entries:
+                self.entries = self._evict(self.entries)
+                self._rebuild()
+            self._save_quietly()
+        return True
+
+    def _touch(self):
+        # Counters only: rewriting up to MAX_ENTRIES plans per lookup would put disk I/O on every generation
+        self.dirty = True
+        if time.time() - self.saved_at >= STATS_SAVE_SECONDS:
+            self._save_quietly()
+
+    def flush(self):
+        with self.lock:
+            if self.dirty:
+                self._save_quietly()
+
+    def _save_quietly(self):
+        try:
+            self._save()
+        except OSError as e:
+            print(f"Could not persist plan index: {e}")
+
+    def adapt(self, plan, prompt, similarity):
+        """Near (not exact) matches keep the stored structure but carry the user's actual wording."""
+        if similarity >= self.exact_threshold:
+            return plan
+        features = list(plan.get("features", []))
+        features.append(f"User request (must be satisfied): {prompt.strip()}")
+        plan["features"] = features
+        return plan
+
+    def metrics(self):
+        with self.lock:
+            lookups = self.stats["lookups"]
+            return dict(self.stats, entries=len(self.entries),
+                        hit_rate=(self.stats["hits"] / lookups) if lookups else 0.0,
+                        threshold=self.threshold)
+
+
+_index = None
+_index_lock = threading.Lock()
+
+
+def get_plan_index():
+    global _index
+    with _index_lock:
+        if _index is None:
+            _index = PlanIndex()
+            atexit.register(_index.flush)
+        return _index
@@ -1,8 +1,21 @@
 from .base_agent import BaseAgent
+from .plan_cache import get_plan_index
 
 
 class ProductManager(BaseAgent):
-    def plan_project(self, user_prompt):
+    last_reuse = None  # {"similarity"} when the last plan came from the index
+
+    def plan_project(self, user_prompt, reuse=True):
+        # Near-duplicate prompts reuse a stored plan instead of a model call
+        self.last_reuse = None
+        index = get_plan_index() if reuse else None
+        if index:
+            match = index.lookup(user_prompt)
+            if match:
+                plan, similarity = match
+                self.last_reuse = {"similarity": round(similarity, 3)}
+                return index.adapt(plan, user_prompt, similarity)
+
         system = """
         You are an expert Product Manager for modern web applications.
         Analyze the user's request and define the project structure.
@@ -27,4 +40,7 @@ class ProductManager(BaseAgent):
             "features": ["feature 1", "feature 2"]
         }
         """
-        return self.call_ai(system, user_prompt)
+        plan = self.call_ai(system, user_prompt)
+        if index:
+            index.add(user_prompt, plan)
+        return plan
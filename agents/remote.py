@@ -0,0 +1,106 @@
+# agents/remote.py
+# Thin client for the headless API (server.py) with the same interface as
+# ProjectManager, so the Streamlit UI can hand generation to remote workers.
+# Enabled by pointing NEXABUILD_API_URL at the service.
+
+import json
+import os
+
+from .manager import _changed_files
+from .status import StreamlitReporter
+
+API_URL = os.environ.get("NEXABUILD_API_URL", "").rstrip("/")
+API_TOKEN = os.environ.get("NEXABUILD_API_TOKEN", "")
+# Seconds to wait for a job before giving up (generation can take minutes)
+JOB_TIMEOUT = int(os.environ.get("NEXABUILD_API_TIMEOUT", "900"))
+
+
+class RemoteProjectManager:
+    def __init__(self, base_url=API_URL, reporter=None, token=API_TOKEN):
+        import requests  # only needed in client mode
+        self.http = requests.Session()
+        if token:
+            self.http.headers["Authorization"] = f"Bearer {token}"
+        self.base_url = base_url.rstrip("/")
+        self.reporter = reporter or StreamlitReporter()
+
+    def _run(self, kind, **params):
+        """Submits a job, replays its progress events on the reporter and returns the result."""
+        resp = self.http.post(f"{self.base_url}/api/jobs", json={"kind": kind, **params},
+                              timeout=30)
+        if resp.status_code != 202:
+            raise RuntimeError(f"NexaBuild API rejected the job: {_error_text(resp)}")
+        job_id = resp.json()["id"]
+
+        status = None
+        with self.http.get(f"{self.base_url}/api/jobs/{job_id}/stream", stream=True, timeout=JOB_TIMEOUT) as events:
+            name = None
+            for line in events.iter_lines(decode_unicode=True):
+                if line.startswith("event:"):
+                    name = line[6:].strip()
+                elif line.startswith("data:"):
+                    data = json.loads(line[5:])
+                    if name == "status":
+                        self.reporter.update(data["role"], data["action"], data["color"], data["icon"])
+                    elif name == "error":
+                        self.reporter.error(data["message"])
+                    elif name == "end":
+                        status = data.get("status")
+                        break
+        if status == "done":
+            self.reporter.clear()
+        else:
+            self.reporter.error(f"Job {job_id} {status or 'lost its connection'}.")
+
+        resp = self.http.get(f"{self.base_url}/api/jobs/{job_id}/result", timeout=60)
+        if resp.status_code != 200:
+            raise RuntimeError(f"NexaBuild job failed: {_error_text(resp)}")
+        return resp.json()["result"]
+
+    def create_website(self, prompt, variants=1):
+        return self._run("create", prompt=prompt, variants=variants)
+
+    def edit_website(self, prompt, current_files, memory=None):
+        result = self._run("edit", prompt=prompt, files=current_files,
+                           edit_history=memory.as_prompt() if memory else "")
+        if memory is not None:
+            memory.record(prompt, _changed_files(current_files, result))
+        return result
+
+    def optimize_website(self, report, current_files, memory=None):
+        if not report.get("findings"):
+            return None
+        result = self._run("optimize", report=report, files=current_files,
+                           edit_history=memory.as_prompt() if memory else "")
+        if memory is not None:
+            memory.record(f"Performance pass ({len(report['findings'])} audit findings)",
+                          _changed_files(current_files, result))
+        return result
+
+    def repair_website(self, report, current_files, memory=None):
+        if not report.get("counts", {}).get("error"):
+            return None
+        result = self._run("repair", report=report, files=current_files,
+                           edit_history=memory.as_prompt() if memory else "")
+        if memory is not None:
+            memory.record(f"Repair pass ({report['counts']['error']} validation errors)",
+                          _changed_files(current_files, result))
+        return result
+
+
+def _error_text(resp):
+    try:
+        return resp.json().get("error") or resp.text
+    except ValueError:
+        return resp.text
+
+
+def get_project_manager():
+    """
+    The remote client when NEXABUILD_API_URL is set, otherwise the in-process agent team.
+    Remote usage counts against the API token's quota, not the browser session's.
+    """
+    if API_URL:
+        return RemoteProjectManager()
+    from .manager import ProjectManager
+    return ProjectManager()
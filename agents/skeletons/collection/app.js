@@ -0,0 +1,306 @@
+// app.js - NexaBuild {{archetype}} skeleton (template v{{template_version}}).
+// Generic NexaData-backed collection app driven by CONFIG.
+// App-specific behaviour belongs in features.js, through the window.App API.
+(function () {
+  "use strict";
+
+  var CONFIG = {{config}};
+
+  var hooks = { item: [], render: [], save: [] };
+  var state = { filter: "all", search: "" };
+  var renderQueued = false;
+  var resolveReady;
+
+  var App = window.App = {
+    config: CONFIG,
+    state: state,
+    db: null,
+    items: null,
+    ready: new Promise(function (resolve) { resolveReady = resolve; }),
+    // on("item", fn(item, li)) | on("render", fn(allItems, visibleItems)) | on("save", fn(record) -> false to cancel)
+    on: function (name, fn) { (hooks[name] = hooks[name] || []).push(fn); App.render(); return App; },
+    render: scheduleRender,
+    toast: toast,
+    format: format,
+    escape: escapeHtml
+  };
+
+  // ---------------------------------------------------------------
+  // Helpers
+  // ---------------------------------------------------------------
+  function $(id) { return document.getElementById(id); }
+
+  function escapeHtml(value) {
+    return String(value == null ? "" : value).replace(/[&<>"']/g, function (c) {
+      return { "&": "&amp;", "<": "&lt;", ">": "&gt;", '"': "&quot;", "'": "&#39;" }[c];
+    });
+  }
+
+  function field(name) {
+    return CONFIG.fields.filter(function (f) { return f.name === name; })[0];
+  }
+
+  function format(name, value) {
+    var f = field(name) || {};
+    if (value === undefined || value === null || value === "") return "";
+    if (f.type === "number") {
+      var n = Number(value);
+      return (CONFIG.currency && name === CONFIG.amountField ? CONFIG.currency : "") +
+        n.toLocaleString(undefined, { maximumFractionDigits: 2 });
+    }
+    if (f.type === "date") {
+      var d = new Date(value + "T00:00:00");
+      return isNaN(d) ? String(value) : d.toLocaleDateString();
+    }
+    return String(value);
+  }
+
+  function toast(message, kind) {
+    var el = document.createElement("div");
+    el.className = "toast " + (kind || "success");
+    el.textContent = message;
+    $("toast-root").appendChild(el);
+    setTimeout(function () { el.remove(); }, 2600);
+  }
+
+  function run(name, args) {
+    var ok = true;
+    (hooks[name] || []).forEach(function (fn) {
+      try { if (fn.apply(null, args) === false) ok = false; } catch (e) { console.error(e); }
+    });
+    return ok;
+  }
+
+  // ---------------------------------------------------------------
+  // Form
+  // ---------------------------------------------------------------
+  function buildForm() {
+    var form = $("item-form");
+    form.innerHTML = CONFIG.fields.map(function (f) {
+      var attrs = 'name="' + f.name + '"' + (f.required ? " required" : "") +
+        (f.placeholder ? ' placeholder="' + escapeHtml(f.placeholder) + '"' : "");
+      var input;
+      if (f.type === "select") {
+        input = "<select " + attrs + ">" + f.options.map(function (o) {
+          return "<option>" + escapeHtml(o) + "</option>";
+        }).join("") + "</select>";
+      } else if (f.type === "textarea") {
+        input = "<textarea " + attrs + ' rows="2"></textarea>';
+      } else {
+        input = '<input type="' + (f.type || "text") + '" ' + attrs + (f.type === "number" ? ' step="any"' : "") + ">";
+      }
+      return '<label class="field"><span>' + escapeHtml(f.label) + "</span>" + input + "</label>";
+    }).join("") + '<button class="btn" type="submit">' + escapeHtml(CONFIG.addLabel) + "</button>";
+
+    var today = new Date().toISOString().slice(0, 10);
+    CONFIG.fields.forEach(function (f) {
+      if (f.type === "date" && f.defaultToday) form.elements[f.name].value = today;
+    });
+
+    form.addEventListener("submit", function (event) {
+      event.preventDefault();
+      var record = {};
+      CONFIG.fields.forEach(function (f) {
+        var raw = form.elements[f.name].value.trim();
+        record[f.name] = f.type === "number" ? (raw === "" ? null : Number(raw)) : raw;
+      });
+      if (CONFIG.toggleField) record[CONFIG.toggleField] = false;
+      if (!run("save", [record])) return;
+      App.items.add(record);
+      form.reset();
+      CONFIG.fields.forEach(function (f) {
+        if (f.type === "date" && f.defaultToday) form.elements[f.name].value = today;
+      });
+      form.elements[CONFIG.fields[0].name].focus();
+      toast(CONFIG.itemLabel + " added");
+    });
+  }
+
+  // ---------------------------------------------------------------
+  // Filters
+  // ---------------------------------------------------------------
+  function filterOptions(all) {
+    if (CONFIG.toggleField) return ["all", "active", "done"];
+    if (!CONFIG.groupField) return [];
+    var seen = {};
+    all.forEach(function (item) { if (item[CONFIG.groupField]) seen[item[CONFIG.groupField]] = true; });
+    return ["all"].concat(Object.keys(seen).sort());
+  }
+
+  function renderFilters(all) {
+    var options = filterOptions(all);
+    if (options.indexOf(state.filter) === -1) state.filter = "all";
+    $("filters").innerHTML = options.map(function (o) {
+      return '<button type="button" class="filter' + (o === state.filter ? " active" : "") + '" data-filter="' +
+        escapeHtml(o) + '">' + escapeHtml(o.charAt(0).toUpperCase() + o.slice(1)) + "</button>";
+    }).join("");
+  }
+
+  function visible(all) {
+    var q = state.search.toLowerCase();
+    var items = all.filter(function (item) {
+      if (state.filter !== "all") {
+        if (CONFIG.toggleField) {
+          if (Boolean(item[CONFIG.toggleField]) !== (state.filter === "done")) return false;
+        } else if (item[CONFIG.groupField] !== state.filter) {
+          return false;
+        }
+      }
+      if (!q) return true;
+      return CONFIG.fields.some(function (f) { return String(item[f.name] || "").toLowerCase().indexOf(q) !== -1; });
+    });
+    var key = CONFIG.sortField || "createdAt";
+    var dir = CONFIG.sortDir === "asc" ? 1 : -1;
+    return items.sort(function (a, b) {
+      var x = a[key] == null ? "" : a[key];
+      var y = b[key] == null ? "" : b[key];
+      return x < y ? -dir : x > y ? dir : 0;
+    });
+  }
+
+  // ---------------------------------------------------------------
+  // Rendering
+  // ---------------------------------------------------------------
+  function renderList(items) {
+    var list = $("item-list");
+    var fragment = document.createDocumentFragment();
+    items.forEach(function (item) {
+      var li = document.createElement("li");
+      li.className = "item" + (CONFIG.toggleField && item[CONFIG.toggleField] ? " done" : "");
+      li.dataset.id = item.id;
+      var meta = CONFIG.fields.filter(function (f) {
+        return f.name !== CONFIG.titleField && f.name !== CONFIG.amountField && item[f.name] !== "" && item[f.name] != null;
+      }).map(function (f) {
+        return "<span>" + escapeHtml(f.label) + ": " + escapeHtml(format(f.name, item[f.name])) + "</span>";
+      }).join("");
+      li.innerHTML =
+        (CONFIG.toggleField ? '<input type="checkbox" data-action="toggle" aria-label="Done"' +
+          (item[CONFIG.toggleField] ? " checked" : "") + ">" : "") +
+        '<div class="item-body"><div class="item-title">' + escapeHtml(item[CONFIG.titleField]) + "</div>" +
+        '<div class="item-meta">' + meta + "</div></div>" +
+        (CONFIG.amountField ? '<span class="item-amount">' + escapeHtml(format(CONFIG.amountField, item[CONFIG.amountField])) + "</span>" : "") +
+        '<button type="button" class="icon-btn" data-action="delete" aria-label="Delete">&#x2715;</button>';
+      run("item", [item, li]);
+      fragment.appendChild(li);
+    });
+    list.replaceChildren(fragment);
+    $("empty-state").hidden = items.length > 0;
+  }
+
+  function stat(label, value) {
+    return '<div class="card stat"><span class="stat-label">' + escapeHtml(label) +
+      '</span><span class="stat-value">' + escapeHtml(value) + "</span></div>";
+  }
+
+  function renderStats(all) {
+    var cards = [stat("Total " + CONFIG.itemLabelPlural.toLowerCase(), all.length)];
+    if (CONFIG.toggleField) {
+      var done = all.filter(function (i) { return i[CONFIG.toggleField]; }).length;
+      cards.push(stat("Completed", done), stat("Remaining", all.length - done));
+    }
+    if (CONFIG.amountField) {
+      var values = all.map(function (i) { return Number(i[CONFIG.amountField]) || 0; });
+      var sum = values.reduce(function (a, b) { return a + b; }, 0);
+      cards.push(stat("Total", format(CONFIG.amountField, sum)));
+      cards.push(stat("Average", format(CONFIG.amountField, values.length ? sum / values.length : 0)));
+      if (CONFIG.dateField) {
+        var month = new Date().toISOString().slice(0, 7);
+        var thisMonth = all.filter(function (i) { return String(i[CONFIG.dateField] || "").slice(0, 7) === month; })
+          .reduce(function (a, i) { return a + (Number(i[CONFIG.amountField]) || 0); }, 0);
+        cards.push(stat("This month", format(CONFIG.amountField, thisMonth)));
+      } else {
+        cards.push(stat("Highest", format(CONFIG.amountField, values.length ? Math.max.apply(null, values) : 0)));
+      }
+    }
+    $("stats").innerHTML = cards.join("");
+  }
+
+  function renderChart(all) {
+    var chart = $("chart");
+    if (!CONFIG.chart || !CONFIG.groupField || !all.length) { chart.hidden = true; return; }
+    var totals = {};
+    all.forEach(function (item) {
+      var key = item[CONFIG.groupField] || "Other";
+      totals[key] = (totals[key] || 0) + (CONFIG.amountField ? Number(item[CONFIG.amountField]) || 0 : 1);
+    });
+    var keys = Object.keys(totals).sort(function (a, b) { return totals[b] - totals[a]; });
+    var max = Math.max.apply(null, keys.map(function (k) { return Math.abs(totals[k]); })) || 1;
+    chart.innerHTML = '<h2 class="section-title">By ' + escapeHtml(field(CONFIG.groupField).label.toLowerCase()) + "</h2>" +
+      keys.map(function (k) {
+        var value = CONFIG.amountField ? format(CONFIG.amountField, totals[k]) : totals[k];
+        return '<div class="chart-row"><span>' + escapeHtml(k) + '</span><div class="chart-bar" style="width:' +
+          (Math.abs(totals[k]) / max * 100).toFixed(1) + '%"></div><span>' + escapeHtml(value) + "</span></div>";
+      }).join("");
+    chart.hidden = false;
+  }
+
+  function render() {
+    renderQueued = false;
+    var all = App.items.all();
+    var shown = visible(all);
+    renderFilters(all);
+    renderStats(all);
+    renderChart(all);
+    renderList(shown);
+    run("render", [all, shown]);
+  }
+
+  function scheduleRender() {
+    // Coalesce bursts of changes into one paint
+    if (renderQueued || !App.items) return;
+    renderQueued = true;
+    requestAnimationFrame(render);
+  }
+
+  // ---------------------------------------------------------------
+  // Init
+  // ---------------------------------------------------------------
+  function bindEvents() {
+    $("item-list").addEventListener("click", function (event) {
+      var button = event.target.closest("[data-action='delete']");
+      if (!button) return;
+      App.items.remove(button.closest(".item").dataset.id);
+      toast(CONFIG.itemLabel + " deleted", "error");
+    });
+    $("item-list").addEventListener("change", function (event) {
+      if (event.target.dataset.action !== "toggle") return;
+      var patch = {};
+      patch[CONFIG.toggleField] = event.target.checked;
+      App.items.update(event.target.closest(".item").dataset.id, patch);
+    });
+    $("filters").addEventListener("click", function (event) {
+      var button = event.target.closest("[data-filter]");
+      if (!button) return;
+      state.filter = button.dataset.filter;
+      scheduleRender();
+    });
+    $("search").addEventListener("input", function (event) {
+      state.search = event.target.value.trim();
+      scheduleRender();
+    });
+  }
+
+  async function init() {
+    buildForm();
+    bindEvents();
+    try {
+      var schema = {};
+      schema[CONFIG.collection] = { indexes: CONFIG.indexes };
+      App.db = await NexaData.open(CONFIG.appId, schema);
+      App.items = App.db.collection(CONFIG.collection);
+      if (!App.items.count() && CONFIG.seed && CONFIG.seed.length) App.items.addMany(CONFIG.seed);
+      App.items.subscribe(scheduleRender);
+      render();
+      resolveReady(App);
+      document.dispatchEvent(new CustomEvent("nexa:ready", { detail: App }));
+    } catch (e) {
+      console.error(e);
+      toast("Could not open local storage", "error");
+    } finally {
+      $("list-status").remove();
+    }
+  }
+
+  if (document.readyState === "loading") document.addEventListener("DOMContentLoaded", init);
+  else init();
+})();
@@ -0,0 +1,145 @@
+// app.js - NexaBuild portfolio skeleton (template v{{template_version}}).
+// Projects and contact messages live in NexaData collections.
+// App-specific behaviour belongs in features.js, through the window.App API.
+(function () {
+  "use strict";
+
+  var CONFIG = {{config}};
+
+  var hooks = { project: [], render: [], message: [] };
+  var state = { filter: "all" };
+  var renderQueued = false;
+  var resolveReady;
+
+  var App = window.App = {
+    config: CONFIG,
+    state: state,
+    db: null,
+    projects: null,
+    messages: null,
+    ready: new Promise(function (resolve) { resolveReady = resolve; }),
+    // on("project", fn(project, card)) | on("render", fn(projects)) | on("message", fn(record) -> false to cancel)
+    on: function (name, fn) { (hooks[name] = hooks[name] || []).push(fn); App.render(); return App; },
+    render: scheduleRender,
+    toast: toast,
+    escape: escapeHtml
+  };
+
+  function $(id) { return document.getElementById(id); }
+
+  function escapeHtml(value) {
+    return String(value == null ? "" : value).replace(/[&<>"']/g, function (c) {
+      return { "&": "&amp;", "<": "&lt;", ">": "&gt;", '"': "&quot;", "'": "&#39;" }[c];
+    });
+  }
+
+  function toast(message, kind) {
+    var el = document.createElement("div");
+    el.className = "toast " + (kind || "success");
+    el.textContent = message;
+    $("toast-root").appendChild(el);
+    setTimeout(function () { el.remove(); }, 2600);
+  }
+
+  function run(name, args) {
+    var ok = true;
+    (hooks[name] || []).forEach(function (fn) {
+      try { if (fn.apply(null, args) === false) ok = false; } catch (e) { console.error(e); }
+    });
+    return ok;
+  }
+
+  // ---------------------------------------------------------------
+  // Rendering
+  // ---------------------------------------------------------------
+  function renderFilters(all) {
+    var tags = {};
+    all.forEach(function (p) { (p.tags || []).forEach(function (t) { tags[t] = true; }); });
+    var options = ["all"].concat(Object.keys(tags).sort());
+    if (options.indexOf(state.filter) === -1) state.filter = "all";
+    $("project-filters").innerHTML = options.map(function (o) {
+      return '<button type="button" class="filter' + (o === state.filter ? " active" : "") + '" data-filter="' +
+        escapeHtml(o) + '">' + escapeHtml(o === "all" ? "All" : o) + "</button>";
+    }).join("");
+  }
+
+  function renderProjects(all) {
+    var shown = all.filter(function (p) { return state.filter === "all" || (p.tags || []).indexOf(state.filter) !== -1; })
+      .sort(function (a, b) { return (a.order || 0) - (b.order || 0); });
+    var fragment = document.createDocumentFragment();
+    shown.forEach(function (p) {
+      var card = document.createElement("article");
+      card.className = "card project";
+      card.dataset.id = p.id;
+      card.innerHTML = "<h3>" + escapeHtml(p.title) + "</h3><p>" + escapeHtml(p.description) + "</p>" +
+        '<div class="tags">' + (p.tags || []).map(function (t) { return '<span class="tag">' + escapeHtml(t) + "</span>"; }).join("") +
+        "</div>" + (p.url ? '<a class="btn" href="' + escapeHtml(p.url) + '" target="_blank" rel="noopener">Open</a>' : "");
+      run("project", [p, card]);
+      fragment.appendChild(card);
+    });
+    $("project-grid").replaceChildren(fragment);
+    $("project-empty").hidden = shown.length > 0;
+    return shown;
+  }
+
+  function render() {
+    renderQueued = false;
+    var all = App.projects.all();
+    renderFilters(all);
+    var shown = renderProjects(all);
+    var count = App.messages.count();
+    $("message-count").textContent = count ? count + " message(s) saved on this device." : "";
+    run("render", [all, shown]);
+  }
+
+  function scheduleRender() {
+    if (renderQueued || !App.projects) return;
+    renderQueued = true;
+    requestAnimationFrame(render);
+  }
+
+  // ---------------------------------------------------------------
+  // Init
+  // ---------------------------------------------------------------
+  function bindEvents() {
+    $("project-filters").addEventListener("click", function (event) {
+      var button = event.target.closest("[data-filter]");
+      if (!button) return;
+      state.filter = button.dataset.filter;
+      scheduleRender();
+    });
+    $("contact-form").addEventListener("submit", function (event) {
+      event.preventDefault();
+      var form = event.target;
+      var record = { name: form.elements.name.value.trim(), email: form.elements.email.value.trim(),
+        message: form.elements.message.value.trim() };
+      if (!run("message", [record])) return;
+      App.messages.add(record);
+      form.reset();
+      toast("Thanks! Your message was saved.");
+    });
+  }
+
+  async function init() {
+    $("year").textContent = new Date().getFullYear();
+    $("highlights").innerHTML = CONFIG.highlights.map(function (h) { return "<li>" + escapeHtml(h) + "</li>"; }).join("");
+    bindEvents();
+    try {
+      App.db = await NexaData.open(CONFIG.appId, { projects: { indexes: [] }, messages: { indexes: [] } });
+      App.projects = App.db.collection("projects");
+      App.messages = App.db.collection("messages");
+      if (!App.projects.count()) App.projects.addMany(CONFIG.projects);
+      App.projects.subscribe(scheduleRender);
+      App.messages.subscribe(scheduleRender);
+      render();
+      resolveReady(App);
+      document.dispatchEvent(new CustomEvent("nexa:ready", { detail: App }));
+    } catch (e) {
+      console.error(e);
+      toast("Could not open local storage", "error");
+    }
+  }
+
+  if (document.readyState === "loading") document.addEventListener("DOMContentLoaded", init);
+  else init();
+})();
@@ -0,0 +1,119 @@
+# agents/status.py
+# Where ProjectManager reports progress. The Streamlit UI renders the animated
+# agent card; headless workers record the same events on their job instead.
+
+import time
+
+
+class StatusReporter:
+    """No-op reporter; subclasses override what they need."""
+
+    def update(self, role, action, color, icon):
+        pass
+
+    def error(self, message):
+        pass
+
+    def pace(self, seconds):
+        """Pause so a human can follow the progress; headless reporters skip it."""
+
+    def clear(self):
+        pass
+
+
+class StreamlitReporter(StatusReporter):
+    """Animated agent card in an st.empty() placeholder, created on the first update."""
+
+    def __init__(self):
+        self.placeholder = None
+
+    def _box(self):
+        if self.placeholder is None:
+            import streamlit as st
+            self.placeholder = st.empty()
+        return self.placeholder
+
+    def update(self, role, action, color, icon):
+        html_code = f"""
+        <style>
+            @keyframes pulse-border {{
+                0% {{ border-color: {color}; box-shadow: 0 0 0px {color}; }}
+                50% {{ border-color: {color}; box-shadow: 0 0 20px {color}; }}
+                100% {{ border-color: {color}; box-shadow: 0 0 0px {color}; }}
+            }}
+            @keyframes blink {{
+                0% {{ opacity: 0.2; }}
+                20% {{ opacity: 1; }}
+                100% {{ opacity: 0.2; }}
+            }}
+            .agent-box {{
+                padding: 20px;
+                border-radius: 12px;
+                border: 2px solid {color};
+                background: linear-gradient(90deg, rgba(22, 27, 34, 0.9) 0%, rgba(22, 27, 34, 0.6) 100%);
+                display: flex;
+                align-items: center;
+                gap: 20px;
+                margin-bottom: 20px;
+                animation: pulse-border 2s infinite ease-in-out;
+            }}
+            .agent-icon {{
+                font-size: 2.5rem;
+                background: rgba(255,255,255,0.05);
+                padding: 10px;
+                border-radius: 50%;
+            }}
+            .agent-role {{
+                font-weight: bold;
+                font-size: 1.2rem;
+                color: {color};
+                margin-bottom: 5px;
+            }}
+            .agent-action {{
+                color: #c9d1d9;
+                font-family: monospace;
+            }}
+            .dot {{ font-weight: bold; font-size: 1.2rem; animation: blink 1.4s infinite both; }}
+            .d1 {{ animation-delay: 0s; }}
+            .d2 {{ animation-delay: 0.2s; }}
+            .d3 {{ animation-delay: 0.4s; }}
+        </style>
+
+        <div class="agent-box">
+            <div class="agent-icon">{icon}</div>
+            <div>
+                <div class="agent-role">{role}</div>
+                <div class="agent-action">
+                    {action}
+                    <span class="dot d1">.</span>
+                    <span class="dot d2">.</span>
+                    <span class="dot d3">.</span>
+                </div>
+            </div>
+        </div>
+        """
+        self._box().markdown(html_code, unsafe_allow_html=True)
+
+    def error(self, message):
+        self._box().error(message)
+
+    def pace(self, seconds):
+        time.sleep(seconds)
+
+    def clear(self):
+        if self.placeholder is not None:
+            self.placeholder.empty()
+
+
+class CallbackReporter(StatusReporter):
+    """Hands each event, as a JSON-ready dict, to `emit` (e.g. a job's event log)."""
+
+    def __init__(self, emit):
+        self.emit = emit
+
+    def update(self, role, action, color, icon):
+        self.emit({"type": "status", "role": role, "action": action, "color": color, "icon": icon,
+                   "time": time.time()})
+
+    def error(self, message):
+        self.emit({"type": "error", "message": message, "time": time.time()})
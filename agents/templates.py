@@ -0,0 +1,328 @@
+# agents/templates.py
+# Pre-built project skeletons for the archetypes we see constantly (todo lists,
+# trackers, dashboards, portfolios). The skeleton is filled from the plan and
+# design system; the Developer agent only writes the differential feature code.
+
+import copy
+import html
+import json
+import os
+import re
+
+TEMPLATES_VERSION = "1.0.0"
+SKELETON_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "skeletons")
+
+# A wrong skeleton ships the wrong app, so a match needs a keyword of weight >= STRONG_WEIGHT
+# and a clear lead over the runner-up; generic words ("track", "dashboard") only add weight
+STRONG_WEIGHT = 3
+MIN_STRONG = 1
+MIN_SCORE = 3
+MIN_MARGIN = 2
+
+# Files the model may write on top of a skeleton; everything else in the skeleton is fixed
+EDITABLE_FILES = ("features.js", "features.css")
+FIELD_TYPES = ("text", "number", "date", "select", "textarea")
+CONFIG_KEYS = {
+    "collection": ("itemLabel", "itemLabelPlural", "addLabel", "formTitle", "emptyText", "fields", "titleField",
+                   "amountField", "groupField", "dateField", "sortField", "sortDir", "chart", "currency", "seed"),
+    "portfolio": ("highlights", "projects"),
+}
+
+DEFAULT_FEATURES_JS = """// features.js - app-specific code on top of the skeleton (see window.App in app.js).
+App.ready.then(function (app) {
+});
+"""
+DEFAULT_FEATURES_CSS = "/* features.css - styles for app-specific UI */\n"
+
+ARCHETYPES = {
+    "todo": {
+        "skeleton": "collection",
+        "keywords": {"todo": 4, "to-do": 4, "checklist": 3, "task": 1, "tasks": 1, "chores": 3, "reminders": 2,
+                     "kanban": 2, "errands": 2, "shopping list": 3, "planner": 1},
+        "provides": ["add/complete/delete tasks", "due date and priority fields", "All/Active/Done filters",
+                     "search", "completed/remaining counters", "empty/loading states", "toasts", "persistence"],
+        "config": {
+            "collection": "tasks", "indexes": ["done"], "itemLabel": "Task", "itemLabelPlural": "Tasks",
+            "addLabel": "Add task", "formTitle": "Add a task", "emptyText": "Nothing to do yet. Add your first task above.",
+            "fields": [
+                {"name": "title", "label": "Task", "type": "text", "required": True, "placeholder": "What needs to be done?"},
+                {"name": "due", "label": "Due", "type": "date"},
+                {"name": "priority", "label": "Priority", "type": "select", "options": ["Medium", "High", "Low"]},
+            ],
+            "titleField": "title", "toggleField": "done", "amountField": None, "groupField": None, "dateField": "due",
+            "sortField": "createdAt", "sortDir": "desc", "chart": False, "currency": "", "seed": [],
+        },
+    },
+    "tracker": {
+        "skeleton": "collection",
+        "keywords": {"tracker": 3, "track": 1, "tracking": 1, "expense": 3, "expenses": 3, "budget": 3, "spending": 3,
+                     "habit": 3, "habits": 3, "workout": 3, "workouts": 3, "fitness": 2, "calorie": 3, "calories": 3, "mood": 2,
+                     "log": 1, "journal": 1, "water": 1, "sleep": 1, "savings": 2, "finance": 2},
+        "provides": ["add/delete entries with description, amount, category and date", "category filters", "search",
+                     "total/average/this-month stats", "per-category bar chart", "empty/loading states", "toasts",
+                     "persistence"],
+        "config": {
+            "collection": "entries", "indexes": ["category"], "itemLabel": "Entry", "itemLabelPlural": "Entries",
+            "addLabel": "Add entry", "formTitle": "Log an entry", "emptyText": "No entries yet. Log your first one above.",
+            "fields": [
+                {"name": "name", "label": "Description", "type": "text", "required": True, "placeholder": "e.g. Groceries"},
+                {"name": "amount", "label": "Amount", "type": "number", "required": True},
+                {"name": "category", "label": "Category", "type": "select",
+                 "options": ["General", "Food", "Transport", "Health", "Fun"]},
+                {"name": "date", "label": "Date", "type": "date", "defaultToday": True},
+            ],
+            "titleField": "name", "toggleField": None, "amountField": "amount", "groupField": "category",
+            "dateField": "date", "sortField": "date", "sortDir": "desc", "chart": True, "currency": "", "seed": [],
+        },
+    },
+    "dashboard": {
+        "skeleton": "collection",
+        "keywords": {"dashboard": 2, "admin dashboard": 3, "sales dashboard": 3, "analytics": 3, "kpi": 3, "kpis": 3, "metrics": 2, "admin": 2, "inventory": 3,
+                     "crm": 3, "sales": 2, "stock": 1, "report": 1, "reports": 1, "statistics": 2, "stats": 1},
+        "provides": ["add/delete records with label, value, category and date", "category filters", "search",
+                     "count/total/average/highest stat cards", "per-category bar chart", "empty/loading states",
+                     "toasts", "persistence"],
+        "config": {
+            "collection": "records", "indexes": ["category"], "itemLabel": "Record", "itemLabelPlural": "Records",
+            "addLabel": "Add record", "formTitle": "Add a record", "emptyText": "No data yet. Add a record to see your dashboard.",
+            "fields": [
+                {"name": "label", "label": "Label", "type": "text", "required": True},
+                {"name": "value", "label": "Value", "type": "number", "required": True},
+                {"name": "category", "label": "Category", "type": "text", "placeholder": "e.g. Q1"},
+            ],
+            "titleField": "label", "toggleField": None, "amountField": "value", "groupField": "category",
+            "dateField": None, "sortField": "createdAt", "sortDir": "desc", "chart": True, "currency": "", "seed": [],
+        },
+    },
+    "portfolio": {
+        "skeleton": "portfolio",
+        "keywords": {"portfolio": 4, "resume": 3, "cv": 3, "personal website": 3, "personal site": 3, "showcase": 2,
+                     "freelancer": 2, "photographer": 2, "designer portfolio": 2, "about me": 2},
+        "provides": ["sticky nav", "hero", "project grid with tag filters", "about/highlights section",
+                     "contact form saved locally", "footer", "persistence"],
+        "config": {
+            "highlights": [],
+            "projects": [
+                {"title": "Project One", "description": "A short summary of what this project does.", "tags": ["Web"], "order": 1},
+                {"title": "Project Two", "description": "What problem it solved and the result.", "tags": ["Design"], "order": 2},
+                {"title": "Project Three", "description": "Tools used and your role.", "tags": ["Web", "Design"], "order": 3},
+            ],
+        },
+    },
+}
+
+# What the model is told about each skeleton's extension points
+CONTRACTS = {
+    "collection": """
+- `window.App` (from app.js): `App.ready` (Promise resolving to App once data is loaded), `App.items` (the NexaData
+  collection), `App.db`, `App.config`, `App.state` ({filter, search}), `App.render()`, `App.toast(msg, "success"|"error")`,
+  `App.format(fieldName, value)`, `App.escape(str)`.
+- Hooks: `App.on("item", (item, li) => ...)` decorates each list row, `App.on("render", (all, visible) => ...)` runs after
+  every render, `App.on("save", record => ...)` can modify a new record or return false to reject it.
+- Element ids: #stats, #item-form, #chart, #filters, #search, #item-list, #empty-state, #feature-root (empty, for extra UI).
+- CSS variables: --primary, --secondary, --bg, --surface, --text, --muted, --error, --success, --radius.
+  Classes: .card, .btn, .item, .stat, .empty-state, .fade-in.
+- `config` overrides (all optional): itemLabel, itemLabelPlural, addLabel, formTitle, emptyText,
+  fields ([{name, label, type: text|number|date|select|textarea, required?, options? (select), placeholder?, defaultToday?}]),
+  titleField, amountField, groupField, dateField, sortField, sortDir ("asc"|"desc"), chart (bool), currency (e.g. "$"), seed (list of records).
+""",
+    "portfolio": """
+- `window.App` (from app.js): `App.ready` (Promise resolving to App once data is loaded), `App.projects` and
+  `App.messages` (NexaData collections), `App.db`, `App.config`, `App.render()`, `App.toast(msg, "success"|"error")`, `App.escape(str)`.
+- Hooks: `App.on("project", (project, card) => ...)`, `App.on("render", (all, shown) => ...)`,
+  `App.on("message", record => ...)` (return false to reject a contact message).
+- Element ids: #projects, #project-filters, #project-grid, #about, #highlights, #contact, #contact-form, #feature-root (empty, for extra UI).
+- CSS variables: --primary, --secondary, --bg, --surface, --text, --muted, --error, --success, --radius.
+  Classes: .card, .btn, .project, .tag, .empty-state, .fade-in.
+- `config` overrides (all optional): highlights (list of strings for the About section),
+  projects ([{title, description, tags: [..], url?, order}]) shown until the visitor's data exists.
+""",
+}
+
+_skeletons = {}
+
+
+def _load_skeleton(kind):
+    if kind not in _skeletons:
+        root = os.path.join(SKELETON_DIR, kind)
+        files = {}
+        for name in sorted(os.listdir(root)):
+            with open(os.path.join(root, name), encoding="utf-8") as f:
+                files[name] = f.read()
+        _skeletons[kind] = files
+    return _skeletons[kind]
+
+
+def _match_text(plan, prompt=""):
+    # Only what the user asked for: generated feature/page text borrows words from
+    # the planner's own examples ("dashboard") and would pick skeletons by itself
+    name = plan.get("project_name", "") if isinstance(plan, dict) else ""
+    return f"{prompt or ''} {name}".lower()
+
+
+def match_archetype(plan, prompt=""):
+    """Returns (archetype, score) for a confident match, or (None, best_score)."""
+    text = _match_text(plan, prompt)
+    scores, strong = {}, {}
+    for name, archetype in ARCHETYPES.items():
+        hits = [weight for keyword, weight in archetype["keywords"].items()
+                if re.search(rf"\b{re.escape(keyword)}\b", text)]
+        scores[name] = sum(hits)
+        strong[name] = sum(1 for weight in hits if weight >= STRONG_WEIGHT)
+    ranked = sorted(scores.items(), key=lambda kv: kv[1], reverse=True)
+    (best, best_score), (_, runner_up) = ranked[0], ranked[1]
+    if strong[best] >= MIN_STRONG and best_score >= MIN_SCORE and best_score - runner_up >= MIN_MARGIN:
+        return best, best_score
+    return None, best_score
+
+
+# -----------------------------------------------------
+# Config
+# -----------------------------------------------------
+def _valid_fields(fields):
+    if not isinstance(fields, list) or not fields:
+        return False
+    names = set()
+    for f in fields:
+        if not isinstance(f, dict) or not re.match(r"^[A-Za-z_]\w*$", str(f.get("name", ""))):
+            return False
+        if f.get("type", "text") not in FIELD_TYPES or not f.get("label"):
+            return False
+        if f.get("type") == "select" and not (isinstance(f.get("options"), list) and f["options"]):
+            return False
+        names.add(f["name"])
+    return len(names) == len(fields)
+
+
+def _valid_collection_config(config):
+    if not _valid_fields(config["fields"]):
+        return False
+    names = {f["name"] for f in config["fields"]}
+    if config["titleField"] not in names:
+        return False
+    for key in ("amountField", "groupField", "dateField"):
+        if config.get(key) and config[key] not in names:
+            return False
+    if config["amountField"] and next(f for f in config["fields"] if f["name"] == config["amountField"]).get("type") != "number":
+        return False
+    return isinstance(config.get("seed"), list)
+
+
+def _valid_portfolio_config(config):
+    projects = config.get("projects")
+    return isinstance(config.get("highlights"), list) and isinstance(projects, list) and \
+        all(isinstance(p, dict) and p.get("title") for p in projects)
+
+
+def build_config(name, plan, overrides=None):
+    """The archetype's default config, filled from the plan, with validated model overrides."""
+    archetype = ARCHETYPES[name]
+    kind = archetype["skeleton"]
+    config = copy.deepcopy(archetype["config"])
+    project = str((plan or {}).get("project_name") or "NexaBuild App")
+    config["appId"] = "nexa-" + (re.sub(r"[^a-z0-9]+", "-", project.lower()).strip("-") or name)
+    if kind == "portfolio":
+        config["highlights"] = [str(f) for f in (plan or {}).get("features", [])][:6]
+    if isinstance(overrides, dict):
+        candidate = dict(config)
+        candidate.update({k: v for k, v in overrides.items() if k in CONFIG_KEYS[kind]})
+        valid = _valid_portfolio_config(candidate) if kind == "portfolio" else _valid_collection_config(candidate)
+        if valid:
+            config = candidate
+        else:
+            print(f"Template config overrides for '{name}' rejected; using defaults")
+    if kind == "collection":
+        # Filters and the chart rely on indexed lookups
+        config["indexes"] = sorted({i for i in config["indexes"] + [config.get("groupField"), config.get("toggleField")] if i})
+    return config
+
+
+# -----------------------------------------------------
+# Rendering
+# -----------------------------------------------------
+def _luminance(color):
+    """Relative luminance (0-1) of a #rgb/#rrggbb color, or None if it isn't one."""
+    color = str(color).strip()
+    color = {"white": "#fff", "black": "#000"}.get(color.lower(), color)
+    m = re.fullmatch(r"#?([0-9a-fA-F]{3}|[0-9a-fA-F]{6})", color)
+    if not m:
+        return None
+    digits = m.group(1) if len(m.group(1)) == 6 else "".join(c * 2 for c in m.group(1))
+    channels = []
+    for i in (0, 2, 4):
+        c = int(digits[i:i + 2], 16) / 255
+        channels.append(c / 12.92 if c <= 0.03928 else ((c + 0.055) / 1.055) ** 2.4)
+    return 0.2126 * channels[0] + 0.7152 * channels[1] + 0.0722 * channels[2]
+
+
+def _palette_vars(design):
+    palette = (design or {}).get("color_palette") or {}
+    bg = palette.get("background", "#0a0a12")
+    # LLM palettes usually have no text colors; pick them by the background's contrast
+    light = (_luminance(bg) or 0) > 0.4
+    values = {
+        "primary": palette.get("primary", "#00f3ff"), "secondary": palette.get("secondary", "#bc13fe"),
+        "bg": bg, "surface": palette.get("surface", "#141425"),
+        "error": palette.get("error", "#ff3860"), "success": palette.get("success", "#00ff99"),
+        "text": palette.get("text", "#1a1d2e" if light else "#e8ecff"),
+        "muted": palette.get("muted", "#6b7085" if light else "#5a5f7a"), "radius": "10px",
+    }
+    return ":root {\n" + "".join(f"  --{k}: {v};\n" for k, v in values.items()) + "}"
+
+
+def _subtitle(plan):
+    for page in (plan or {}).get("pages", []) or []:
+        if isinstance(page, dict) and page.get("description"):
+            return str(page["description"])
+    features = (plan or {}).get("features") or []
+    return str(features[0]) if features else ""
+
+
+def render_template(name, plan, design, overrides=None):
+    """Returns the skeleton's {filename: content}, parameterized by the plan and design system."""
+    archetype = ARCHETYPES[name]
+    config = build_config(name, plan, overrides)
+    values = {
+        "title": html.escape(str((plan or {}).get("project_name") or "NexaBuild App")),
+        "subtitle": html.escape(_subtitle(plan)),
+        "form_title": html.escape(config.get("formTitle", "")),
+        "empty_text": html.escape(config.get("emptyText", "")),
+        "archetype": name,
+        "template_version": TEMPLATES_VERSION,
+        # </script> can't appear in the JSON, so it can't end the script early
+        "config": json.dumps(config, indent=2).replace("</", "<\\/"),
+        "palette_vars": _palette_vars(design),
+        "design_css": str((design or {}).get("css_rules") or ""),
+    }
+    files = {}
+    for filename, source in _load_skeleton(archetype["skeleton"]).items():
+        # Single pass, so substituted values are never re-scanned for placeholders
+        files[filename] = re.sub(r"\{\{(\w+)\}\}", lambda m: values.get(m.group(1), m.group(0)), source)
+    files["features.js"] = DEFAULT_FEATURES_JS
+    files["features.css"] = DEFAULT_FEATURES_CSS
+    return files
+
+
+def apply_differential(name, plan, design, diff):
+    """
+    Builds the project from the skeleton plus the model's differential output:
+    {"config": {...}, "features.js": "...", "features.css": "...", "<new file>": "..."}.
+    Skeleton files other than EDITABLE_FILES are never overwritten.
+    """
+    diff = diff if isinstance(diff, dict) else {}
+    files = render_template(name, plan, design, diff.get("config"))
+    skeleton_files = set(files)
+    for filename, content in diff.items():
+        if filename == "config" or not isinstance(content, str):
+            continue
+        if filename in skeleton_files and filename not in EDITABLE_FILES:
+            continue
+        files[filename] = content
+    return files
+
+
+def template_brief(name):
+    """Prompt text describing what the skeleton already does and how to extend it."""
+    archetype = ARCHETYPES[name]
+    return (f"Skeleton: {name} (v{TEMPLATES_VERSION}). Already implemented and tested: "
+            + "; ".join(archetype["provides"]) + ".\n" + CONTRACTS[archetype["skeleton"]])
@@ -0,0 +1,110 @@
+# agents/variants.py
+# Best-of-K code generation: K Developer calls run concurrently with different
+# sampling temperatures (and optionally models), each result is scored locally,
+# and the first variant that clears the quality bar wins -- the rest are
+# dropped without waiting for them.
+
+import contextvars
+import os
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+
+from ai.audit import audit_project
+from ai.config import DEFAULT_MODEL
+from ai.validate import validate_project
+
+# Temperatures handed out to variants in order; models rotate the same way
+VARIANT_TEMPERATURES = (0.4, 0.8, 1.0, 0.6)
+VARIANT_MODELS = [m.strip() for m in os.environ.get("NEXABUILD_VARIANT_MODELS", DEFAULT_MODEL).split(",") if m.strip()]
+QUALITY_BAR = int(os.environ.get("NEXABUILD_VARIANT_QUALITY_BAR", "85"))
+MAX_VARIANTS = 4
+
+
+def variant_specs(k):
+    """[(model, temperature)] for K variants."""
+    return [(VARIANT_MODELS[i % len(VARIANT_MODELS)], VARIANT_TEMPERATURES[i % len(VARIANT_TEMPERATURES)])
+            for i in range(k)]
+
+
+# -----------------------------------------------------
+# Local scoring
+# -----------------------------------------------------
+def score_files(files):
+    """
+    Scores one generated project without running it: ai/validate.py checks that it
+    parses into a project with an HTML entry point, that the HTML and JS are well
+    formed and that ids, classes and asset links resolve across files; the static
+    performance audit contributes the rest. Returns {"score", "passed", "checks"}.
+    """
+    checks = {"parse": False, "errors": 0, "warnings": 0, "issues": [], "audit_score": 0}
+    if not isinstance(files, dict) or not files:
+        return {"score": 0, "passed": False, "checks": checks}
+    report = validate_project(files)
+    checks.update(parse=not any(i["rule"] == "no-html-entry" for i in report["issues"]),
+                  errors=report["counts"]["error"], warnings=report["counts"]["warning"],
+                  issues=[f"{i['file']}:{i['line'] or ''} {i['message']}" for i in report["issues"]][:5])
+    if not checks["parse"]:
+        return {"score": 0, "passed": False, "checks": checks}
+    checks["audit_score"] = audit_project(files)["score"]
+    score = round(0.7 * report["score"] + 0.3 * checks["audit_score"])
+    passed = report["ok"] and score >= QUALITY_BAR
+    return {"score": score, "passed": passed, "checks": checks}
+
+
+# -----------------------------------------------------
+# Generation
+# -----------------------------------------------------
+def generate_variants(make_developer, plan, design, k, finish=None, on_result=None, prompt=""):
+    """
+    Runs K `write_code` calls at once and returns (best_files, developer, report).
+    `make_developer(model, temperature)` builds each Developer; `finish(files)`
+    post-processes a variant before it is scored (e.g. injecting the data layer);
+    `on_result(summary)` is called from this thread as each variant lands; `prompt`
+    is the user's request, used to pick a project skeleton.
+    In-flight model calls cannot be aborted, so late variants are simply ignored.
+    """
+    k = max(1, min(k, MAX_VARIANTS))
+    started = time.time()
+    executor = ThreadPoolExecutor(max_workers=k, thread_name_prefix="nexabuild-variant")
+
+    def run(index, model, temperature):
+        developer = make_developer(model, temperature)
+        t0 = time.time()
+        try:
+            files = developer.write_code(plan, design, user_prompt=prompt)
+        except Exception as e:
+            print(f"Variant {index + 1} failed: {e}")
+            files = {}
+        if files and finish:
+            files = finish(files)
+        return index, developer, files, round(time.time() - t0, 2)
+
+    pending = {}
+    for i, (model, temperature) in enumerate(variant_specs(k)):
+        # Each thread needs its own copy of the caller's context (token session/tenant)
+        pending[executor.submit(contextvars.copy_context().run, run, i, model, temperature)] = (model, temperature)
+
+    results, best = [], None
+    try:
+        while pending:
+            done, _ = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                model, temperature = pending.pop(future)
+                index, developer, files, seconds = future.result()
+                scored = score_files(files)
+                summary = {"variant": index + 1, "model": model, "temperature": temperature, "seconds": seconds,
+                           "score": scored["score"], "passed": scored["passed"], "checks": scored["checks"]}
+                results.append(summary)
+                if on_result:
+                    on_result(summary)
+                if best is None or scored["score"] > best[0]["score"]:
+                    best = (summary, developer, files)
+            if best and best[0]["passed"]:
+                break
+    finally:
+        executor.shutdown(wait=False, cancel_futures=True)
+
+    summary, developer, files = best
+    report = {"picked": summary["variant"], "score": summary["score"], "passed": summary["passed"],
+              "variants": results, "cancelled": len(pending), "seconds": round(time.time() - started, 2)}
+    return files, developer, report
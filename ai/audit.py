@@ -0,0 +1,267 @@
+# ai/audit.py
+# Offline static performance audit of a generated project.
+# Pure Python, no browser: looks for the patterns that make generated apps slow.
+
+import re
+from html.parser import HTMLParser
+
+from ai.build import collect_used_names, purge_css
+from ai.jslex import JSLexError, tokenize
+
+SEVERITY_WEIGHTS = {"error": 15, "warning": 7, "info": 2}
+INLINE_ASSET_LIMIT = 20 * 1024   # inline <style>/<script> bodies
+DATA_URI_LIMIT = 10 * 1024       # base64 images/fonts embedded in HTML/CSS
+UNUSED_CSS_REPORT_LIMIT = 10     # selectors listed in one finding
+
+LOOP_KEYWORDS = {"for", "while"}
+LOOP_METHODS = {"forEach", "map", "filter", "reduce", "some", "every", "find", "findIndex", "flatMap"}
+STORAGE_APIS = {"localStorage", "sessionStorage"}
+
+
+def _finding(rule, severity, file, message, line=None):
+    return {"rule": rule, "severity": severity, "file": file, "line": line, "message": message}
+
+
+# -----------------------------------------------------
+# HTML checks
+# -----------------------------------------------------
+class _HTMLScan(HTMLParser):
+    def __init__(self):
+        super().__init__()
+        self.in_head = False
+        self.blocking_scripts = []
+        self.inline = []  # (tag, line, size)
+        self._open = None
+
+    def handle_starttag(self, tag, attrs):
+        attrs = dict(attrs)
+        if tag == "head":
+            self.in_head = True
+        elif tag == "body":
+            self.in_head = False
+        if tag == "script":
+            script_type = (attrs.get("type") or "").lower()
+            if attrs.get("src") and self.in_head and "defer" not in attrs and "async" not in attrs \
+                    and script_type != "module":
+                self.blocking_scripts.append((attrs["src"], self.getpos()[0]))
+            if not attrs.get("src"):
+                self._open = ("script", self.getpos()[0], 0)
+        elif tag == "style":
+            self._open = ("style", self.getpos()[0], 0)
+
+    def handle_endtag(self, tag):
+        if tag == "head":
+            self.in_head = False
+        if self._open and tag == self._open[0]:
+            self.inline.append(self._open)
+            self._open = None
+
+    def handle_data(self, data):
+        if self._open:
+            tag, line, size = self._open
+            self._open = (tag, line, size + len(data.encode("utf-8")))
+
+
+def _audit_html(name, html):
+    findings = []
+    scan = _HTMLScan()
+    try:
+        scan.feed(html)
+        scan.close()
+    except Exception:
+        return findings
+
+    for src, line in scan.blocking_scripts:
+        findings.append(_finding(
+            "render-blocking-script", "warning", name,
+            f"<script src=\"{src}\"> in <head> blocks rendering; add `defer` or move it to the end of <body>.", line))
+    for tag, line, size in scan.inline:
+        if size > INLINE_ASSET_LIMIT:
+            findings.append(_finding(
+                "oversized-inline-asset", "warning", name,
+                f"Inline <{tag}> is {size // 1024}KB; move it to its own file so the browser can cache it.", line))
+    findings.extend(_audit_data_uris(name, html))
+    return findings
+
+
+def _audit_data_uris(name, text):
+    findings = []
+    for m in re.finditer(r"data:[\w/+.-]+;base64,([A-Za-z0-9+/=]+)", text):
+        size = len(m.group(1)) * 3 // 4
+        if size > DATA_URI_LIMIT:
+            line = text.count("\n", 0, m.start()) + 1
+            findings.append(_finding(
+                "oversized-inline-asset", "warning", name,
+                f"Embedded data URI is {size // 1024}KB; ship it as a separate file instead.", line))
+    return findings
+
+
+# -----------------------------------------------------
+# CSS checks
+# -----------------------------------------------------
+def _audit_css(name, css, used):
+    findings = _audit_data_uris(name, css)
+    for m in re.finditer(r"@import\b", css):
+        findings.append(_finding(
+            "css-import", "info", name,
+            "@import chains stylesheet downloads; link the file directly from the HTML.",
+            css.count("\n", 0, m.start()) + 1))
+    dropped = []
+    purge_css(css, used, dropped)
+    if dropped:
+        sample = ", ".join(dropped[:UNUSED_CSS_REPORT_LIMIT]) + (" ..." if len(dropped) > UNUSED_CSS_REPORT_LIMIT else "")
+        findings.append(_finding(
+            "unused-css", "info" if len(dropped) < 10 else "warning", name,
+            f"{len(dropped)} selector(s) match nothing in the HTML/JS: {sample}"))
+    return findings
+
+
+# -----------------------------------------------------
+# JS checks
+# -----------------------------------------------------
+def _significant(tokens):
+    line = 1
+    for kind, text in tokens:
+        if kind == "newline":
+            line += 1
+        elif kind in ("comment", "template"):
+            if kind == "template":
+                yield kind, text, line
+            line += text.count("\n")
+        elif kind != "space":
+            yield kind, text, line
+
+
+def _audit_js(name, js):
+    try:
+        tokens = list(_significant(tokenize(js)))
+    except JSLexError as e:
+        return [_finding("js-syntax", "error", name, f"Could not tokenize script: {e}", e.line)]
+
+    findings = []
+    listeners = {}
+    # One entry per open '{': {"loop": bool, "get": line|None, "set": line|None}
+    blocks = []
+    pending_loop = None  # paren depth at which a loop header/callback started
+    paren_depth = 0
+    reported_loops = set()
+
+    def in_loop():
+        return any(b["loop"] for b in blocks)
+
+    for i, (kind, text, line) in enumerate(tokens):
+        nxt = tokens[i + 1][1] if i + 1 < len(tokens) else ""
+        prev = tokens[i - 1][1] if i else ""
+
+        if kind == "word" and (text in LOOP_KEYWORDS or (text in LOOP_METHODS and prev == "." and nxt == "(")):
+            pending_loop = paren_depth
+        elif kind == "punct":
+            if text == "(":
+                paren_depth += 1
+            elif text == ")":
+                paren_depth -= 1
+            elif text == "{":
+                blocks.append({"loop": pending_loop is not None, "get": None, "set": None})
+                pending_loop = None
+            elif text == "}" and blocks:
+                block = blocks.pop()
+                if block["get"] and block["set"] and not block["loop"]:
+                    findings.append(_finding(
+                        "storage-read-modify-write", "warning", name,
+                        "Reads, parses and rewrites the whole stored collection for a single change "
+                        "(O(n) per write). Keep the collection in memory and batch/debounce the save.",
+                        block["get"]))
+            elif text == ";" and pending_loop is not None and paren_depth == pending_loop:
+                pending_loop = None  # brace-less loop body ended
+
+        if kind == "word" and text in STORAGE_APIS and nxt == ".":
+            method = tokens[i + 2][1] if i + 2 < len(tokens) else ""
+            if method in ("getItem", "setItem", "removeItem"):
+                if blocks:
+                    key = "get" if method == "getItem" else "set"
+                    blocks[-1][key] = blocks[-1][key] or line
+                if in_loop() and line not in reported_loops:
+                    reported_loops.add(line)
+                    findings.append(_finding(
+                        "storage-in-loop", "error", name,
+                        f"{text}.{method} runs inside a loop; every iteration does synchronous storage I/O "
+                        "and JSON (de)serialization. Read once before the loop and write once after it.", line))
+
+        if kind == "word" and text == "innerHTML" and prev == "." and nxt == "+" and in_loop():
+            findings.append(_finding(
+                "dom-write-in-loop", "warning", name,
+                "`innerHTML +=` inside a loop re-parses the element each iteration; build a string or "
+                "DocumentFragment and assign once.", line))
+
+        if kind == "word" and text == "addEventListener" and prev == ".":
+            # Key on the receiver expression and event name
+            j = i - 2
+            receiver = []
+            while j >= 0 and tokens[j][1] not in (";", "{", "}", "=", "(", ",") and len(receiver) < 12:
+                receiver.insert(0, tokens[j][1])
+                j -= 1
+            event = tokens[i + 2][1] if i + 2 < len(tokens) and tokens[i + 2][0] == "string" else None
+            if event:
+                key = ("".join(receiver), event.strip("'\""))
+                listeners.setdefault(key, []).append(line)
+                if in_loop():
+                    findings.append(_finding(
+                        "listener-in-loop", "info", name,
+                        f"addEventListener('{key[1]}') inside a loop; delegate to one listener on the parent.",
+                        line))
+
+    for (receiver, event), lines in listeners.items():
+        if len(lines) > 1:
+            findings.append(_finding(
+                "duplicate-listener", "warning", name,
+                f"{receiver or 'element'} gets {len(lines)} '{event}' listeners (lines {', '.join(map(str, lines))}); "
+                "handlers run multiple times per event.", lines[0]))
+    return findings
+
+
+# -----------------------------------------------------
+# Public API
+# -----------------------------------------------------
+def audit_project(files):
+    """
+    Runs every check over a {filename: content} dict.
+    Returns {"score": 0-100, "findings": [...], "counts": {severity: n}}.
+    """
+    findings = []
+    used = collect_used_names(files)
+    for name in sorted(files):
+        content = files[name]
+        if not isinstance(content, str):
+            continue
+        lower = name.lower()
+        if lower.endswith((".html", ".htm")):
+            findings.extend(_audit_html(name, content))
+            for m in re.finditer(r"<script(?![^>]*\bsrc=)[^>]*>(.*?)</script>", content, re.S | re.I):
+                offset = content.count("\n", 0, m.start(1))
+                for f in _audit_js(name, m.group(1)):
+                    f["line"] = f["line"] + offset if f["line"] else None
+                    findings.append(f)
+        elif lower.endswith(".css"):
+            findings.extend(_audit_css(name, content, used))
+        elif lower.endswith((".js", ".mjs")):
+            findings.extend(_audit_js(name, content))
+
+    counts = {sev: 0 for sev in SEVERITY_WEIGHTS}
+    for f in findings:
+        counts[f["severity"]] += 1
+    score = max(0, 100 - sum(SEVERITY_WEIGHTS[f["severity"]] for f in findings))
+    order = list(SEVERITY_WEIGHTS)
+    findings.sort(key=lambda f: (order.index(f["severity"]), f["file"], f["line"] or 0))
+    return {"score": score, "findings": findings, "counts": counts}
+
+
+def optimization_request(report, max_findings=10):
+    """Turns audit findings into an edit request for Developer.modify_code."""
+    actionable = [f for f in report["findings"] if f["severity"] != "info"][:max_findings]
+    if not actionable:
+        return None
+    lines = [f"- [{f['file']}{':' + str(f['line']) if f['line'] else ''}] {f['message']}" for f in actionable]
+    return (
+        "Performance pass: fix ONLY these issues found by a static audit, keep all features and the design "
+        "unchanged, and return only the files you change.\n" + "\n".join(lines)
+    )
@@ -0,0 +1,418 @@
+# ai/build.py
+# Optional production build between generation and export/deploy:
+# minify HTML/CSS/JS, purge unused CSS rules and emit precompressed siblings.
+
+import gzip
+import re
+from html.parser import HTMLParser
+
+from ai.jslex import JSLexError, tokenize
+
+try:
+    import brotli  # optional, only needed for .br siblings
+except ImportError:
+    brotli = None
+
+PRECOMPRESS_EXTS = (".html", ".htm", ".css", ".js", ".mjs", ".json", ".svg", ".txt", ".xml")
+PRECOMPRESS_MIN_BYTES = 1024  # smaller files aren't worth an extra request path on the server
+# At-rules whose blocks hold rules (purged recursively); every other at-rule is kept verbatim
+NESTED_AT_RULES = ("@media", "@supports", "@layer", "@container", "@document")
+
+
+# -----------------------------------------------------
+# CSS
+# -----------------------------------------------------
+def _css_pieces(css):
+    """Splits CSS into ('string', ...), ('comment', ...) and ('code', ...) pieces."""
+    out = []
+    i, n = 0, len(css)
+    start = 0
+    while i < n:
+        c = css[i]
+        if c == "/" and css.startswith("/*", i):
+            if start < i:
+                out.append(("code", css[start:i]))
+            end = css.find("*/", i + 2)
+            end = n if end < 0 else end + 2
+            out.append(("comment", css[i:end]))
+            i = start = end
+        elif c in "\"'":
+            if start < i:
+                out.append(("code", css[start:i]))
+            j = i + 1
+            while j < n and css[j] != c:
+                j += 2 if css[j] == "\\" else 1
+            j = min(j + 1, n)
+            out.append(("string", css[i:j]))
+            i = start = j
+        else:
+            i += 1
+    if start < n:
+        out.append(("code", css[start:]))
+    return out
+
+
+def minify_css(css):
+    out = []
+    for kind, text in _css_pieces(css):
+        if kind == "comment":
+            # Keep /*! license */ comments
+            if text.startswith("/*!"):
+                out.append(text)
+            continue
+        if kind == "code":
+            text = re.sub(r"\s+", " ", text)
+            text = re.sub(r" ?([{};,>]) ?", r"\1", text)
+            # Spaces around ':' only go inside declaration blocks; in selectors "a :hover" differs from "a:hover"
+            text = re.sub(r"\{[^{}]*\}", lambda m: re.sub(r" ?: ?", ":", m.group()), text)
+            text = text.replace(";}", "}")
+        out.append(text)
+    return "".join(out).strip()
+
+
+def _split_rules(css):
+    """
+    Splits a (comment-free) stylesheet into top-level (prelude, body) pairs.
+    Declaration blocks are returned as-is; nested at-rule bodies are returned raw.
+    """
+    rules = []
+    i, n = 0, len(css)
+    start = 0
+    while i < n:
+        c = css[i]
+        if c in "\"'":
+            j = i + 1
+            while j < n and css[j] != c:
+                j += 2 if css[j] == "\\" else 1
+            i = j + 1
+            continue
+        if c == ";" and css[start:i].strip().startswith("@"):
+            # Block-less at-rule such as @import / @charset
+            rules.append((css[start:i + 1].strip(), None))
+            start = i + 1
+        elif c == "{":
+            depth = 1
+            j = i + 1
+            while j < n and depth:
+                if css[j] in "\"'":
+                    q = css[j]
+                    j += 1
+                    while j < n and css[j] != q:
+                        j += 2 if css[j] == "\\" else 1
+                elif css[j] == "{":
+                    depth += 1
+                elif css[j] == "}":
+                    depth -= 1
+                j += 1
+            rules.append((css[start:i].strip(), css[i + 1:j - 1]))
+            i = start = j
+            continue
+        i += 1
+    tail = css[start:].strip()
+    if tail:
+        rules.append((tail, None))
+    return rules
+
+
+_SELECTOR_TOKEN = re.compile(r"([.#])(-?[_a-zA-Z][\w-]*)")
+
+
+def _selector_outline(selector):
+    """
+    Yields (char, top_level) for a selector list. Quoted strings, [attr] selectors and
+    pseudo-class arguments are not top level: a '.' or '#' there is not a class or id.
+    """
+    depth, quote = 0, None
+    chars = iter(selector)
+    for c in chars:
+        if quote:
+            if c == "\\":
+                yield c, False
+                c = next(chars, "")
+            elif c == quote:
+                quote = None
+        elif c in "\"'":
+            quote = c
+        elif c in "[(":
+            depth += 1
+        elif c in "])":
+            depth = max(depth - 1, 0)
+            yield c, False
+            continue
+        yield c, not quote and depth == 0 and c not in "\"'[("
+
+
+def _split_selectors(prelude):
+    """Splits a selector list on top-level commas only (not inside :is(), [attr="a,b"], ...)."""
+    parts, current = [], []
+    for c, top in _selector_outline(prelude):
+        if c == "," and top:
+            parts.append("".join(current))
+            current = []
+        else:
+            current.append(c)
+    parts.append("".join(current))
+    return [p.strip() for p in parts if p.strip()]
+
+
+def _selector_used(selector, used):
+    if "\\" in selector:
+        return True  # escaped names (.sm\:p-4) can't be matched against the used set; keep them
+    # Only top-level classes/ids count: :not()/:is() arguments don't have to match for the
+    # rule to apply, and attribute values or strings like [href$=".pdf"] are not selectors
+    outline = "".join(c if top else " " for c, top in _selector_outline(selector))
+    for kind, name in _SELECTOR_TOKEN.findall(outline):
+        if name not in used:
+            return False
+    return True
+
+
+def collect_used_names(files):
+    """
+    Class names and ids that the HTML and JS can produce. JS is scanned loosely
+    (every identifier-like word in strings and code) so dynamically added classes survive.
+    """
+    used = set()
+    for name, content in files.items():
+        lower = name.lower()
+        if lower.endswith((".html", ".htm")):
+            for value in re.findall(r"""\b(?:class|id)\s*=\s*(?:"([^"]*)"|'([^']*)'|([^\s>]+))""", content):
+                used.update(" ".join(value).split())
+            # Inline scripts can add classes too
+            used.update(re.findall(r"[\w-]+", " ".join(re.findall(r"<script[^>]*>(.*?)</script>", content, re.S))))
+        elif lower.endswith((".js", ".mjs")):
+            used.update(re.findall(r"[\w-]+", content))
+    return used
+
+
+def purge_css(css, used, dropped=None):
+    """
+    Drops style rules whose selectors reference classes/ids that never appear in `used`.
+    Removed selectors are appended to `dropped` when a list is passed.
+    """
+    css = "".join(text for kind, text in _css_pieces(css) if kind != "comment")
+    out = []
+    for prelude, body in _split_rules(css):
+        if body is None:
+            out.append(prelude if prelude.endswith(";") or not prelude.startswith("@") else prelude + ";")
+            continue
+        if prelude.startswith("@"):
+            if prelude.lower().startswith(NESTED_AT_RULES):
+                inner = purge_css(body, used, dropped)
+                if inner.strip():
+                    out.append(f"{prelude}{{{inner}}}")
+            else:
+                out.append(f"{prelude}{{{body}}}")  # @keyframes, @font-face, @page...
+            continue
+        selectors = _split_selectors(prelude)
+        kept = [s for s in selectors if _selector_used(s, used)]
+        if dropped is not None:
+            dropped.extend(s for s in selectors if s not in kept)
+        if kept:
+            out.append(f"{','.join(kept)}{{{body}}}")
+    return "\n".join(out)
+
+
+# -----------------------------------------------------
+# JS
+# -----------------------------------------------------
+def minify_js(js):
+    """
+    Conservative minifier: drops comments and redundant whitespace but keeps line
+    breaks, so automatic semicolon insertion behaves exactly as in the source.
+    Returns the input unchanged if it can't be tokenized.
+    """
+    try:
+        tokens = list(tokenize(js))
+    except JSLexError:
+        return js
+
+    out = []
+    pending_space = False
+    for kind, text in tokens:
+        if kind == "comment":
+            if text.startswith("/*!"):
+                out.append(text)
+            elif text.startswith("/*") and any(c in text for c in "\n\r\u2028\u2029"):
+                # A multi-line comment is a line terminator for ASI: `return /*\n*/ x` returns undefined
+                if out and out[-1] != "\n":
+                    out.append("\n")
+                pending_space = False
+            else:
+                pending_space = True
+            continue
+        if kind == "space":
+            pending_space = True
+            continue
+        if kind == "newline":
+            if out and out[-1] != "\n":
+                out.append("\n")
+            pending_space = False
+            continue
+        if pending_space and out and out[-1] != "\n":
+            prev = out[-1][-1]
+            # Only keep a space where removing it would merge two tokens
+            if (prev.isalnum() or prev in "_$") and (text[0].isalnum() or text[0] in "_$\\"):
+                out.append(" ")
+            elif prev in "+-" and text[0] == prev:
+                out.append(" ")  # a + +b, a - -b
+            elif prev == "/" and kind == "regex":
+                out.append(" ")
+            elif text[0] == "." and out[-1][0].isdigit():
+                out.append(" ")  # 1 .toString() -- "1." would read as a number
+        pending_space = False
+        out.append(text)
+    return "".join(out).strip()
+
+
+# -----------------------------------------------------
+# HTML
+# -----------------------------------------------------
+# Whitespace next to these tags never renders, so it can go entirely
+BLOCK_TAGS = {"html", "head", "body", "title", "meta", "link", "script", "style", "noscript", "div", "p",
+              "section", "header", "footer", "nav", "main", "article", "aside", "ul", "ol", "li", "dl", "dt",
+              "dd", "h1", "h2", "h3", "h4", "h5", "h6", "table", "thead", "tbody", "tfoot", "tr", "td", "th",
+              "form", "fieldset", "legend", "br", "hr", "figure", "figcaption", "template", "dialog", "canvas"}
+_WS = object()  # marker for a whitespace-only text node
+
+
+class _HTMLMinifier(HTMLParser):
+    RAW_TAGS = ("pre", "textarea")
+
+    def __init__(self):
+        super().__init__(convert_charrefs=False)
+        self.out = []
+        self.raw_depth = 0
+        self.in_tag = None
+        self.last_tag = None
+
+    def handle_starttag(self, tag, attrs):
+        self.last_tag = tag
+        self.out.append(self.get_starttag_text())
+        if tag in self.RAW_TAGS:
+            self.raw_depth += 1
+        if tag in ("script", "style"):
+            self.in_tag = (tag, dict(attrs))
+
+    def handle_startendtag(self, tag, attrs):
+        self.last_tag = tag
+        self.out.append(self.get_starttag_text())
+
+    def handle_endtag(self, tag):
+        self.last_tag = tag
+        if tag in self.RAW_TAGS and self.raw_depth:
+            self.raw_depth -= 1
+        if tag in ("script", "style"):
+            self.in_tag = None
+        self.out.append(f"</{tag}>")
+
+    def handle_data(self, data):
+        if self.in_tag:
+            tag, attrs = self.in_tag
+            script_type = (attrs.get("type") or "text/javascript").lower()
+            if tag == "style":
+                data = minify_css(data)
+            elif "javascript" in script_type or script_type == "module":
+                data = minify_js(data)
+        elif not self.raw_depth:
+            if not data.strip():
+                self.out.append((_WS, self.last_tag))
+                return
+            data = re.sub(r"\s+", " ", data)
+        self.out.append(data)
+
+    def handle_comment(self, data):
+        if data.startswith("[if") or data.startswith("!"):
+            self.out.append(f"<!--{data}-->")
+
+    def handle_decl(self, decl):
+        self.out.append(f"<!{decl}>")
+
+    def handle_pi(self, data):
+        self.out.append(f"<?{data}>")
+
+    def handle_entityref(self, name):
+        self.out.append(f"&{name};")
+
+    def handle_charref(self, name):
+        self.out.append(f"&#{name};")
+
+    def unknown_decl(self, data):
+        self.out.append(f"<![{data}]>")
+
+
+def minify_html(html):
+    parser = _HTMLMinifier()
+    try:
+        parser.feed(html)
+        parser.close()
+    except Exception:
+        return html
+    out = []
+    items = parser.out
+    for i, item in enumerate(items):
+        if isinstance(item, tuple):
+            # Whitespace-only text: drop it next to block tags, otherwise it is one rendered space
+            prev_tag = item[1]
+            next_item = items[i + 1] if i + 1 < len(items) else ""
+            next_tag = re.match(r"</?([a-zA-Z][\w-]*)", next_item) if isinstance(next_item, str) else None
+            if prev_tag in BLOCK_TAGS or (next_tag and next_tag.group(1).lower() in BLOCK_TAGS) or not next_item:
+                continue
+            item = " "
+        out.append(item)
+    return "".join(out).strip()
+
+
+# -----------------------------------------------------
+# Build pipeline
+# -----------------------------------------------------
+def precompress(name, data):
+    """Returns {sibling_name: bytes} for the .gz (and .br if available) versions of a file."""
+    raw = data.encode("utf-8") if isinstance(data, str) else data
+    out = {f"{name}.gz": gzip.compress(raw, compresslevel=9, mtime=0)}
+    if brotli is not None:
+        out[f"{name}.br"] = brotli.compress(raw, quality=11)
+    return out
+
+
+def _size(data):
+    return len(data.encode("utf-8")) if isinstance(data, str) else len(data)
+
+
+def build_project(files, minify=True, purge_unused_css=True, compress=True):
+    """
+    Runs the production build over a {filename: content} dict.
+    Returns (built_files, report) where report = {"files": [...], "before": int, "after": int}.
+    The input dict is not modified; precompressed siblings are bytes.
+    """
+    used = collect_used_names(files) if purge_unused_css else None
+    built = {}
+    rows = []
+    for name in sorted(files):
+        content = files[name]
+        lower = name.lower()
+        before = _size(content)
+        if isinstance(content, str):
+            if lower.endswith(".css"):
+                if used is not None:
+                    content = purge_css(content, used)
+                if minify:
+                    content = minify_css(content)
+            elif minify and lower.endswith((".js", ".mjs")):
+                content = minify_js(content)
+            elif minify and lower.endswith((".html", ".htm")):
+                content = minify_html(content)
+        built[name] = content
+        row = {"file": name, "before": before, "after": _size(content)}
+
+        if compress and lower.endswith(PRECOMPRESS_EXTS) and row["after"] >= PRECOMPRESS_MIN_BYTES:
+            for sibling, data in precompress(name, content).items():
+                built[sibling] = data
+                row[sibling.rsplit(".", 1)[-1]] = len(data)
+        rows.append(row)
+
+    return built, {
+        "files": rows,
+        "before": sum(r["before"] for r in rows),
+        "after": sum(r["after"] for r in rows),
+    }
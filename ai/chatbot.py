@@ -1,14 +1,14 @@
-import google.generativeai as genai
-import streamlit as st
 import os
+import time
 
+from ai.config import DEFAULT_MODEL, get_model
+from ai.faq import get_matcher, record
+from ai.tokens import TokenBudgetError, compact_template, preflight, settle
 
-class NexaBot:
-    def __init__(self):
 
-        api_key = st.secrets["API_KEY"]
-        genai.configure(api_key=api_key)
-        self.model = genai.GenerativeModel("gemini-2.5-flash")
+class NexaBot:
+    def __init__(self, model_name=DEFAULT_MODEL):
+        self.model_name = model_name
 
         self.system_prompt = """
         You are NexaBot, the friendly and intelligent assistant for NexaBuild.
@@ -37,18 +37,63 @@ class NexaBot:
         4. **🌍 Deploy**: Go to the **Deploy** tab to download the **ZIP** file or deploy to GitHub Pages.
         """
 
-    def ask(self, user_query, history=[]):
+    @property
+    def model(self):
+        # Only questions the FAQ can't answer reach the model, so create it on demand
+        return get_model(self.model_name)
+
+    def _start_chat(self, history):
+        # Construct chat history for context
+        return self.model.start_chat(history=[
+                                         {"role": "user", "parts": compact_template(self.system_prompt)},
+                                         {"role": "model", "parts": "I am ready to help as NexaBot! 🚀"}
+                                     ] + history)
+
+    def ask(self, user_query, history=None):
         """
         Answers user questions maintaining context.
+        Known questions are answered locally from the system prompt; the rest go to the model.
         """
+        history = history or []
+        return "".join(self._answer(user_query, history, stream=False))
+
+    def ask_stream(self, user_query, memory=None):
+        """
+        Same as ask, but yields the reply as it arrives. `memory` is an
+        ai.memory.ConversationMemory; only its bounded history is sent.
+        """
+        return self._answer(user_query, memory.history() if memory else [], stream=True)
+
+    def _answer(self, user_query, history, stream):
+        started = time.perf_counter()
+        hit = get_matcher(self.system_prompt).match(user_query)
+        if hit:
+            record("faq", started)
+            yield hit[1]
+            return
+        model_name = self.model_name
+        # Everything the chat sends, for the budget/quota check and usage accounting
+        sent = "\n\n".join([self.system_prompt] + [str(m["parts"]) for m in history] + [user_query])
         try:
-            # Construct chat history for context
-            chat = self.model.start_chat(history=[
-                                                     {"role": "user", "parts": self.system_prompt},
-                                                     {"role": "model", "parts": "I am ready to help as NexaBot! 🚀"}
-                                                 ] + history)
-
-            response = chat.send_message(user_query)
-            return response.text
+            sent, estimate = preflight("NexaBot", sent, model_name)
+            response = self._start_chat(history).send_message(user_query, stream=stream)
+            reply = []
+            if stream:
+                for chunk in response:
+                    # Chunks with no text (e.g. safety metadata) raise on .text
+                    try:
+                        text = chunk.text
+                    except ValueError:
+                        continue
+                    if text:
+                        reply.append(text)
+                        yield text
+            else:
+                reply.append(response.text)
+                yield response.text
+            settle("NexaBot", sent, estimate, response, "".join(reply), model=model_name)
+            record("model", started)
+        except TokenBudgetError as e:
+            yield f"⏳ {e}"
         except Exception as e:
-            return f"I'm having trouble connecting to my brain right now. ({e})"
+            yield f"I'm having trouble connecting to my brain right now. ({e})"
@@ -0,0 +1,98 @@
+# ai/compact.py
+# Canonical, minimal encoding for the plan/design data handed from one agent to
+# the next: stable key order, collapsed whitespace, no empty or duplicate
+# values, and JSON-pointer references instead of repeated long strings.
+# Identical logical inputs always produce byte-identical prompt text.
+
+import json
+import re
+
+REF_MIN_CHARS = 40   # shorter repeated strings are cheaper inline than as a reference
+
+# What each stage actually reads from the plan
+PLAN_FIELDS_FOR_DESIGN = ("project_name", "features", "pages")
+DESIGN_FIELDS_FOR_CODE = ("color_palette", "typography", "ui_style", "animations", "components", "css_rules")
+
+
+def _clean(value):
+    if isinstance(value, dict):
+        out = {}
+        for key in sorted(value, key=str):
+            cleaned = _clean(value[key])
+            if cleaned not in (None, "", [], {}):
+                out[str(key)] = cleaned
+        return out
+    if isinstance(value, (list, tuple)):
+        out, seen = [], set()
+        for item in value:
+            cleaned = _clean(item)
+            if cleaned in (None, "", [], {}):
+                continue
+            marker = json.dumps(cleaned, sort_keys=True, ensure_ascii=False)
+            if marker not in seen:
+                seen.add(marker)
+                out.append(cleaned)
+        return out
+    if isinstance(value, str):
+        return re.sub(r"\s+", " ", value).strip()
+    if isinstance(value, float) and value.is_integer():
+        return int(value)
+    if value is None or isinstance(value, (bool, int, float)):
+        return value
+    return re.sub(r"\s+", " ", str(value)).strip()
+
+
+def _pointer(path):
+    return "/" + "/".join(str(p).replace("~", "~0").replace("/", "~1") for p in path)
+
+
+def _add_refs(value, seen, path=()):
+    """Replaces repeated long strings with {"$ref": <JSON pointer to the first occurrence>}."""
+    if isinstance(value, dict):
+        return {k: _add_refs(v, seen, path + (k,)) for k, v in value.items()}
+    if isinstance(value, list):
+        return [_add_refs(v, seen, path + (i,)) for i, v in enumerate(value)]
+    if isinstance(value, str) and len(value) >= REF_MIN_CHARS:
+        if value in seen:
+            return {"$ref": seen[value]}
+        seen[value] = _pointer(path)
+    return value
+
+
+def canonical(data, keep=None, drop=()):
+    """
+    Minimal canonical form of handoff data. `keep` limits top-level keys to those the
+    next stage reads; `drop` removes keys anywhere. Non-dict input (e.g. a plan the
+    model returned as text) is passed through as a cleaned string.
+    """
+    if isinstance(data, str):
+        try:
+            data = json.loads(data)
+        except ValueError:
+            return _clean(data)
+    if isinstance(data, dict):
+        if keep:
+            data = {k: v for k, v in data.items() if k in keep}
+        if drop:
+            data = _drop(data, set(drop))
+    return _add_refs(_clean(data), {})
+
+
+def _drop(value, keys):
+    if isinstance(value, dict):
+        return {k: _drop(v, keys) for k, v in value.items() if k not in keys}
+    if isinstance(value, list):
+        return [_drop(v, keys) for v in value]
+    return value
+
+
+def to_prompt(data, keep=None, drop=()):
+    """Compact, deterministic JSON text for a prompt."""
+    return json.dumps(canonical(data, keep, drop), separators=(",", ":"), ensure_ascii=False, sort_keys=True)
+
+
+def handoff(label, data, keep=None, drop=()):
+    """`Label: {...}` line for a prompt, noting when references were used."""
+    text = to_prompt(data, keep, drop)
+    note = ' ("$ref" values are JSON pointers to an earlier field with the same text)' if '{"$ref":' in text else ""
+    return f"{label}{note}: {text}"
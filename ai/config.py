@@ -0,0 +1,53 @@
+# ai/config.py
+# Configuration resolved once, on first use, instead of at import time.
+# The Gemini SDK takes about a second to import, so it is only loaded (and
+# configured) when a model is actually needed; pages that never call the
+# model never pay for it.
+
+import os
+import threading
+
+DEFAULT_MODEL = "gemini-2.5-flash"
+
+_lock = threading.Lock()
+_api_key = None
+_genai = None
+_models = {}
+
+
+def get_api_key():
+    """API key from the environment (NEXABUILD_API_KEY / API_KEY) or Streamlit secrets."""
+    global _api_key
+    if _api_key is None:
+        key = os.environ.get("NEXABUILD_API_KEY") or os.environ.get("API_KEY")
+        if not key:
+            try:
+                import streamlit as st
+                key = st.secrets["API_KEY"]
+            except Exception as e:
+                raise RuntimeError("API_KEY is not set (environment or .streamlit/secrets.toml).") from e
+        _api_key = key
+    return _api_key
+
+
+def get_genai():
+    """The google.generativeai module, imported and configured on the first call."""
+    global _genai
+    if _genai is None:
+        with _lock:
+            if _genai is None:
+                import google.generativeai as genai
+                genai.configure(api_key=get_api_key())
+                _genai = genai
+    return _genai
+
+
+def get_model(name=DEFAULT_MODEL, temperature=None):
+    """Shared GenerativeModel per model name (and sampling temperature, when one is set)."""
+    key = (name, temperature)
+    model = _models.get(key)
+    if model is None:
+        config = {"temperature": temperature} if temperature is not None else None
+        model = get_genai().GenerativeModel(name, generation_config=config)
+        _models[key] = model
+    return model
@@ -0,0 +1,87 @@
+# ai/datalayer.py
+# Ships the prebuilt NexaData persistence library (ai/runtime/nexa-data.js)
+# into every generated project, so the Developer agent codes against its API
+# instead of hand-writing a localStorage DataManager each time.
+
+import os
+import re
+
+DATA_LAYER_FILE = "nexa-data.js"
+DATA_LAYER_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "runtime", DATA_LAYER_FILE)
+
+_library = None
+
+
+def load_data_layer():
+    global _library
+    if _library is None:
+        with open(DATA_LAYER_PATH, encoding="utf-8") as f:
+            _library = f.read()
+    return _library
+
+
+def data_layer_version(source=None):
+    m = re.search(r"NexaData v(\d+\.\d+\.\d+)", source if source is not None else load_data_layer())
+    return m.group(1) if m else None
+
+
+# Prompt snippet describing the API; kept next to the library so they change together
+DATA_LAYER_API = f"""
+- `{DATA_LAYER_FILE}` is ALREADY PROVIDED and loaded before `script.js`. Do NOT write it, do NOT write your own localStorage wrapper.
+- Open once: `const db = await NexaData.open("<app-id>", {{ tasks: {{ indexes: ["done"] }} }});` (declare every collection + fields you filter on).
+- `const tasks = db.collection("tasks");`
+- Reads are synchronous from memory: `tasks.all()`, `tasks.get(id)`, `tasks.where("done", false)`, `tasks.query(fn)`, `tasks.count()`.
+- Writes are synchronous and persisted in batches automatically: `tasks.add(obj)` (returns obj with `id`), `tasks.addMany(list)`, `tasks.update(id, patch)`, `tasks.remove(id)`, `tasks.clear()`.
+- Re-render on change: `tasks.subscribe(items => render(items))`.
+- Never call `localStorage`/`indexedDB` directly and never re-read storage inside loops.
+"""
+
+
+_SCRIPT_TAG = re.compile(r"<script\b([^>]*)>", re.I)
+_EXTERNAL_SRC = re.compile(r"\bsrc\s*=\s*[\"']?(?:[a-z]+:|//)", re.I)
+# Data blocks such as <script type="application/ld+json"> never run
+_DATA_BLOCK = re.compile(r"\btype\s*=\s*[\"']?(?!module\b|text/javascript\b|application/javascript\b)[\w/+.-]", re.I)
+
+
+def _inject_tag(html):
+    if DATA_LAYER_FILE in html:
+        return html
+    scripts = [s for s in _SCRIPT_TAG.finditer(html) if not _DATA_BLOCK.search(s.group(1))]
+    # Before the first local or inline script so app code can use NexaData right away;
+    # CDN scripts don't need it, so they are only a fallback position
+    m = next((s for s in scripts if not _EXTERNAL_SRC.search(s.group(1))), scripts[0] if scripts else None)
+    if m:
+        # Run in the same phase as that script: a deferred script.js in <head> must not
+        # gain a render-blocking dependency, and a module must not run after the library
+        attrs = m.group(1)
+        extra = ""
+        if re.search(r"\btype\s*=\s*[\"']?module\b", attrs, re.I):
+            extra = ' type="module"'
+        elif re.search(r"\bdefer\b", attrs, re.I) and re.search(r"\bsrc\s*=", attrs, re.I):
+            extra = " defer"
+        tag = f'<script src="{DATA_LAYER_FILE}"{extra}></script>'
+        return html[:m.start()] + tag + "\n" + html[m.start():]
+    tag = f'<script src="{DATA_LAYER_FILE}"></script>'
+    m = re.search(r"</body\s*>", html, re.I)
+    if m:
+        return html[:m.start()] + tag + "\n" + html[m.start():]
+    return html + "\n" + tag
+
+
+def inject_data_layer(files, include_library=True):
+    """
+    Returns a copy of `files` with the library added (or upgraded) and a <script> tag
+    for it in every HTML page. Pass include_library=False for partial edit results.
+    """
+    out = dict(files)
+    if include_library and data_layer_version(out.get(DATA_LAYER_FILE, "")) != data_layer_version():
+        out[DATA_LAYER_FILE] = load_data_layer()
+    for name, content in files.items():
+        if name.lower().endswith((".html", ".htm")) and isinstance(content, str):
+            out[name] = _inject_tag(content)
+    return out
+
+
+def strip_data_layer(files):
+    """The library never needs to be sent back to the model."""
+    return {name: content for name, content in files.items() if name != DATA_LAYER_FILE}
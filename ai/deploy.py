@@ -1,18 +1,267 @@
 # ai/deploy.py
-import requests
 import base64
+import hashlib
+import os
+import re
+import shutil
+import subprocess
+import tempfile
+import time
 
+from ai.editor import touched_outputs
+
+# Local targets publish under this directory unless a root is passed explicitly
+DEPLOY_ROOT = os.environ.get("NEXABUILD_DEPLOY_ROOT", "deployments")
+# Public URL prefix of our own web tier (e.g. "https://sites.example.com")
+DEPLOY_BASE_URL = os.environ.get("NEXABUILD_DEPLOY_BASE_URL", "")
+
+
+def _slugify(name):
+    # Same rules as the GitHub repo name sanitizing: last URL segment, dashes for spaces
+    name = name.strip()
+    if "/" in name:
+        name = name.rstrip("/").split("/")[-1]
+    name = re.sub(r"[^A-Za-z0-9._-]+", "-", name.replace(" ", "-")).strip(".-")
+    if not name:
+        raise RuntimeError("Site name is empty after sanitizing.")
+    return name
+
+
+def _check_path(name):
+    """Rejects file names that would escape the publish directory."""
+    parts = name.replace("\\", "/").split("/")
+    if name.startswith("/") or ".." in parts or "\n" in name or not name:
+        raise RuntimeError(f"Refusing to publish unsafe path: {name!r}")
+    return "/".join(p for p in parts if p not in ("", "."))
+
+
+def _as_bytes(content):
+    # Build output mixes text files with precompressed .gz/.br bytes
+    return content if isinstance(content, (bytes, bytearray)) else content.encode("utf-8")
+
+
+def _content_hash(files):
+    h = hashlib.sha256()
+    for name in sorted(files):
+        h.update(name.encode("utf-8") + b"\0")
+        h.update(_as_bytes(files[name]) + b"\0")
+    return h.hexdigest()
+
+
+# -----------------------------------------------------
+# Deploy target interface
+# -----------------------------------------------------
+class DeployTarget:
+    """
+    A place a generated project can be published to.
+    deploy() takes the flat {filename: content} dict and returns at least {"url": ...}.
+    `changed` (names edited since the release `base`, see ai/editor.py) lets a target
+    write only those files; targets fall back to a full deploy when `base` is no
+    longer what is live.
+    """
+    label = "Deploy target"
+
+    def available(self):
+        return True
+
+    def deploy(self, site_name, files, changed=None, base=None):
+        raise NotImplementedError
+
+
+class LocalGitTarget(DeployTarget):
+    """
+    Publishes into a local bare git repository (one per site) with a single
+    `git fast-import` commit, so the whole deploy is one process and one ref update.
+    """
+    label = "Local Git"
+
+    def __init__(self, root=None, branch="main", base_url=None):
+        self.root = root or os.path.join(DEPLOY_ROOT, "git")
+        self.branch = branch
+        self.base_url = DEPLOY_BASE_URL if base_url is None else base_url
+
+    def available(self):
+        return shutil.which("git") is not None
+
+    def _git(self, repo, *args, **kwargs):
+        return subprocess.run(["git", "--git-dir", repo, *args], capture_output=True, **kwargs)
+
+    def _ensure_repo(self, repo):
+        if os.path.isdir(repo):
+            return
+        os.makedirs(self.root, exist_ok=True)
+        init = subprocess.run(["git", "init", "--bare", "-q", repo], capture_output=True)
+        if init.returncode != 0:
+            raise RuntimeError("git init failed: " + init.stderr.decode("utf-8", "replace"))
+        self._git(repo, "symbolic-ref", "HEAD", f"refs/heads/{self.branch}")
+
+    @staticmethod
+    def _quote(path):
+        if any(c in path for c in ' "\\') or path.startswith('"'):
+            return '"' + path.replace("\\", "\\\\").replace('"', '\\"') + '"'
+        return path
+
+    def _build_stream(self, ref, parent, site, files, changed=None):
+        message = f"Deploy {site}".encode("utf-8")
+        out = [
+            f"commit {ref}\n".encode(),
+            f"committer NexaBuild <deploy@nexabuild.local> {int(time.time())} +0000\n".encode(),
+            f"data {len(message)}\n".encode() + message + b"\n",
+        ]
+        if parent:
+            out.append(f"from {parent}\n".encode())
+        if changed is None:
+            # Replace the whole tree so files removed in the editor disappear from the site
+            out.append(b"deleteall\n")
+            names = sorted(files)
+        else:
+            # Incremental: the parent tree stays, only touched paths are rewritten
+            names, removed = touched_outputs(files, changed)
+            names = sorted(names)
+            for name in sorted(removed):
+                out.append(f"D {self._quote(_check_path(name))}\n".encode("utf-8"))
+        for name in names:
+            body = _as_bytes(files[name])
+            out.append(f"M 100644 inline {self._quote(_check_path(name))}\n".encode("utf-8"))
+            out.append(f"data {len(body)}\n".encode() + body + b"\n")
+        return b"".join(out)
+
+    def deploy(self, site_name, files, changed=None, base=None):
+        if not files:
+            raise RuntimeError("No files to deploy.")
+        site = _slugify(site_name)
+        repo = os.path.join(self.root, f"{site}.git")
+        self._ensure_repo(repo)
+
+        ref = f"refs/heads/{self.branch}"
+        head = self._git(repo, "rev-parse", "--verify", "-q", ref)
+        parent = head.stdout.decode().strip() if head.returncode == 0 else None
+        if changed is not None and (parent is None or parent != base):
+            changed = None   # someone else deployed since `base`; rewrite the whole tree
+
+        stream = self._build_stream(ref, parent, site, files, changed)
+        result = self._git(repo, "fast-import", "--quiet", input=stream)
+        if result.returncode != 0:
+            raise RuntimeError("git fast-import failed: " + result.stderr.decode("utf-8", "replace"))
+
+        commit = self._git(repo, "rev-parse", ref).stdout.decode().strip()
+        url = f"{self.base_url.rstrip('/')}/{site}/" if self.base_url else os.path.abspath(repo)
+        written = len(files) if changed is None else len(touched_outputs(files, changed)[0])
+        return {"url": url, "path": os.path.abspath(repo), "commit": commit, "base": commit, "written": written}
+
+
+class StaticDirectoryTarget(DeployTarget):
+    """
+    Writes each release into its own directory, then atomically swaps the
+    `<site>/current` symlink to it. Our web tier serves `<root>/<site>/current`.
+    """
+    label = "Static Directory"
+
+    def __init__(self, root=None, base_url=None, keep_releases=3):
+        self.root = root or os.path.join(DEPLOY_ROOT, "static")
+        self.base_url = DEPLOY_BASE_URL if base_url is None else base_url
+        self.keep_releases = keep_releases
+
+    def _prune(self, releases_dir, active):
+        releases = sorted(
+            (os.path.join(releases_dir, d) for d in os.listdir(releases_dir) if not d.startswith(".")),
+            key=os.path.getmtime,
+            reverse=True,
+        )
+        for path in releases[self.keep_releases:]:
+            if os.path.basename(path) != active:
+                shutil.rmtree(path, ignore_errors=True)
+
+    def _link_unchanged(self, base_dir, staging, files, skip):
+        """Hard-links files that did not change from the live release (copies across devices)."""
+        for name in files:
+            if name in skip:
+                continue
+            rel = _check_path(name)
+            source = os.path.join(base_dir, *rel.split("/"))
+            path = os.path.join(staging, *rel.split("/"))
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            try:
+                os.link(source, path)
+            except OSError:
+                shutil.copy2(source, path)
+
+    def deploy(self, site_name, files, changed=None, base=None):
+        if not files:
+            raise RuntimeError("No files to deploy.")
+        site = _slugify(site_name)
+        site_dir = os.path.join(self.root, site)
+        releases_dir = os.path.join(site_dir, "releases")
+        os.makedirs(releases_dir, exist_ok=True)
+        current = os.path.join(site_dir, "current")
+
+        live = os.path.basename(os.readlink(current)) if os.path.islink(current) else None
+        if changed is not None and (live is None or live != base):
+            changed = None   # the live release is not the one `changed` is relative to
+        if changed is None:
+            # Identical content maps to the same release, so a redeploy is just a swap
+            release = _content_hash(files)[:16]
+            write = set(files)
+        else:
+            write, _ = touched_outputs(files, changed)
+            # Named after the base and the delta instead of hashing every file again
+            release = hashlib.sha256((base + "\0" + _content_hash({n: files[n] for n in write})
+                                      + "\0" + "\0".join(sorted(files))).encode()).hexdigest()[:16]
+        release_dir = os.path.join(releases_dir, release)
+        if not os.path.isdir(release_dir):
+            staging = tempfile.mkdtemp(prefix=".staging-", dir=releases_dir)
+            os.chmod(staging, 0o755)  # mkdtemp is owner-only; the web tier must be able to read it
+            try:
+                if changed is not None:
+                    self._link_unchanged(os.path.join(releases_dir, base), staging, files, write)
+                for name in write:
+                    path = os.path.join(staging, *_check_path(name).split("/"))
+                    os.makedirs(os.path.dirname(path), exist_ok=True)
+                    with open(path, "wb") as f:
+                        f.write(_as_bytes(files[name]))
+                os.rename(staging, release_dir)
+            except Exception:
+                shutil.rmtree(staging, ignore_errors=True)
+                raise
+        else:
+            os.utime(release_dir)
+
+        tmp_link = os.path.join(site_dir, f".current-{os.getpid()}-{time.time_ns()}")
+        os.symlink(os.path.join("releases", release), tmp_link)
+        os.replace(tmp_link, current)
+
+        self._prune(releases_dir, release)
+
+        url = f"{self.base_url.rstrip('/')}/{site}/" if self.base_url else os.path.abspath(current)
+        return {"url": url, "path": os.path.abspath(current), "release": release, "base": release,
+                "written": len(write)}
+
+
+class GitHubDeployer(DeployTarget):
+    label = "GitHub Pages"
 
-class GitHubDeployer:
     def __init__(self, token=None):
         self.token = token
 
+    def available(self):
+        return self.token_available()
+
+    def deploy(self, site_name, files, changed=None, base=None):
+        touched = touched_outputs(files, changed)[0] if changed is not None else None
+        if touched:
+            # Only upload what changed; the repo keeps everything else (deletions are left alone as before)
+            files = {n: files[n] for n in touched}
+        result = self.deploy_to_github_pages(site_name, files)
+        result["written"] = len(files)
+        return result
+
     def token_available(self):
         return bool(self.token)
 
     def deploy_to_github_pages(self, repo_name, files, make_public=True):
         if not self.token:
             raise RuntimeError("GitHub token missing.")
+        import requests  # only the GitHub target needs it; keeps it off the startup path
 
         # 1. Sanitize Repo Name
         repo_name = repo_name.strip()
@@ -74,7 +323,7 @@ class GitHubDeployer:
 
             data = {
                 "message": f"Update {name}",
-                "content": base64.b64encode(content.encode("utf-8")).decode(),
+                "content": base64.b64encode(_as_bytes(content)).decode(),
             }
             if sha:
                 data["sha"] = sha
@@ -98,4 +347,18 @@ class GitHubDeployer:
         except:
             pass
 
-        return {"url": f"https://{username}.github.io/{repo_name}/"}
\ No newline at end of file
+        return {"url": f"https://{username}.github.io/{repo_name}/"}
+
+
+DEPLOY_TARGETS = {
+    "github": GitHubDeployer,
+    "git": LocalGitTarget,
+    "static": StaticDirectoryTarget,
+}
+
+
+def get_deploy_target(kind, **options):
+    """Builds a deploy target by key, e.g. get_deploy_target("github", token=...)."""
+    if kind not in DEPLOY_TARGETS:
+        raise RuntimeError(f"Unknown deploy target '{kind}'. Choose one of: {', '.join(DEPLOY_TARGETS)}")
+    return DEPLOY_TARGETS[kind](**options)
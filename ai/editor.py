@@ -0,0 +1,175 @@
+# ai/editor.py
+# Windowed editing for large generated files. The Code tab shows one window of
+# lines at a time, a save becomes a range patch against the project dict, and
+# ChangeTracker keeps a per-file change log so preview and deploy only touch
+# the files that changed since they last ran.
+
+import bisect
+import os
+import re
+
+# Files longer than this are edited one window of lines at a time
+WINDOW_LINES = int(os.environ.get("NEXABUILD_EDITOR_WINDOW", "300"))
+# Line ranges remembered per file (older ones collapse into "whole file")
+MAX_RANGES = 50
+# Siblings added by the production build; they change whenever their source does
+BUILD_SUFFIXES = (".gz", ".br")
+
+
+class LineIndex:
+    """Character offsets of line starts, built once per content version."""
+
+    def __init__(self, text):
+        self.text = text
+        self.starts = [0] + [m.end() for m in re.finditer("\n", text)]
+        if len(self.starts) > 1 and self.starts[-1] == len(text):
+            self.starts.pop()   # a trailing newline does not start another line
+        self.line_count = len(self.starts)
+
+    def offset(self, line):
+        """Offset of the 0-based `line`; past the end gives len(text)."""
+        return self.starts[line] if line < self.line_count else len(self.text)
+
+    def line_of(self, offset):
+        return bisect.bisect_right(self.starts, offset) - 1
+
+    def window(self, start, size=WINDOW_LINES):
+        """(first_line, end_line, text) for `size` lines from `start`, clamped to the file."""
+        start = max(0, min(start, self.line_count - 1))
+        end = min(start + size, self.line_count)
+        return start, end, self.text[self.offset(start):self.offset(end)]
+
+
+# -----------------------------------------------------
+# Range patches
+# -----------------------------------------------------
+def _lines(text):
+    """Lines of `text` with their "\n" kept."""
+    return [line for line in re.split(r"(?<=\n)", text) if line]
+
+
+def make_patch(name, index, first_line, end_line, new_text):
+    """
+    Turns an edited window (lines first_line..end_line of `name`) into a range
+    patch that replaces only the lines that differ. Returns None when nothing changed.
+    """
+    start, end = index.offset(first_line), index.offset(end_line)
+    old_text = index.text[start:end]
+    if "\r\n" in old_text and "\r\n" not in new_text:
+        new_text = new_text.replace("\n", "\r\n")   # browsers hand textareas back with \n
+    if old_text.endswith("\n") and not new_text.endswith("\n"):
+        new_text += "\r\n" if old_text.endswith("\r\n") else "\n"   # keep the next window's first line separate
+    if new_text == old_text:
+        return None
+
+    # Split on "\n" only, like LineIndex; splitlines() also breaks on \f, \x1c, U+2028...
+    old_lines = _lines(old_text)
+    new_lines = _lines(new_text)
+    head = 0
+    while head < min(len(old_lines), len(new_lines)) and old_lines[head] == new_lines[head]:
+        head += 1
+    tail = 0
+    while (tail < min(len(old_lines), len(new_lines)) - head
+           and old_lines[-1 - tail] == new_lines[-1 - tail]):
+        tail += 1
+
+    first = first_line + head
+    old_part = old_lines[head:len(old_lines) - tail]
+    new_part = new_lines[head:len(new_lines) - tail]
+    patch_start = index.offset(first)
+    return {
+        "file": name,
+        "start": patch_start,
+        "end": patch_start + sum(len(line) for line in old_part),
+        "old": "".join(old_part),
+        "text": "".join(new_part),
+        "line": first,
+        "removed": len(old_part),
+        "added": len(new_part),
+    }
+
+
+def apply_patch(files, patch):
+    """Applies a range patch in place; refuses if the file moved on since the patch was made."""
+    name = patch["file"]
+    text = files.get(name)
+    if text is None or text[patch["start"]:patch["end"]] != patch["old"]:
+        raise RuntimeError(f"{name} changed since it was opened; reload the file and edit again.")
+    files[name] = text[:patch["start"]] + patch["text"] + text[patch["end"]:]
+    return files[name]
+
+
+# -----------------------------------------------------
+# Change tracking
+# -----------------------------------------------------
+class ChangeTracker:
+    """
+    Change log for the session's project dict. Every detected change bumps
+    `version`; consumers remember the version they last processed and ask
+    changed_since() for the files to redo. Content is compared by identity
+    first, so a rerun where nothing changed costs one pass over the file names.
+    """
+
+    def __init__(self):
+        self.version = 0
+        self.seen = {}        # name -> content object last seen
+        self.changed_at = {}  # name -> version of its last change (removals included)
+        self.ranges = {}      # name -> [(version, first_line, last_line)], None for a whole-file change
+        self.indexes = {}     # name -> LineIndex of the current content
+
+    def _bump(self, name, line_range):
+        self.version += 1
+        self.changed_at[name] = self.version
+        ranges = self.ranges.setdefault(name, [])
+        ranges.append((self.version,) + line_range if line_range else (self.version, None, None))
+        del ranges[:-MAX_RANGES]
+
+    def sync(self, files):
+        """Picks up changes made outside the editor (generation, chat edits, repairs)."""
+        for name, text in files.items():
+            previous = self.seen.get(name)
+            if previous is text:
+                continue
+            self.seen[name] = text
+            if previous is None or previous != text:
+                self._bump(name, None)
+        for name in [n for n in self.seen if n not in files]:
+            del self.seen[name]
+            self.indexes.pop(name, None)
+            self._bump(name, None)
+        return self.version
+
+    def record(self, patch, new_text):
+        """Logs an editor patch that apply_patch() has just applied."""
+        name = patch["file"]
+        self.seen[name] = new_text
+        self._bump(name, (patch["line"], patch["line"] + max(patch["added"], 1) - 1))
+
+    def line_index(self, name, text):
+        index = self.indexes.get(name)
+        if index is None or index.text is not text:
+            index = self.indexes[name] = LineIndex(text)
+        return index
+
+    def changed_since(self, version):
+        """Names added, edited or removed after `version`."""
+        return {name for name, v in self.changed_at.items() if v > version}
+
+    def changed_lines(self, name, version):
+        """Edited (first, last) line ranges of `name` after `version`; None if the whole file changed."""
+        ranges = [r for r in self.ranges.get(name, []) if r[0] > version]
+        if not ranges or any(r[1] is None for r in ranges):
+            return None if ranges else []
+        return [(first, last) for _, first, last in ranges]
+
+
+def touched_outputs(files, changed):
+    """Output names affected by the changed source names, including .gz/.br build siblings."""
+    touched = set()
+    for name in files:
+        source = name[:-3] if name.endswith(BUILD_SUFFIXES) else name
+        if name in changed or source in changed:
+            touched.add(name)
+    removed = {n for n in changed if n not in files}
+    removed |= {n + s for n in removed for s in BUILD_SUFFIXES}
+    return touched, removed
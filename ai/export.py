@@ -0,0 +1,203 @@
+# ai/export.py
+# Streaming, deterministic archive export for generated projects.
+
+import gzip
+import hashlib
+import importlib.util
+import io
+import tarfile
+import threading
+import zipfile
+from collections import OrderedDict
+
+CHUNK_SIZE = 64 * 1024
+
+# Every entry gets the same timestamp and mode so identical projects give byte-identical archives
+FIXED_DATE_TIME = (1980, 1, 1, 0, 0, 0)
+FIXED_MTIME = 315532800  # 1980-01-01T00:00:00Z, same instant as FIXED_DATE_TIME
+
+ARCHIVE_FORMATS = {
+    "zip": {"mime": "application/zip", "ext": ".zip"},
+    "tar.gz": {"mime": "application/gzip", "ext": ".tar.gz"},
+    "tar.zst": {"mime": "application/zstd", "ext": ".tar.zst"},
+}
+
+# Already-compressed payloads are stored as-is, text gets the strongest deflate
+STORED_EXTS = (".png", ".jpg", ".jpeg", ".gif", ".webp", ".avif", ".ico", ".woff", ".woff2",
+               ".gz", ".br", ".zst", ".zip", ".mp3", ".mp4", ".webm")
+TEXT_EXTS = (".html", ".htm", ".css", ".js", ".mjs", ".json", ".svg", ".txt", ".md", ".xml", ".py")
+
+CACHE_MAX_ENTRIES = 16
+CACHE_MAX_ITEM_BYTES = 8 * 1024 * 1024
+
+_cache = OrderedDict()
+_cache_lock = threading.Lock()
+
+
+def project_hash(files):
+    """Content hash of a {filename: content} dict, independent of insertion order."""
+    h = hashlib.sha256()
+    for name in sorted(files):
+        data = files[name]
+        if isinstance(data, str):
+            data = data.encode("utf-8")
+        h.update(name.encode("utf-8") + b"\0" + str(len(data)).encode() + b"\0" + data)
+    return h.hexdigest()
+
+
+def compression_for(name):
+    """Returns (zip compress_type, compresslevel) for a file name."""
+    lower = name.lower()
+    if lower.endswith(STORED_EXTS):
+        return zipfile.ZIP_STORED, None
+    if lower.endswith(TEXT_EXTS):
+        return zipfile.ZIP_DEFLATED, 9
+    return zipfile.ZIP_DEFLATED, 6
+
+
+def _encode(content):
+    return content if isinstance(content, (bytes, bytearray)) else str(content).encode("utf-8")
+
+
+class _ChunkSink(io.RawIOBase):
+    """Write-only, non-seekable stream that hands out what was written as chunks."""
+
+    def __init__(self):
+        self._parts = []
+
+    def writable(self):
+        return True
+
+    def write(self, b):
+        self._parts.append(bytes(b))
+        return len(b)
+
+    def drain(self):
+        if not self._parts:
+            return
+        data = b"".join(self._parts)
+        self._parts = []
+        for i in range(0, len(data), CHUNK_SIZE):
+            yield data[i:i + CHUNK_SIZE]
+
+
+# -----------------------------------------------------
+# Format writers (generators of byte chunks)
+# -----------------------------------------------------
+def _iter_zip(files):
+    sink = _ChunkSink()
+    # zipfile notices the sink can't seek and writes data descriptors instead of seeking back
+    with zipfile.ZipFile(sink, "w") as z:
+        for name in sorted(files):
+            compress_type, level = compression_for(name)
+            info = zipfile.ZipInfo(name, FIXED_DATE_TIME)
+            info.create_system = 3
+            info.external_attr = 0o644 << 16
+            # writestr() takes the per-entry level publicly; only this entry's output is buffered
+            z.writestr(info, _encode(files[name]), compress_type=compress_type, compresslevel=level)
+            yield from sink.drain()
+    yield from sink.drain()
+
+
+def _tar_info(name, size):
+    info = tarfile.TarInfo(name)
+    info.size = size
+    info.mtime = FIXED_MTIME
+    info.mode = 0o644
+    info.uid = info.gid = 0
+    info.uname = info.gname = ""
+    return info
+
+
+def _iter_tar(files, compressed, sink):
+    with tarfile.open(fileobj=compressed, mode="w|", format=tarfile.PAX_FORMAT) as tar:
+        for name in sorted(files):
+            data = _encode(files[name])
+            tar.addfile(_tar_info(name, len(data)), io.BytesIO(data))
+            yield from sink.drain()
+    compressed.close()
+    yield from sink.drain()
+
+
+def _iter_tar_gz(files):
+    sink = _ChunkSink()
+    # tarfile's own "w|gz" stamps the current time into the gzip header, so wrap GzipFile with mtime=0
+    gz = gzip.GzipFile(filename="", mode="wb", fileobj=sink, compresslevel=9, mtime=0)
+    yield from _iter_tar(files, gz, sink)
+
+
+def _iter_tar_zst(files):
+    try:
+        import zstandard
+    except ImportError:
+        raise RuntimeError("tar.zst export needs the 'zstandard' package (pip install zstandard).")
+    sink = _ChunkSink()
+    writer = zstandard.ZstdCompressor(level=10).stream_writer(sink, closefd=False)
+    yield from _iter_tar(files, writer, sink)
+
+
+_WRITERS = {"zip": _iter_zip, "tar.gz": _iter_tar_gz, "tar.zst": _iter_tar_zst}
+
+
+# -----------------------------------------------------
+# Public API
+# -----------------------------------------------------
+def _cache_get(key):
+    with _cache_lock:
+        data = _cache.get(key)
+        if data is not None:
+            _cache.move_to_end(key)
+        return data
+
+
+def _cache_put(key, data):
+    with _cache_lock:
+        _cache[key] = data
+        _cache.move_to_end(key)
+        while len(_cache) > CACHE_MAX_ENTRIES:
+            _cache.popitem(last=False)
+
+
+def iter_archive(files, fmt="zip"):
+    """
+    Yields the archive in CHUNK_SIZE pieces. Cached archives are replayed from memory;
+    otherwise the archive is built on the fly and cached if it stays small enough.
+    """
+    if fmt not in _WRITERS:
+        raise ValueError(f"Unknown archive format '{fmt}'. Choose one of: {', '.join(_WRITERS)}")
+
+    key = (project_hash(files), fmt)
+    cached = _cache_get(key)
+    if cached is not None:
+        for i in range(0, len(cached), CHUNK_SIZE):
+            yield cached[i:i + CHUNK_SIZE]
+        return
+
+    captured, size = [], 0
+    for chunk in _WRITERS[fmt](files):
+        if captured is not None:
+            size += len(chunk)
+            if size <= CACHE_MAX_ITEM_BYTES:
+                captured.append(chunk)
+            else:
+                captured = None  # too big to keep around; just stream it
+        yield chunk
+    if captured is not None:
+        _cache_put(key, b"".join(captured))
+
+
+def export_archive(files, fmt="zip"):
+    """Returns the whole archive as bytes (served from the content-hash cache when possible)."""
+    cached = _cache_get((project_hash(files), fmt))
+    if cached is not None:
+        return cached
+    return b"".join(iter_archive(files, fmt))
+
+
+def available_formats():
+    """Archive formats usable in this environment (zstd needs an optional package)."""
+    return [fmt for fmt in ARCHIVE_FORMATS if fmt != "tar.zst" or importlib.util.find_spec("zstandard")]
+
+
+def archive_filename(base, fmt="zip"):
+    return f"{base}{ARCHIVE_FORMATS[fmt]['ext']}"
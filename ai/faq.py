@@ -0,0 +1,184 @@
+# ai/faq.py
+# Local FAQ fast path for NexaBot: known questions ("how do I use it?", "who made
+# this?") are answered instantly from the knowledge already written in
+# NexaBot.system_prompt. Open-ended questions fall through to the model.
+
+import logging
+import re
+import threading
+import time
+
+log = logging.getLogger("nexabuild.faq")
+
+# Longer or multi-part questions are treated as open-ended
+MAX_WORDS = 14
+MIN_SCORE = 2
+
+# Intent -> (title keyword in the CORE KNOWLEDGE list, emoji, weighted trigger patterns)
+INTENTS = {
+    "about": ("what is", "🚀", {
+        r"\bwhat(?:'s| is| does)\s+(?:nexa ?build|this(?: app| tool| site| platform)?|it)\b": 3,
+        r"\btell me about (?:nexa ?build|this|yourself)\b": 3,
+        r"\bwhat (?:can|does) (?:nexa ?build|it|this|you) do\b": 3,
+        r"\bnexa ?build\b": 1,
+    }),
+    "team": ("creators", "👥", {
+        r"\bwho (?:made|built|created|developed|designed|owns|is behind)\b": 3,
+        r"\b(?:creators?|founders?|authors?|developers|team|makers?)\b": 2,
+    }),
+    "origin": ("origin", "🏆", {
+        r"\bhackathon\b": 3,
+        r"\b(?:origin|why (?:was|is) (?:it|this|nexa ?build) (?:made|built|created))\b": 3,
+        r"\b(?:hec|competition)\b": 2,
+    }),
+    "technology": ("technology", "⚙️", {
+        r"\b(?:what|which) (?:tech|technology|technologies|model|ai|llm|stack|framework)\b": 3,
+        r"\b(?:powered by|built with|tech stack|gemini|streamlit)\b": 3,
+        r"\bhow does (?:it|nexa ?build|this) work\b": 3,
+        r"\b(?:local ?storage|database|backend|offline|architecture)\b": 2,
+    }),
+    "howto": (None, "🧭", {
+        r"\bhow (?:do|can|should) i (?:use|create|make|build|start|generate|deploy|edit|preview|download)\b": 3,
+        r"\bhow to (?:use|create|make|build|start|generate|deploy|edit|preview|download)\b": 3,
+        r"\b(?:getting started|get started|steps|tutorial|guide|instructions)\b": 2,
+        r"\b(?:deploy|download|zip|preview|launch team)\b": 1,
+    }),
+    "greeting": (None, "👋", {
+        r"^(?:hi|hello|hey|hiya|yo|salam|assalam(?:u ?alaikum)?|good (?:morning|afternoon|evening))\b[\s!.]*$": 3,
+    }),
+    "thanks": (None, "🙌", {
+        r"^(?:thanks?(?: you)?|thx|ty|great|awesome|cool|ok(?:ay)?|got it)\b[\s!.]*(?:nexabot)?[\s!.]*$": 3,
+    }),
+}
+
+# Filler that doesn't change what a question is about
+FILLER = {"a", "an", "the", "i", "me", "my", "you", "your", "we", "it", "this", "that", "is", "are", "was", "do",
+          "does", "can", "could", "to", "on", "in", "of", "for", "with", "and", "or", "please", "pls", "just",
+          "how", "what", "who", "which", "why", "when", "where", "about", "tell", "here", "there", "so", "u"}
+
+# Phrases that signal a question the canned answers can't cover
+OPEN_ENDED = re.compile(
+    r"\b(?:why (?:does|doesn't|did|is my|isn't)|error|bug|broken|not working|fix|compare|vs\.?|versus|better than|"
+    r"should i|can you|could you|write|code|explain .* (?:and|then)|my (?:app|site|website|project|code))\b", re.I)
+
+
+def _sections(system_prompt):
+    """Splits the prompt into the CORE KNOWLEDGE list and the how-to steps."""
+    knowledge = re.search(r"CORE KNOWLEDGE:(.*?)(?:\n\s*BEHAVIOR:|\Z)", system_prompt, re.S)
+    howto = re.search(r"HOW TO USE.*?\n(.*)\Z", system_prompt, re.S)
+    return (knowledge.group(1) if knowledge else ""), (howto.group(1) if howto else "")
+
+
+def _numbered(text):
+    """[(title, body)] for `N. **Title**: body` items, body running until the next item."""
+    items = []
+    pattern = re.compile(r"^\s*\d+\.\s+\*\*(.+?)\*\*:?\s*(.*?)(?=^\s*\d+\.\s+\*\*|\Z)", re.S | re.M)
+    for m in pattern.finditer(text):
+        items.append((m.group(1).strip(), m.group(2).strip()))
+    return items
+
+
+def _tidy(body):
+    lines = [re.sub(r"\s+", " ", line).strip() for line in body.splitlines()]
+    return "\n".join(line for line in lines if line)
+
+
+def build_answers(system_prompt):
+    """{intent: answer} extracted from the bot's own system prompt, so the two never drift apart."""
+    knowledge, howto = _sections(system_prompt)
+    answers = {}
+    items = _numbered(knowledge)
+    for intent, (title_key, emoji, _) in INTENTS.items():
+        if not title_key:
+            continue
+        for title, body in items:
+            if title_key in title.lower():
+                bullets = re.findall(r"^\s*-\s+(.+)$", body, re.M)
+                if bullets and not re.sub(r"^\s*-\s+.+$", "", body, flags=re.M).strip():
+                    # A pure list (e.g. the team): one line
+                    body = ", ".join(b.strip() for b in bullets[:-1]) + f" and {bullets[-1].strip()}" \
+                        if len(bullets) > 1 else bullets[0].strip()
+                answers[intent] = f"{emoji} **{title}**: {_tidy(body)}"
+                break
+    # The team answer is better with where it was made
+    if "team" in answers and "origin" in answers:
+        answers["team"] += "\n\n" + answers["origin"]
+    steps = [f"{i}. **{title}**: {_tidy(body)}" for i, (title, body) in enumerate(_numbered(howto), 1)]
+    if steps:
+        answers["howto"] = f"{INTENTS['howto'][1]} Here's how to build your website in {len(steps)} simple steps:\n\n" \
+                           + "\n".join(steps)
+    answers["greeting"] = f"{INTENTS['greeting'][1]} Hey! I'm NexaBot, your NexaBuild assistant. " \
+                          "Ask me how to create, edit, preview or deploy a website 🚀"
+    answers["thanks"] = f"{INTENTS['thanks'][1]} Anytime! Happy building 🚀"
+    return answers
+
+
+class FAQMatcher:
+    def __init__(self, system_prompt):
+        self.answers = build_answers(system_prompt)
+        self.patterns = {intent: [(re.compile(p, re.I), w) for p, w in INTENTS[intent][2].items()]
+                         for intent in self.answers}
+        # Words a canned answer can speak to; a question naming anything else (netlify, a snake
+        # game, ...) is about something the answers don't cover and goes to the model
+        text = " ".join(self.answers.values()) + " " + " ".join(p for i in INTENTS.values() for p in i[2])
+        self.vocabulary = set(re.findall(r"[a-z]+", text.lower())) | FILLER
+
+    def score(self, query):
+        text = re.sub(r"\s+", " ", query.strip().lower())
+        return {intent: sum(w for p, w in patterns if p.search(text)) for intent, patterns in self.patterns.items()}
+
+    def match(self, query):
+        """Returns (intent, answer) for a known question, else None."""
+        text = query.strip()
+        if not text or len(text.split()) > MAX_WORDS or OPEN_ENDED.search(text):
+            return None
+        if any(w not in self.vocabulary for w in re.findall(r"[a-z]+", text.lower())):
+            return None
+        ranked = sorted(self.score(text).items(), key=lambda kv: kv[1], reverse=True)
+        (best, best_score), runner_up = ranked[0], (ranked[1][1] if len(ranked) > 1 else 0)
+        if best_score < MIN_SCORE or best_score == runner_up:
+            return None
+        return best, self.answers[best]
+
+
+# -----------------------------------------------------
+# Metrics (process-wide; a NexaBot is created per question)
+# -----------------------------------------------------
+_matchers = {}
+_stats = {"faq": {"count": 0, "ms": 0.0}, "model": {"count": 0, "ms": 0.0}}
+_lock = threading.Lock()
+
+
+def get_matcher(system_prompt):
+    matcher = _matchers.get(system_prompt)
+    if matcher is None:
+        matcher = _matchers[system_prompt] = FAQMatcher(system_prompt)
+    return matcher
+
+
+def record(path, started):
+    """Counts one answered question; path is "faq" or "model", started a time.perf_counter() value."""
+    elapsed = (time.perf_counter() - started) * 1000
+    with _lock:
+        _stats[path]["count"] += 1
+        _stats[path]["ms"] += elapsed
+    if log.isEnabledFor(logging.DEBUG):
+        m = faq_metrics()
+        log.debug("%s answer in %.1fms | FAQ hit ratio %.0f%% (%d/%d), avg faq %.1fms, avg model %.0fms",
+                  path, elapsed, m["hit_ratio"] * 100, m["faq_hits"], m["questions"],
+                  m["faq_avg_ms"], m["model_avg_ms"])
+    return elapsed
+
+
+def faq_metrics():
+    """Process-wide hit ratio and average latencies, shown in the NexaBot popover and the profiling panel."""
+    with _lock:
+        faq, model = dict(_stats["faq"]), dict(_stats["model"])
+    total = faq["count"] + model["count"]
+    return {
+        "questions": total,
+        "faq_hits": faq["count"],
+        "hit_ratio": faq["count"] / total if total else 0.0,
+        "faq_avg_ms": faq["ms"] / faq["count"] if faq["count"] else 0.0,
+        "model_avg_ms": model["ms"] / model["count"] if model["count"] else 0.0,
+    }
@@ -0,0 +1,29 @@
+# ai/fileutil.py
+# Small filesystem helpers shared by modules whose state several processes
+# (API workers, batch runs, Streamlit sessions) read and write at once.
+
+import contextlib
+import os
+
+try:
+    import fcntl
+except ImportError:   # Windows
+    fcntl = None
+    import msvcrt
+
+
+@contextlib.contextmanager
+def locked_file(path):
+    """Opens (creating if needed) `path` for read/write under an exclusive cross-process lock."""
+    fd = os.open(path, os.O_RDWR | os.O_CREAT, 0o644)
+    with os.fdopen(fd, "r+", encoding="utf-8") as f:
+        if fcntl:
+            fcntl.flock(f, fcntl.LOCK_EX)
+        else:
+            msvcrt.locking(f.fileno(), msvcrt.LK_LOCK, 1)
+        try:
+            yield f
+        finally:
+            if not fcntl:
+                f.seek(0)
+                msvcrt.locking(f.fileno(), msvcrt.LK_UNLCK, 1)
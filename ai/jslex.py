@@ -0,0 +1,183 @@
+# ai/jslex.py
+# Small pure-Python JavaScript lexer. Good enough to tell code from strings,
+# template literals, regex literals and comments, which is all the build and
+# analysis passes need.
+
+import re
+
+PUNCT_BEFORE_REGEX = set("(,=:[!&|?{};+-*%<>~^")
+KEYWORDS_BEFORE_REGEX = {"return", "typeof", "instanceof", "in", "of", "new", "delete", "void", "throw",
+                         "case", "do", "else", "yield", "await"}
+
+_WORD = re.compile(r"[A-Za-z0-9_$\u0080-\uffff]+")
+_SPACE = re.compile(r"[ \t\f\v\u00a0\ufeff]+")
+
+
+class JSLexError(ValueError):
+    def __init__(self, message, pos, line):
+        super().__init__(f"{message} (line {line})")
+        self.pos = pos
+        self.line = line
+
+
+def _regex_allowed(prev):
+    if prev is None:
+        return True
+    kind, text = prev
+    if kind == "punct":
+        # After a postfix ++/-- (i++ / 2) a slash is division
+        return text not in ("++", "--") and text[-1] in PUNCT_BEFORE_REGEX
+    if kind == "word":
+        return text in KEYWORDS_BEFORE_REGEX
+    return False
+
+
+def _scan_string(src, i, quote):
+    n = len(src)
+    j = i + 1
+    while j < n:
+        c = src[j]
+        if c == "\\":
+            j += 2
+            continue
+        if c == quote:
+            return j + 1
+        if c == "\n":
+            return -1
+        j += 1
+    return -1
+
+
+def _scan_template(src, i):
+    """Returns the end of a template literal starting at src[i] == '`', following ${...} nesting."""
+    n = len(src)
+    j = i + 1
+    while j < n:
+        c = src[j]
+        if c == "\\":
+            j += 2
+        elif c == "`":
+            return j + 1
+        elif c == "$" and j + 1 < n and src[j + 1] == "{":
+            depth = 1
+            j += 2
+            while j < n and depth:
+                c = src[j]
+                if c in "\"'":
+                    end = _scan_string(src, j, c)
+                    if end < 0:
+                        return -1
+                    j = end
+                    continue
+                if c == "`":
+                    end = _scan_template(src, j)
+                    if end < 0:
+                        return -1
+                    j = end
+                    continue
+                if c == "{":
+                    depth += 1
+                elif c == "}":
+                    depth -= 1
+                j += 1
+        else:
+            j += 1
+    return -1
+
+
+def _scan_regex(src, i):
+    n = len(src)
+    j = i + 1
+    in_class = False
+    while j < n:
+        c = src[j]
+        if c == "\\":
+            j += 2
+            continue
+        if c == "\n":
+            return -1
+        if in_class:
+            if c == "]":
+                in_class = False
+        elif c == "[":
+            in_class = True
+        elif c == "/":
+            j += 1
+            while j < n and (src[j].isalnum() or src[j] == "_"):
+                j += 1
+            return j
+        j += 1
+    return -1
+
+
+def tokenize(src):
+    """
+    Yields (kind, text) tuples covering the whole source. Kinds: comment, string,
+    template, regex, word, punct, space, newline. Raises JSLexError on unterminated literals.
+    """
+    n = len(src)
+    i = 0
+    line = 1
+    prev = None  # last significant token, used to disambiguate regex vs division
+    while i < n:
+        c = src[i]
+        start = i
+        if c == "\n" or c == "\r":
+            i += 2 if src.startswith("\r\n", i) else 1
+            line += 1
+            yield "newline", "\n"
+            continue
+        m = _SPACE.match(src, i)
+        if m:
+            i = m.end()
+            yield "space", src[start:i]
+            continue
+        if c == "/" and i + 1 < n and src[i + 1] == "/":
+            end = src.find("\n", i)
+            i = n if end < 0 else end
+            yield "comment", src[start:i]
+            continue
+        if c == "/" and i + 1 < n and src[i + 1] == "*":
+            end = src.find("*/", i + 2)
+            if end < 0:
+                raise JSLexError("Unterminated block comment", start, line)
+            i = end + 2
+            line += src.count("\n", start, i)
+            yield "comment", src[start:i]
+            continue
+        if c in "\"'":
+            end = _scan_string(src, i, c)
+            if end < 0:
+                raise JSLexError("Unterminated string literal", start, line)
+            i = end
+            prev = ("string", src[start:i])
+            yield prev
+            continue
+        if c == "`":
+            end = _scan_template(src, i)
+            if end < 0:
+                raise JSLexError("Unterminated template literal", start, line)
+            i = end
+            line += src.count("\n", start, i)
+            prev = ("template", src[start:i])
+            yield prev
+            continue
+        if c == "/" and _regex_allowed(prev):
+            end = _scan_regex(src, i)
+            if end > 0:
+                i = end
+                prev = ("regex", src[start:i])
+                yield prev
+                continue
+        m = _WORD.match(src, i)
+        if m:
+            i = m.end()
+            prev = ("word", src[start:i])
+            yield prev
+            continue
+        i += 1
+        if c in "+-" and prev == ("punct", c) and src[i - 2] == c:
+            prev = ("punct", c + c)  # remembered as one operator for _regex_allowed()
+        else:
+            prev = ("punct", c)
+        yield "punct", c
@@ -0,0 +1,371 @@
+# ai/jsonrepair.py
+# Single-pass extraction and repair of the JSON payload in an LLM reply.
+# Shared by BaseAgent (agents) and WebsiteGenerator (ai.utils).
+#
+# A well-formed payload is decoded by one json raw_decode call starting at its
+# first brace, whatever prose or code fences surround it. Anything else is
+# rewritten in one linear scan that skips surrounding prose/code fences and
+# fixes the usual defects: raw newlines/tabs and bad escapes inside strings,
+# unescaped inner quotes, trailing or missing commas, comments, single-quoted
+# strings, unquoted keys, Python literals; truncated output is detected (and rejected by default).
+
+import json
+import re
+import time
+
+_WS = re.compile(r"\s*")
+_NUMBER = re.compile(r"-?(?:\d+\.?\d*|\.\d+)(?:[eE][+-]?\d+)?")
+_WORD = re.compile(r"[A-Za-z_$][\w$-]*")
+_HEX4 = re.compile(r"[0-9a-fA-F]{4}")
+# Runs of characters that can be copied into a JSON string as-is, per opening quote
+_PLAIN = {
+    '"': re.compile(r'[^"\\\x00-\x1f]+'),
+    "'": re.compile(r"[^'\"\\\x00-\x1f]+"),
+    "`": re.compile(r'[^`"\\\x00-\x1f]+'),
+}
+_CONTROL = {"\n": "\\n", "\r": "\\r", "\t": "\\t", "\b": "\\b", "\f": "\\f"}
+VALID_ESCAPES = set('"\\/bfnrt')
+LITERALS = {"true": "true", "false": "false", "null": "null",
+            "True": "true", "False": "false", "None": "null", "undefined": "null", "NaN": "null"}
+VALUE_START = set('"\'`{[-0123456789tfnTFNu')
+
+
+class JSONRepairError(ValueError):
+    def __init__(self, message, diagnostics):
+        super().__init__(message)
+        self.diagnostics = diagnostics
+
+
+class _Repairer:
+    def __init__(self, text, diagnostics):
+        self.text = text
+        self.n = len(text)
+        self.out = []
+        self.stack = []  # [kind, expecting]: "{" expects key/colon/value/comma, "[" expects value/comma
+        self.repairs = diagnostics["repairs"]
+        self.diagnostics = diagnostics
+
+    def note(self, kind):
+        self.repairs[kind] = self.repairs.get(kind, 0) + 1
+
+    # ------------------------------
+    # Structure
+    # ------------------------------
+    def run(self, i):
+        text, n, stack, out = self.text, self.n, self.stack, self.out
+        while i < n:
+            i = _WS.match(text, i).end()
+            if i >= n:
+                break
+            c = text[i]
+            if c == "/" and text.startswith(("//", "/*"), i):
+                end = text.find("\n", i) if text[i + 1] == "/" else text.find("*/", i + 2) + 2
+                i = n if end <= 0 else end
+                self.note("comment")
+            elif c in "{[":
+                self._value_starts()
+                stack.append([c, "key" if c == "{" else "value"])
+                out.append(c)
+                i += 1
+            elif c in "}]":
+                i = self._close(c, i)
+                if not stack:
+                    break
+            elif c == ",":
+                if stack and stack[-1][1] == "comma":
+                    out.append(",")
+                    stack[-1][1] = "key" if stack[-1][0] == "{" else "value"
+                else:
+                    self.note("stray-comma")
+                i += 1
+            elif c == ":":
+                if stack and stack[-1][0] == "{" and stack[-1][1] == "colon":
+                    out.append(":")
+                    stack[-1][1] = "value"
+                else:
+                    self.note("stray-colon")
+                i += 1
+            elif c in "\"'`":
+                is_key = stack[-1][0] == "{" and stack[-1][1] in ("key", "comma")
+                if is_key:
+                    self._key_starts()
+                else:
+                    self._value_starts()
+                if c != '"':
+                    self.note("non-double-quoted-string")
+                i = self._string(i, c, is_key)
+                if is_key:
+                    stack[-1][1] = "colon"
+            elif c == "-" or c == "." or c.isdigit():
+                m = _NUMBER.match(text, i)
+                if not m:
+                    self.note("stray-char")
+                    i += 1
+                    continue
+                self._value_starts()
+                out.append(self._number(m.group()))
+                i = m.end()
+            elif c.isalpha() or c in "_$":
+                m = _WORD.match(text, i)
+                word = m.group()
+                if stack[-1][0] == "{" and stack[-1][1] in ("key", "comma"):
+                    self._key_starts()
+                    out.append(json.dumps(word))
+                    stack[-1][1] = "colon"
+                    self.note("unquoted-key")
+                else:
+                    self._value_starts()
+                    if word in LITERALS:
+                        out.append(LITERALS[word])
+                        if LITERALS[word] != word:
+                            self.note("non-json-literal")
+                    else:
+                        out.append(json.dumps(word))
+                        self.note("bare-word")
+                i = m.end()
+            else:
+                self.note("stray-char")
+                i += 1
+        if stack:
+            # Output was cut off: close whatever is still open
+            self.diagnostics["truncated"] = True
+            while stack:
+                self._close(stack[-1][0] == "{" and "}" or "]", None)
+        return i
+
+    def _key_starts(self):
+        if self.stack[-1][1] == "comma":
+            self.out.append(",")
+            self.note("missing-comma")
+
+    def _value_starts(self):
+        if not self.stack:
+            return
+        frame = self.stack[-1]
+        if frame[1] == "comma":
+            self.out.append(",")
+            self.note("missing-comma")
+            if frame[0] == "{":
+                # A value where a key belongs; keep it as a key-less entry so nothing is lost
+                self.out.append(f'"_{len(self.out)}":')
+                self.note("missing-key")
+        elif frame[0] == "{" and frame[1] in ("key", "colon"):
+            if frame[1] == "key":
+                self.out.append(f'"_{len(self.out)}"')
+                self.note("missing-key")
+            self.out.append(":")
+            self.note("missing-colon")
+        frame[1] = "comma"
+
+    def _close(self, closer, i):
+        stack, out = self.stack, self.out
+        want = "}" if stack[-1][0] == "{" else "]"
+        if closer != want:
+            # Close up to a matching frame if there is one, otherwise ignore the stray closer
+            if not any((f[0] == "{") == (closer == "}") for f in stack):
+                self.note("stray-closer")
+                return i + 1 if i is not None else i
+            self.note("mismatched-bracket")
+            closer = want
+            advance = False
+        else:
+            advance = True
+        kind, expecting = stack.pop()
+        if kind == "{" and expecting == "colon":
+            out.append(":null")
+            self.note("missing-value")
+        elif kind == "{" and expecting == "value":
+            out.append("null")
+            self.note("missing-value")
+        if out and out[-1] == ",":
+            out.pop()
+            self.note("trailing-comma")
+        out.append(closer)
+        if i is None:
+            return None
+        return i + 1 if advance else i
+
+    # ------------------------------
+    # Scalars
+    # ------------------------------
+    def _number(self, token):
+        fixed = token
+        if fixed.startswith("."):
+            fixed = "0" + fixed
+        elif fixed.startswith("-."):
+            fixed = "-0" + fixed[1:]
+        fixed = re.sub(r"\.(?=[eE]|$)", ".0", fixed)
+        if fixed != token:
+            self.note("number-format")
+        return fixed
+
+    def _closes(self, j, is_key):
+        """Is the quote at j the end of the string (vs. an unescaped quote inside it)?"""
+        text, n = self.text, self.n
+        k = _WS.match(text, j + 1).end()
+        if k >= n:
+            return True
+        nc = text[k]
+        if is_key:
+            return nc in ":,}"
+        if nc in "}]":
+            return True
+        newline = "\n" in text[j + 1:k]
+        if nc == ",":
+            k2 = _WS.match(text, k + 1).end()
+            if k2 >= n:
+                return True
+            nc2 = text[k2]
+            if self.stack and self.stack[-1][0] == "{":
+                return nc2 in "\"'}" or bool(re.match(r"[A-Za-z_$][\w$-]*\s*:", text[k2:k2 + 64]))
+            return nc2 in VALUE_START or nc2 == "]"
+        # Missing comma before the next key on a new line
+        return newline and nc in "\"'"
+
+    def _string(self, i, quote, is_key):
+        text, n, out = self.text, self.n, self.out
+        plain = _PLAIN[quote]
+        out.append('"')
+        j = i + 1
+        while True:
+            m = plain.match(text, j)
+            if m:
+                out.append(m.group())
+                j = m.end()
+            if j >= n:
+                out.append('"')
+                self.diagnostics["truncated"] = True
+                return j
+            c = text[j]
+            if c == "\\":
+                nxt = text[j + 1] if j + 1 < n else ""
+                if nxt in VALID_ESCAPES and nxt:
+                    out.append("\\" + nxt)
+                    j += 2
+                elif nxt == "u" and _HEX4.match(text, j + 2):
+                    out.append(text[j:j + 6])
+                    j += 6
+                elif nxt in ("'", "`"):
+                    out.append(nxt)
+                    j += 2
+                else:
+                    out.append("\\\\")
+                    self.note("invalid-escape")
+                    j += 1
+            elif c == quote:
+                if self._closes(j, is_key):
+                    out.append('"')
+                    return j + 1
+                out.append('\\"')
+                self.note("unescaped-quote")
+                j += 1
+            elif c == '"':
+                out.append('\\"')
+                j += 1
+            else:
+                out.append(_CONTROL.get(c) or "\\u%04x" % ord(c))
+                self.note("control-char")
+                j += 1
+
+
+def _new_diagnostics():
+    return {"fast_path": False, "start": None, "end": None, "repairs": {},
+            "truncated": False, "trailing_text": False, "ms": 0.0}
+
+
+_decoder = json.JSONDecoder()
+
+
+MAX_CANDIDATES = 3   # payload starts tried when prose before the JSON also contains braces
+
+
+def _payload_start(text, pos=0):
+    """Index of the first `{` or `[` at or after `pos`, whichever comes first; -1 if neither."""
+    starts = [i for i in (text.find("{", pos), text.find("[", pos)) if i != -1]
+    return min(starts) if starts else -1
+
+
+def _trailing_text(text, end):
+    return bool(text[end:].strip().strip("`").strip())
+
+
+def repair_json(text, diagnostics=None, start=None):
+    """Returns (json_text, diagnostics) for the first JSON object/array in `text` (or the one at `start`)."""
+    diagnostics = diagnostics or _new_diagnostics()
+    start = _payload_start(text) if start is None else start
+    if start == -1:
+        raise JSONRepairError("No JSON object found in model output", diagnostics)
+    diagnostics["start"] = start
+    repairer = _Repairer(text, diagnostics)
+    end = min(repairer.run(start), len(text))
+    diagnostics["end"] = end
+    diagnostics["trailing_text"] = _trailing_text(text, end)
+    return "".join(repairer.out), diagnostics
+
+
+def _parse_at(text, start):
+    diagnostics = _new_diagnostics()
+    # Fast path: one C-level decode from the brace; prose and fences around it are ignored
+    try:
+        value, end = _decoder.raw_decode(text, start)
+        diagnostics.update(fast_path=True, start=start, end=end, trailing_text=_trailing_text(text, end))
+        return value, diagnostics
+    except ValueError:
+        pass
+    repaired, diagnostics = repair_json(text, diagnostics, start)
+    try:
+        return json.loads(repaired), diagnostics
+    except ValueError as e:
+        raise JSONRepairError(f"Could not repair model JSON: {e}", diagnostics) from e
+
+
+def _check_truncated(value, diagnostics, allow_truncated):
+    if diagnostics["truncated"] and not allow_truncated:
+        raise JSONRepairError("Model output was cut off before the JSON ended", diagnostics)
+    return value, diagnostics
+
+
+def parse_json(text, allow_truncated=False):
+    """
+    Parses the JSON payload of a model reply. Returns (value, diagnostics);
+    raises JSONRepairError (a ValueError) when nothing usable is found. Output that
+    was cut off (e.g. at the model's output limit) is rejected too unless
+    `allow_truncated` is set: closing it would ship half-written files.
+    """
+    started = time.perf_counter()
+    text = text or ""
+    start = _payload_start(text)
+    fallback, error = None, None
+    for _ in range(MAX_CANDIDATES):
+        if start == -1:
+            break
+        try:
+            value, diagnostics = _parse_at(text, start)
+        except JSONRepairError as e:
+            error = e
+            value, diagnostics = None, e.diagnostics
+        else:
+            # A brace in leading prose parses as a tiny "repaired" object; the real payload follows it
+            if diagnostics["fast_path"] or _payload_start(text, diagnostics["end"]) == -1:
+                diagnostics["ms"] = (time.perf_counter() - started) * 1000
+                return _check_truncated(value, diagnostics, allow_truncated)
+            fallback = fallback or (value, diagnostics)
+        start = _payload_start(text, (diagnostics["end"] or start + 1) if value is not None else start + 1)
+    if fallback:
+        fallback[1]["ms"] = (time.perf_counter() - started) * 1000
+        return _check_truncated(*fallback, allow_truncated)
+    if error is None:
+        error = JSONRepairError("No JSON object found in model output", _new_diagnostics())
+    error.diagnostics["ms"] = (time.perf_counter() - started) * 1000
+    raise error
+
+
+def describe(diagnostics):
+    """One-line summary for logs, e.g. 'repaired 3 issue(s) (control-char x2, trailing-comma) in 4.1ms'."""
+    repairs = diagnostics.get("repairs") or {}
+    if diagnostics.get("fast_path"):
+        return f"clean JSON in {diagnostics['ms']:.1f}ms"
+    parts = [f"{k} x{v}" if v > 1 else k for k, v in sorted(repairs.items())]
+    if diagnostics.get("truncated"):
+        parts.append("truncated")
+    return f"repaired {sum(repairs.values())} issue(s) ({', '.join(parts) or 'extracted'}) in {diagnostics['ms']:.1f}ms"
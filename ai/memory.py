@@ -0,0 +1,129 @@
+# ai/memory.py
+# Token-budgeted conversation memory: recent turns stay verbatim, older turns are
+# rolled into a bounded running summary, so the prompt sent per turn stays flat
+# no matter how long the conversation gets.
+
+import re
+
+from ai.tokens import estimate_tokens
+
+HISTORY_TOKEN_BUDGET = 1200   # verbatim turns
+SUMMARY_TOKEN_BUDGET = 300    # running summary
+KEEP_RECENT_TURNS = 4         # always verbatim, even over budget
+SUMMARY_LINE_CHARS = 160
+
+
+def _first_sentence(text, limit=SUMMARY_LINE_CHARS):
+    text = re.sub(r"\s+", " ", re.sub(r"[*_`#>]+", "", text or "")).strip()
+    m = re.match(r"(.+?[.!?])(\s|$)", text)
+    sentence = m.group(1) if m else text
+    return sentence if len(sentence) <= limit else sentence[:limit - 1].rstrip() + "…"
+
+
+def summarize_turns(summary_lines, turns):
+    """Default summarizer: one extractive line per rolled-off turn. No model call, so it costs nothing."""
+    for turn in turns:
+        who = "User" if turn["role"] == "user" else "Assistant"
+        summary_lines.append(f"{who}: {_first_sentence(turn['content'])}")
+    return summary_lines
+
+
+class ConversationMemory:
+    def __init__(self, budget=HISTORY_TOKEN_BUDGET, summary_budget=SUMMARY_TOKEN_BUDGET,
+                 keep_recent=KEEP_RECENT_TURNS, summarizer=summarize_turns):
+        self.budget = budget
+        self.summary_budget = summary_budget
+        self.keep_recent = keep_recent
+        self.summarizer = summarizer
+        self.turns = []          # [{"role": "user"|"model", "content": str, "tokens": int}]
+        self.summary_lines = []
+        self.rolled = 0          # turns folded into the summary so far
+
+    def add(self, role, content):
+        role = "user" if role == "user" else "model"
+        self.turns.append({"role": role, "content": content, "tokens": estimate_tokens(content)})
+        self._compact()
+
+    def _compact(self):
+        verbatim = sum(t["tokens"] for t in self.turns)
+        rolled = []
+        while verbatim > self.budget and len(self.turns) > self.keep_recent:
+            turn = self.turns.pop(0)
+            verbatim -= turn["tokens"]
+            rolled.append(turn)
+        # Keep user/model alternation after the summary exchange
+        while rolled and self.turns and self.turns[0]["role"] == "model":
+            rolled.append(self.turns.pop(0))
+        if rolled:
+            self.rolled += len(rolled)
+            self.summary_lines = self.summarizer(self.summary_lines, rolled)
+            # Oldest summary lines go first once the summary is over its own budget
+            while len(self.summary_lines) > 1 and estimate_tokens("\n".join(self.summary_lines)) > self.summary_budget:
+                self.summary_lines.pop(0)
+
+    @property
+    def summary(self):
+        return "\n".join(self.summary_lines)
+
+    def history(self):
+        """Gemini chat history: the summary (as one exchange) followed by the verbatim turns."""
+        messages = []
+        if self.summary_lines:
+            messages.append({"role": "user", "parts": "Summary of our earlier conversation:\n" + self.summary})
+            messages.append({"role": "model", "parts": "Got it, I'll keep that in mind."})
+        messages.extend({"role": t["role"], "parts": t["content"]} for t in self.turns)
+        return messages
+
+    def prompt_tokens(self):
+        return estimate_tokens(self.summary) + sum(t["tokens"] for t in self.turns)
+
+    def stats(self):
+        return {"verbatim_turns": len(self.turns), "summarized_turns": self.rolled, "prompt_tokens": self.prompt_tokens()}
+
+
+# -----------------------------------------------------
+# Edit-session memory (workspace Team Chat)
+# -----------------------------------------------------
+EDIT_TOKEN_BUDGET = 400
+EDIT_SUMMARY_TOKEN_BUDGET = 200
+KEEP_RECENT_EDITS = 3
+EDIT_REQUEST_CHARS = 300
+
+
+def summarize_edits(summary_lines, turns):
+    """Older edits collapse to `request -> outcome` one-liners."""
+    for turn in turns:
+        request, _, outcome = turn["content"].rpartition(" -> ")
+        summary_lines.append(f"{_first_sentence(request, 80)} -> {outcome}")
+    return summary_lines
+
+
+class EditMemory(ConversationMemory):
+    """Compact log of prior edit requests and what they changed, for Developer.modify_code."""
+
+    def __init__(self, budget=EDIT_TOKEN_BUDGET, summary_budget=EDIT_SUMMARY_TOKEN_BUDGET,
+                 keep_recent=KEEP_RECENT_EDITS):
+        super().__init__(budget, summary_budget, keep_recent, summarize_edits)
+
+    def record(self, request, changed_files=None, note=None):
+        request = _first_sentence(request, EDIT_REQUEST_CHARS) if len(request or "") > EDIT_REQUEST_CHARS \
+            else re.sub(r"\s+", " ", request or "").strip()
+        if changed_files:
+            outcome = "changed " + ", ".join(sorted(changed_files))
+        else:
+            outcome = "no changes applied"
+        if note:
+            outcome += f" ({note})"
+        # Stored as a single user-role entry so it never needs a model reply to pair with
+        self.add("user", f"\"{request}\" -> {outcome}.")
+
+    def as_prompt(self):
+        """Text block for the edit prompt, or "" before the first edit."""
+        if not self.turns and not self.summary_lines:
+            return ""
+        parts = []
+        if self.summary_lines:
+            parts.append("Earlier edits (summarized):\n" + "\n".join(f"- {line}" for line in self.summary_lines))
+        if self.turns:
+            parts.append("Recent edits (oldest first):\n" + "\n".join(f"- {t['content']}" for t in self.turns))
+        return "\n".join(parts)
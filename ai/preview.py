@@ -0,0 +1,577 @@
+# ai/preview.py
+# Multi-page live preview: resolves <link>/<script src>/<a href>/url() references
+# across all project files and serves them from an in-process, content-hash
+# addressed static server. The server only works where the browser can reach its
+# port, so it is opt-in; the inline single-document bundle is the default.
+
+import base64
+import hashlib
+import json
+import mimetypes
+import os
+import posixpath
+import re
+import threading
+import time
+from collections import OrderedDict
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import unquote, urlsplit
+
+from ai.datalayer import DATA_LAYER_FILE
+
+PREVIEW_HOST = os.environ.get("NEXABUILD_PREVIEW_HOST", "127.0.0.1")
+PREVIEW_PORT = int(os.environ.get("NEXABUILD_PREVIEW_PORT", "0"))  # 0 = any free port
+# URL the *browser* uses to reach the server (set when behind a proxy); defaults to host:port
+PREVIEW_PUBLIC_URL = os.environ.get("NEXABUILD_PREVIEW_PUBLIC_URL", "")
+# A 127.0.0.1 URL is blank for remote browsers (Codespaces, Streamlit Cloud), so the server
+# is used only when asked for or when a public URL for it is configured
+PREVIEW_SERVER_ENABLED = os.environ.get("NEXABUILD_PREVIEW_SERVER", "0") == "1" or bool(PREVIEW_PUBLIC_URL)
+# Published sites kept in memory (least recently used beyond this are dropped) and their idle lifetime
+PREVIEW_MAX_SITES = int(os.environ.get("NEXABUILD_PREVIEW_MAX_SITES", "64"))
+PREVIEW_SITE_TTL = int(os.environ.get("NEXABUILD_PREVIEW_SITE_TTL", "3600"))
+
+# Assets the old combine_to_html always inlined; entry pages that don't link them get them added
+DEFAULT_STYLES = ("styles.css",)
+DEFAULT_SCRIPTS = (DATA_LAYER_FILE, "script.js")
+
+INLINE_CACHE_MAX = 32
+
+_ATTR_REF = re.compile(r"""(\b(?:src|href)\s*=\s*)(["'])(.*?)\2""", re.I | re.S)
+_CSS_URL = re.compile(r"""(url\(\s*)(["']?)([^"')]+)\2(\s*\))|(@import\s+)(["'])([^"']+)\6([^;{}]*;)?""", re.I)
+_LINK_TAG = re.compile(r"<link\b[^>]*>", re.I)
+_SCRIPT_SRC_TAG = re.compile(r"<script\b([^>]*)\bsrc\s*=\s*([\"'])(.*?)\2([^>]*)>\s*</script\s*>", re.I | re.S)
+
+
+def is_page(name):
+    return name.lower().endswith((".html", ".htm"))
+
+
+def list_pages(files, plan=None):
+    """HTML pages of the project, index.html first, then plan order, then the rest."""
+    pages = [n for n in files if is_page(n)]
+    order = ["index.html"]
+    for page in (plan or {}).get("pages", []) if isinstance(plan, dict) else []:
+        if isinstance(page, dict) and page.get("filename"):
+            order.append(page["filename"])
+    ranked = [p for p in order if p in pages]
+    return list(OrderedDict.fromkeys(ranked + sorted(pages)))
+
+
+def resolve_ref(base, ref):
+    """
+    Resolves a reference found in file `base` to a project file name, or None
+    for external URLs, anchors, data: URIs and the like.
+    """
+    ref = ref.strip()
+    if not ref or ref.startswith(("#", "//", "data:", "javascript:", "mailto:", "tel:", "blob:")):
+        return None
+    parts = urlsplit(ref)
+    if parts.scheme or parts.netloc:
+        return None
+    path = unquote(parts.path)
+    if not path:
+        return None
+    if path.startswith("/"):
+        resolved = path.lstrip("/")
+    else:
+        resolved = posixpath.normpath(posixpath.join(posixpath.dirname(base), path))
+    if resolved.startswith("../") or resolved == "..":
+        return None
+    return resolved
+
+
+def _tag_attr(tag, attr):
+    m = re.search(rf"""\b{attr}\s*=\s*(["'])(.*?)\1""", tag, re.I | re.S)
+    return m.group(2) if m else None
+
+
+def _ensure_defaults(html, page, files):
+    """Adds the default stylesheet/scripts to an entry page that doesn't reference them (fragments)."""
+    if page != "index.html":
+        return html
+    referenced = {resolve_ref(page, m.group(3)) for m in _ATTR_REF.finditer(html)}
+    head_tags = "".join(f'<link rel="stylesheet" href="{n}">' for n in DEFAULT_STYLES
+                        if n in files and n not in referenced)
+    body_tags = "".join(f'<script src="{n}"></script>' for n in DEFAULT_SCRIPTS
+                        if n in files and n not in referenced)
+    if head_tags:
+        m = re.search(r"</head\s*>", html, re.I)
+        html = html[:m.start()] + head_tags + html[m.start():] if m else head_tags + html
+    if body_tags:
+        m = re.search(r"</body\s*>", html, re.I)
+        html = html[:m.start()] + body_tags + html[m.start():] if m else html + body_tags
+    return html
+
+
+def rewrite_html_refs(html, page, mapper):
+    """
+    Rewrites src/href attributes through mapper(resolved_name) -> new URL, or None to keep.
+    The mapper may also return (url, extra_attributes) to add attributes to the same tag.
+    """
+    def repl(m):
+        target = resolve_ref(page, m.group(3))
+        new = mapper(target) if target else None
+        if not new:
+            return m.group(0)
+        extra = ""
+        if isinstance(new, tuple):
+            new, extra = new[0], new[1] + " "
+        return f"{extra}{m.group(1)}{m.group(2)}{new}{m.group(2)}"
+    return _ATTR_REF.sub(repl, html)
+
+
+def rewrite_css_refs(css, base, mapper):
+    def repl(m):
+        if m.group(1):
+            target = resolve_ref(base, m.group(3))
+            new = mapper(target) if target else None
+            return f"{m.group(1)}{m.group(2)}{new}{m.group(2)}{m.group(4)}" if new else m.group(0)
+        target = resolve_ref(base, m.group(7))
+        new = mapper(target) if target else None
+        return f"{m.group(5)}{m.group(6)}{new}{m.group(6)}{m.group(8) or ''}" if new else m.group(0)
+    return _CSS_URL.sub(repl, css)
+
+
+def classify_changes(old_files, new_files):
+    """
+    Which files changed between two project snapshots, and how the preview must react:
+    "none", "css" (swap stylesheets in place) or "reload" (JS/HTML/other assets changed).
+    """
+    old_files = old_files or {}
+    changed = sorted(n for n in set(old_files) | set(new_files) if old_files.get(n) != new_files.get(n))
+    if not changed:
+        kind = "none"
+    elif all(n.lower().endswith(".css") and n in new_files for n in changed):
+        kind = "css"
+    else:
+        kind = "reload"
+    return {"kind": kind, "changed": changed}
+
+
+# Injected into served pages: stylesheet swaps happen in place, anything else reloads
+# the page (same origin, so the app's localStorage/IndexedDB data survives).
+_HOT_CLIENT = """<script data-nexa-hot>
+(function () {
+  if (!window.EventSource) return;
+  var es = new EventSource(%(events_url)s);
+  es.onmessage = function (e) {
+    var msg = JSON.parse(e.data);
+    if (msg.type === "css") {
+      msg.files.forEach(function (f) {
+        document.querySelectorAll('link[data-nexa-src="' + f.name + '"]').forEach(function (old) {
+          var link = old.cloneNode();
+          link.href = f.url;
+          link.onload = function () { old.remove(); };
+          old.after(link);
+        });
+      });
+    } else if (msg.type === "reload") {
+      es.close();
+      location.reload();
+    }
+  };
+})();
+</script>"""
+
+EVENT_HISTORY = 50
+SSE_HEARTBEAT_SECONDS = 15
+
+
+# -----------------------------------------------------
+# Inline bundle (fallback: one self-contained document per page)
+# -----------------------------------------------------
+_inline_cache = OrderedDict()
+_inline_lock = threading.Lock()
+
+# Every page carries this; only the entry page embeds the page map, later pages find it on the iframe
+_NAV_SHIM = """<script>
+(function () {
+  // Multi-page navigation inside a single srcdoc iframe
+  var frame = null;
+  try { frame = window.frameElement; } catch (err) {}
+  var pages = window.__nexaPages || (frame && frame.__nexaPages) || %s;
+  if (!pages) return;
+  window.__nexaPages = pages;
+  if (frame) frame.__nexaPages = pages;
+  // document.open() drops listeners, so the guard lives on the (replaced) root element
+  if (document.documentElement.__nexaNavBound) return;
+  document.documentElement.__nexaNavBound = true;
+  document.addEventListener("click", function (e) {
+    var a = e.target.closest && e.target.closest("a[data-nexa-page]");
+    if (e.__nexaHandled || !a || !pages[a.getAttribute("data-nexa-page")]) return;
+    e.__nexaHandled = true;
+    e.preventDefault();
+    var html = pages[a.getAttribute("data-nexa-page")];
+    if (frame && "srcdoc" in frame) {
+      frame.srcdoc = html;  // a fresh document: new globals, scripts run cleanly
+      return;
+    }
+    document.open(); document.write(html); document.close();
+  }, true);
+})();
+</script>"""
+
+
+def _project_key(files):
+    h = hashlib.sha256()
+    for name in sorted(files):
+        h.update(name.encode("utf-8") + b"\0" + str(files[name]).encode("utf-8") + b"\0")
+    return h.hexdigest()
+
+
+def _data_uri(files, target):
+    if target not in files or is_page(target) or target.lower().endswith((".css", ".js", ".mjs")):
+        return None
+    content = files[target]
+    raw = content.encode("utf-8") if isinstance(content, str) else bytes(content)
+    ctype = mimetypes.guess_type(target)[0] or "application/octet-stream"
+    return f"data:{ctype};base64,{base64.b64encode(raw).decode()}"
+
+
+def _inline_css(files, name, seen=()):
+    """A stylesheet with local @imports inlined and local url() assets turned into data URIs."""
+    css = files[name]
+
+    def repl(m):
+        if m.group(1):
+            uri = _data_uri(files, resolve_ref(name, m.group(3)))
+            return f"{m.group(1)}{m.group(2)}{uri}{m.group(2)}{m.group(4)}" if uri else m.group(0)
+        target = resolve_ref(name, m.group(7))
+        if target in files and target not in seen and target != name:
+            return _inline_css(files, target, seen + (name,))
+        return m.group(0)
+    return _CSS_URL.sub(repl, css)
+
+
+def _inline_page(files, page):
+    html = _ensure_defaults(files[page], page, files)
+
+    def inline_link(m):
+        tag = m.group(0)
+        if "stylesheet" not in (_tag_attr(tag, "rel") or "").lower():
+            return tag
+        target = resolve_ref(page, _tag_attr(tag, "href") or "")
+        if target not in files:
+            return tag
+        return "<style>" + _inline_css(files, target) + "</style>"
+
+    def inline_script(m):
+        target = resolve_ref(page, m.group(3))
+        if target not in files:
+            return m.group(0)
+        attrs = re.sub(r"\s+", " ", (m.group(1) + m.group(4))).strip()
+        module = ' type="module"' if re.search(r"""type\s*=\s*["']module""", attrs, re.I) else ""
+        return f"<script{module}>" + files[target].replace("</script", "<\\/script") + "</script>"
+
+    html = _LINK_TAG.sub(inline_link, html)
+    html = _SCRIPT_SRC_TAG.sub(inline_script, html)
+
+    def rewrite_refs(m):
+        target = resolve_ref(page, m.group(3))
+        if target and is_page(target) and target in files and m.group(1).lower().startswith("href"):
+            return f'data-nexa-page="{target}" {m.group(0)}'
+        uri = _data_uri(files, target) if target else None
+        return f"{m.group(1)}{m.group(2)}{uri}{m.group(2)}" if uri else m.group(0)
+    return _ATTR_REF.sub(rewrite_refs, html)
+
+
+def _with_shim(html, pages_json):
+    shim = _NAV_SHIM % pages_json
+    m = re.search(r"</body\s*>", html, re.I)
+    return html[:m.start()] + shim + html[m.start():] if m else html + shim
+
+
+def bundle_inline(files, page="index.html"):
+    """
+    Self-contained HTML for `page`: local stylesheets/scripts inlined, links between
+    pages handled by a small click shim. Cached by project content hash.
+    """
+    if page not in files:
+        return None
+    key = (_project_key(files), page)
+    with _inline_lock:
+        if key in _inline_cache:
+            _inline_cache.move_to_end(key)
+            return _inline_cache[key]
+
+    pages = [p for p in files if is_page(p)]
+    html = _inline_page(files, page)
+    if len(pages) > 1:
+        others = {p: _with_shim(_inline_page(files, p), "null") for p in pages}
+        html = _with_shim(html, json.dumps(others).replace("</", "<\\/"))
+
+    with _inline_lock:
+        _inline_cache[key] = html
+        while len(_inline_cache) > INLINE_CACHE_MAX:
+            _inline_cache.popitem(last=False)
+    return html
+
+
+# -----------------------------------------------------
+# Content-hash addressed preview server
+# -----------------------------------------------------
+class PreviewServer:
+    """
+    Pages live at /s/<site>/<path> (stable URL, revalidated every load); every other
+    file is served from /a/<sha>/<name> with an immutable cache header, so a reload
+    only downloads assets whose content actually changed.
+    """
+
+    def __init__(self, host=PREVIEW_HOST, port=PREVIEW_PORT, public_url=PREVIEW_PUBLIC_URL):
+        self.blobs = {}        # sha -> (bytes, content type)
+        # site -> {"key", "files", "routes": {path: sha}, "prev_routes", "events": [(id, payload)],
+        #          "last_id", "used"}, least recently used first
+        self.sites = OrderedDict()
+        self.lock = threading.Lock()
+        self.changed = threading.Condition(self.lock)
+        self.closing = False
+        self.httpd = ThreadingHTTPServer((host, port), self._handler())
+        self.httpd.daemon_threads = True
+        self.public_url = (public_url or f"http://{host}:{self.httpd.server_address[1]}").rstrip("/")
+        # Path prefix of the public URL (e.g. "/preview" behind a reverse proxy); every URL we emit carries it
+        self.base_path = urlsplit(self.public_url).path.rstrip("/")
+        self.thread = threading.Thread(target=self.httpd.serve_forever, name="nexabuild-preview", daemon=True)
+        self.thread.start()
+
+    # ------------------------------
+    # Publishing
+    # ------------------------------
+    def _store(self, name, data):
+        raw = data.encode("utf-8") if isinstance(data, str) else bytes(data)
+        sha = hashlib.sha256(raw).hexdigest()[:20]
+        ctype = mimetypes.guess_type(name)[0] or "application/octet-stream"
+        if ctype.startswith("text/") or ctype in ("application/javascript", "application/json", "image/svg+xml"):
+            ctype += "; charset=utf-8"
+        self.blobs[sha] = (raw, ctype)
+        return sha
+
+    def publish(self, site, files):
+        """
+        Publishes a {filename: content} dict for `site` and pushes a hot-reload event
+        to open previews. Returns the project key.
+        """
+        key = _project_key(files)
+        with self.lock:
+            previous = self.sites.get(site)
+            if previous and previous["key"] == key:
+                self._touch(site)
+                return key
+            last_id = previous["last_id"] if previous else 0
+
+            routes = {}
+            asset_urls = {}
+
+            def asset_url(target):
+                if target in asset_urls:
+                    return asset_urls[target]
+                if target not in files or is_page(target):
+                    return None
+                content = files[target]
+                if target.lower().endswith(".css") and isinstance(content, str):
+                    asset_urls[target] = None  # guards against @import cycles
+                    content = rewrite_css_refs(content, target, asset_url)
+                sha = self._store(target, content)
+                routes[target] = sha
+                asset_urls[target] = f"{self.base_path}/a/{sha}/{posixpath.basename(target)}"
+                return asset_urls[target]
+
+            def page_ref(target):
+                url = asset_url(target)
+                # Tag stylesheet links with their source name so the hot client can find them
+                return (url, f'data-nexa-src="{target}"') if url and target.lower().endswith(".css") else url
+
+            hot_client = _HOT_CLIENT % {
+                "events_url": json.dumps(f"{self.base_path}/e/{site}?since={last_id + 1}").replace("</", "<\\/")}
+            for name in files:
+                if is_page(name):
+                    html = rewrite_html_refs(_ensure_defaults(files[name], name, files), name, page_ref)
+                    m = re.search(r"</head\s*>", html, re.I)
+                    html = html[:m.start()] + hot_client + html[m.start():] if m else hot_client + html
+                    routes[name] = self._store(name, html)
+                else:
+                    asset_url(name)
+
+            record = {
+                "key": key,
+                "files": dict(files),
+                "routes": routes,
+                "prev_routes": previous["routes"] if previous else {},
+                "events": previous["events"] if previous else [],
+                "last_id": last_id,
+            }
+            self.sites[site] = record
+            self._touch(site)
+            if previous:
+                self._push_event(record, previous, classify_changes(previous["files"], files))
+            self._evict()
+            self._collect_garbage()
+        return key
+
+    def _push_event(self, record, previous, change):
+        if change["kind"] == "none":
+            return
+        payload = {"type": "reload", "changed": change["changed"]}
+        if change["kind"] == "css":
+            # Served URLs of stylesheets whose rewritten content changed (covers @import parents too)
+            swaps = [{"name": n, "url": f"{self.base_path}/a/{sha}/{posixpath.basename(n)}"}
+                     for n, sha in record["routes"].items()
+                     if n.lower().endswith(".css") and previous["routes"].get(n) != sha]
+            if swaps:
+                payload = {"type": "css", "changed": change["changed"], "files": swaps}
+        record["last_id"] += 1
+        record["events"].append((record["last_id"], payload))
+        del record["events"][:-EVENT_HISTORY]
+        self.changed.notify_all()
+
+    def events_since(self, site, since, timeout):
+        """Blocks until `site` has events with id >= since (or timeout). Returns [(id, payload)]."""
+        with self.changed:
+            def ready():
+                record = self.sites.get(site)
+                return self.closing or (record and record["last_id"] >= since)
+            self.changed.wait_for(ready, timeout)
+            record = self.sites.get(site)
+            if not record:
+                return []
+            return [(i, p) for i, p in record["events"] if i >= since]
+
+    def _touch(self, site):
+        self.sites[site]["used"] = time.time()
+        self.sites.move_to_end(site)
+
+    def touch(self, site):
+        """Marks `site` as in use; False if it was evicted and has to be published again."""
+        with self.lock:
+            if site not in self.sites:
+                return False
+            self._touch(site)
+            return True
+
+    def _evict(self):
+        # Sessions that went away leave their site behind; drop the idle and least recently used ones
+        cutoff = time.time() - PREVIEW_SITE_TTL
+        while len(self.sites) > 1:   # the last one was just published
+            site, record = next(iter(self.sites.items()))
+            if len(self.sites) <= PREVIEW_MAX_SITES and record["used"] >= cutoff:
+                break
+            del self.sites[site]
+
+    def _collect_garbage(self):
+        # Keep the previous generation alive so a page that is mid-load can still fetch its assets
+        live = {sha for s in self.sites.values() for r in (s["routes"], s["prev_routes"]) for sha in r.values()}
+        for sha in list(self.blobs):
+            if sha not in live:
+                del self.blobs[sha]
+
+    def url(self, site, page="index.html"):
+        return f"{self.public_url}/s/{site}/{page}"
+
+    def shutdown(self):
+        with self.changed:
+            self.closing = True
+            self.changed.notify_all()
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+    # ------------------------------
+    # HTTP
+    # ------------------------------
+    def _lookup(self, path):
+        parts = path.lstrip("/").split("/", 2)
+        if len(parts) == 3 and parts[0] == "a":
+            return self.blobs.get(parts[1]), parts[1], True
+        if len(parts) >= 2 and parts[0] == "s":
+            with self.lock:
+                site = self.sites.get(parts[1])
+                if site:
+                    self._touch(parts[1])
+            page = parts[2] if len(parts) == 3 and parts[2] else "index.html"
+            sha = site["routes"].get(page) if site else None
+            return (self.blobs.get(sha) if sha else None), sha, False
+        return None, None, False
+
+    def _handler(self):
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                parts = urlsplit(self.path)
+                path = parts.path
+                # A reverse proxy may forward the public path prefix or strip it
+                if server.base_path and (path + "/").startswith(server.base_path + "/"):
+                    path = path[len(server.base_path):]
+                if path.startswith("/e/"):
+                    self._stream_events(path[3:], parts.query)
+                    return
+                blob, sha, immutable = server._lookup(unquote(path))
+                if blob is None:
+                    self.send_error(404)
+                    return
+                body, ctype = blob
+                etag = f'"{sha}"'
+                if self.headers.get("If-None-Match") == etag:
+                    self.send_response(304)
+                    self.send_header("ETag", etag)
+                    self.end_headers()
+                    return
+                self.send_response(200)
+                self.send_header("Content-Type", ctype)
+                self.send_header("Content-Length", str(len(body)))
+                self.send_header("ETag", etag)
+                self.send_header("Cache-Control", "public, max-age=31536000, immutable" if immutable else "no-cache")
+                self.end_headers()
+                self.wfile.write(body)
+
+            def _stream_events(self, site, query):
+                # Server-sent events; EventSource resumes with Last-Event-ID after a reconnect
+                since = self.headers.get("Last-Event-ID")
+                since = int(since) + 1 if since and since.isdigit() else None
+                if since is None:
+                    m = re.search(r"(?:^|&)since=(\d+)", query)
+                    if m:
+                        since = int(m.group(1))
+                    else:
+                        with server.lock:   # publish/evict change sites from other threads
+                            record = server.sites.get(site)
+                            since = (record["last_id"] if record else 0) + 1
+                self.send_response(200)
+                self.send_header("Content-Type", "text/event-stream")
+                self.send_header("Cache-Control", "no-cache")
+                self.end_headers()
+                try:
+                    while not server.closing:
+                        events = server.events_since(site, since, SSE_HEARTBEAT_SECONDS)
+                        if not events:
+                            self.wfile.write(b": ping\n\n")
+                        for event_id, payload in events:
+                            self.wfile.write(f"id: {event_id}\ndata: {json.dumps(payload)}\n\n".encode("utf-8"))
+                            since = event_id + 1
+                        self.wfile.flush()
+                except (BrokenPipeError, ConnectionResetError):
+                    pass
+
+            def log_message(self, *args):
+                pass  # keep the Streamlit console clean
+
+        return Handler
+
+
+_server = None
+_server_failed = False
+_server_lock = threading.Lock()
+
+
+def get_preview_server():
+    """The process-wide preview server, started on first use. None if disabled or it can't bind."""
+    global _server, _server_failed
+    if not PREVIEW_SERVER_ENABLED or _server_failed:
+        return None
+    with _server_lock:
+        if _server is None:
+            try:
+                _server = PreviewServer()
+            except OSError as e:
+                print(f"Preview server unavailable, falling back to inline preview: {e}")
+                _server_failed = True
+                return None
+        return _server
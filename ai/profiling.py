@@ -0,0 +1,231 @@
+# ai/profiling.py
+# Opt-in profiling of Streamlit reruns: nested timing/allocation spans around
+# the render functions, optional cProfile sampling, and a per-rerun report
+# appended to a JSONL trace log. Off by default; when off, spans and traced()
+# functions cost one context-variable lookup.
+#
+#   NEXABUILD_PROFILE=1 streamlit run main.py          (or ?profile=1)
+#   NEXABUILD_PROFILE=cprofile streamlit run main.py   (or ?profile=cprofile)
+#
+# The ?profile query param is only honoured with NEXABUILD_PROFILE_QUERY=1,
+# since any visitor could otherwise turn on process-wide tracemalloc.
+
+import contextvars
+import cProfile
+import functools
+import io
+import json
+import os
+import pstats
+import random
+import threading
+import time
+import tracemalloc
+import uuid
+
+PROFILE_MODE = os.environ.get("NEXABUILD_PROFILE", "").lower()   # "", "1", "cprofile"
+TRACE_LOG_PATH = os.environ.get("NEXABUILD_TRACE_LOG", os.path.join(".nexabuild", "trace.jsonl"))
+# Fraction of profiled reruns that also run under cProfile
+CPROFILE_SAMPLE = float(os.environ.get("NEXABUILD_PROFILE_SAMPLE", "1.0"))
+CPROFILE_TOP = 15
+MODES = ("1", "cprofile")
+# Lets visitors switch profiling on with ?profile=...
+PROFILE_QUERY_ENABLED = os.environ.get("NEXABUILD_PROFILE_QUERY", "0") == "1"
+
+_active = contextvars.ContextVar("nexabuild_profile", default=None)
+_log_lock = threading.Lock()
+_tracing_lock = threading.Lock()
+_tracing_users = 0   # open profiles; tracemalloc is stopped again when the last one finishes
+_overlaps = 0        # bumped whenever a profile starts while another is open
+
+
+def _tracing(delta):
+    global _tracing_users, _overlaps
+    with _tracing_lock:
+        _tracing_users += delta
+        if delta > 0 and _tracing_users > 1:
+            _overlaps += 1
+        if _tracing_users > 0 and not tracemalloc.is_tracing():
+            tracemalloc.start()
+        elif _tracing_users <= 0 and tracemalloc.is_tracing():
+            _tracing_users = 0
+            tracemalloc.stop()
+
+
+def resolve_mode(query_value=None):
+    """Profiling mode for this rerun: the query param wins over the environment when allowed."""
+    if not PROFILE_QUERY_ENABLED:
+        query_value = None
+    mode = (query_value or PROFILE_MODE or "").lower()
+    if mode in ("true", "on", "yes"):
+        mode = "1"
+    return mode if mode in MODES else ""
+
+
+class _Span:
+    __slots__ = ("name", "depth", "start", "cpu", "mem", "child_peak", "overlaps", "record")
+
+    def __init__(self, name, depth):
+        self.name = name
+        self.depth = depth
+        self.child_peak = 0
+
+
+class RerunProfile:
+    """Spans recorded during one script run."""
+
+    def __init__(self, session=None, mode="1"):
+        self.id = uuid.uuid4().hex[:8]
+        self.session = session
+        self.mode = mode
+        self.spans = []
+        self.stack = []
+        self.started = time.perf_counter()
+        self.cpu_started = time.thread_time()
+        self.profiler = None
+        self.report = None
+        _tracing(+1)
+        if mode == "cprofile" and random.random() < CPROFILE_SAMPLE:
+            self.profiler = cProfile.Profile()
+            try:
+                self.profiler.enable()
+            except ValueError:
+                # Python 3.12+ allows one active profiler per process; this rerun goes without
+                self.profiler = None
+
+    def enter(self, name):
+        span = _Span(name, len(self.stack))
+        current, peak = tracemalloc.get_traced_memory()
+        if self.stack:
+            # The child resets the peak counter, so hand what the parent saw so far up first
+            self.stack[-1].child_peak = max(self.stack[-1].child_peak, peak)
+        tracemalloc.reset_peak()
+        span.mem = current
+        span.overlaps = _overlaps if _tracing_users == 1 else -1   # -1: shared from the start
+        span.record = {"name": name, "depth": span.depth}
+        self.spans.append(span.record)
+        self.stack.append(span)
+        span.start = time.perf_counter()
+        span.cpu = time.thread_time()
+        return span
+
+    def exit(self, span, error=None):
+        if not self.stack or self.stack[-1] is not span:
+            return   # already closed by finish()
+        wall = time.perf_counter() - span.start
+        cpu = time.thread_time() - span.cpu
+        current, peak = tracemalloc.get_traced_memory()
+        peak = max(peak, span.child_peak)
+        self.stack.pop()
+        if self.stack:
+            self.stack[-1].child_peak = max(self.stack[-1].child_peak, peak)
+        # tracemalloc's peak is process-wide and every profile resets it, so it
+        # means nothing once another rerun was profiled alongside this span
+        shared = _tracing_users > 1 or _overlaps != span.overlaps
+        span.record.update(ms=round(wall * 1000, 2), cpu_ms=round(cpu * 1000, 2),
+                           alloc_kb=round((current - span.mem) / 1024, 1),
+                           peak_kb=None if shared else round((peak - span.mem) / 1024, 1))
+        if error:
+            span.record["error"] = error
+
+    def finish(self):
+        """Closes the rerun, writes it to the trace log and returns the report."""
+        if self.report is not None:
+            return self.report
+        while self.stack:
+            self.exit(self.stack[-1], error="unclosed")
+        report = {"rerun": self.id, "session": self.session, "time": time.time(), "mode": self.mode,
+                  "total_ms": round((time.perf_counter() - self.started) * 1000, 2),
+                  "cpu_ms": round((time.thread_time() - self.cpu_started) * 1000, 2),
+                  "spans": self.spans}
+        if self.profiler is not None:
+            self.profiler.disable()
+            report["cprofile"] = _top_functions(self.profiler)
+            self.profiler = None
+        self.report = report
+        _tracing(-1)
+        write_trace(report)
+        return report
+
+
+def _top_functions(profiler, limit=CPROFILE_TOP):
+    stats = pstats.Stats(profiler, stream=io.StringIO())
+    rows = []
+    for (filename, line, func), (calls, _, own, cumulative, _) in stats.stats.items():
+        rows.append({"function": f"{os.path.basename(filename)}:{line}({func})", "calls": calls,
+                     "own_ms": round(own * 1000, 2), "cumulative_ms": round(cumulative * 1000, 2)})
+    rows.sort(key=lambda r: -r["cumulative_ms"])
+    return rows[:limit]
+
+
+def write_trace(report):
+    line = json.dumps(report, separators=(",", ":"))
+    with _log_lock:
+        try:
+            os.makedirs(os.path.dirname(TRACE_LOG_PATH) or ".", exist_ok=True)
+            with open(TRACE_LOG_PATH, "a", encoding="utf-8") as f:
+                f.write(line + "\n")
+        except OSError as e:
+            print(f"Could not write trace log: {e}")
+
+
+# -----------------------------------------------------
+# Public API
+# -----------------------------------------------------
+def start_rerun(mode, session=None):
+    """Begins profiling this script run when `mode` is set; returns the profile or None."""
+    previous = _active.get()
+    if previous is not None and previous.report is None:
+        # The last run ended early (st.rerun / st.stop); close it so its cProfile stops
+        previous.finish()
+    profile = RerunProfile(session, mode) if mode else None
+    _active.set(profile)
+    return profile
+
+
+def finish_rerun():
+    profile = _active.get()
+    return profile.finish() if profile is not None else None
+
+
+class span:
+    """`with span("name"):` times the block inside the active rerun profile; a no-op otherwise."""
+
+    __slots__ = ("name", "profile", "handle")
+
+    def __init__(self, name):
+        self.name = name
+
+    def __enter__(self):
+        self.profile = _active.get()
+        if self.profile is not None:
+            self.handle = self.profile.enter(self.name)
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if self.profile is not None:
+            # Streamlit's rerun/stop are control flow, not errors
+            error = exc_type.__name__ if exc_type and issubclass(exc_type, Exception) else None
+            self.profile.exit(self.handle, error)
+        return False
+
+
+def traced(name=None):
+    """Decorator form of span(); the span is named after the function unless `name` is given."""
+    def wrap(fn):
+        label = name or fn.__name__
+
+        @functools.wraps(fn)
+        def inner(*args, **kwargs):
+            if _active.get() is None:
+                return fn(*args, **kwargs)
+            with span(label):
+                return fn(*args, **kwargs)
+        return inner
+    return wrap
+
+
+def format_spans(report):
+    """Table rows for the debug panel: span names indented by nesting, in call order."""
+    return [{"span": "· " * s["depth"] + s["name"], "ms": s.get("ms"), "cpu ms": s.get("cpu_ms"),
+             "alloc KB": s.get("alloc_kb"), "peak KB": s.get("peak_kb")} for s in report["spans"]]
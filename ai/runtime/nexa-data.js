@@ -0,0 +1,350 @@
+/*! NexaData v1.0.0 | client-side persistence for NexaBuild apps */
+/*
+ * In-memory collections with batched, debounced persistence.
+ * Backend: IndexedDB (one object store per collection, with indexes) when available,
+ * otherwise localStorage, otherwise memory only.
+ *
+ *   const db = await NexaData.open("my-app", { tasks: { indexes: ["done"] } });
+ *   const tasks = db.collection("tasks");
+ *   tasks.add({ title: "Ship it", done: false });   // sync, persisted in the background
+ *   tasks.all(); tasks.get(id); tasks.where("done", false);
+ *   tasks.update(id, { done: true }); tasks.remove(id);
+ *   tasks.subscribe(items => render(items));
+ */
+(function (global) {
+  "use strict";
+
+  var VERSION = "1.0.0";
+  var FLUSH_DELAY_MS = 50;
+
+  function uid() {
+    if (global.crypto && global.crypto.randomUUID) return global.crypto.randomUUID();
+    return Date.now().toString(36) + Math.random().toString(36).slice(2, 10);
+  }
+
+  function clone(value) {
+    return value === undefined ? value : JSON.parse(JSON.stringify(value));
+  }
+
+  // ---------------------------------------------------------------
+  // Backends: load(name) -> Promise<array>, write(name, puts, deletes, all) -> Promise
+  // ---------------------------------------------------------------
+  function MemoryBackend() {}
+  MemoryBackend.prototype.kind = "memory";
+  MemoryBackend.prototype.load = function () { return Promise.resolve([]); };
+  MemoryBackend.prototype.write = function () { return Promise.resolve(); };
+
+  function LocalStorageBackend(dbName) { this.prefix = "nexa:" + dbName + ":"; }
+  LocalStorageBackend.prototype.kind = "localStorage";
+  LocalStorageBackend.prototype.load = function (name) {
+    try {
+      return Promise.resolve(JSON.parse(global.localStorage.getItem(this.prefix + name) || "[]"));
+    } catch (e) {
+      return Promise.resolve([]);
+    }
+  };
+  LocalStorageBackend.prototype.write = function (name, puts, deletes, all) {
+    // One serialization per flushed batch, not per operation
+    global.localStorage.setItem(this.prefix + name, JSON.stringify(all));
+    return Promise.resolve();
+  };
+
+  function IndexedDBBackend(db) { this.db = db; }
+  IndexedDBBackend.prototype.kind = "indexedDB";
+  IndexedDBBackend.prototype.load = function (name) {
+    var db = this.db;
+    return new Promise(function (resolve, reject) {
+      var req = db.transaction(name, "readonly").objectStore(name).getAll();
+      req.onsuccess = function () { resolve(req.result || []); };
+      req.onerror = function () { reject(req.error); };
+    });
+  };
+  IndexedDBBackend.prototype.write = function (name, puts, deletes) {
+    var db = this.db;
+    return new Promise(function (resolve, reject) {
+      // Only the records touched since the last flush, in one transaction
+      var tx = db.transaction(name, "readwrite");
+      var store = tx.objectStore(name);
+      puts.forEach(function (item) { store.put(item); });
+      deletes.forEach(function (id) { store.delete(id); });
+      tx.oncomplete = function () { resolve(); };
+      tx.onerror = tx.onabort = function () { reject(tx.error); };
+    });
+  };
+
+  function openIndexedDB(dbName, schema) {
+    return new Promise(function (resolve, reject) {
+      if (!global.indexedDB) return reject(new Error("IndexedDB unavailable"));
+      var names = Object.keys(schema);
+      var req;
+      try {
+        req = global.indexedDB.open(dbName);
+      } catch (e) {
+        return reject(e);
+      }
+      req.onerror = function () { reject(req.error); };
+      req.onsuccess = function () {
+        var db = req.result;
+        var missing = names.some(function (n) {
+          if (!db.objectStoreNames.contains(n)) return true;
+          var store = db.transaction(n, "readonly").objectStore(n);
+          return (schema[n].indexes || []).some(function (i) { return !store.indexNames.contains(i); });
+        });
+        if (!missing) return resolve(db);
+        // Schema grew: reopen with a version bump to add stores/indexes
+        var version = db.version + 1;
+        db.close();
+        var up = global.indexedDB.open(dbName, version);
+        up.onupgradeneeded = function () {
+          var udb = up.result;
+          names.forEach(function (n) {
+            var store = udb.objectStoreNames.contains(n)
+              ? up.transaction.objectStore(n)
+              : udb.createObjectStore(n, { keyPath: "id" });
+            (schema[n].indexes || []).forEach(function (i) {
+              if (!store.indexNames.contains(i)) store.createIndex(i, i, { unique: false });
+            });
+          });
+        };
+        up.onsuccess = function () { resolve(up.result); };
+        up.onerror = function () { reject(up.error); };
+      };
+    });
+  }
+
+  // ---------------------------------------------------------------
+  // Collection: the in-memory cache is the source of truth for reads
+  // ---------------------------------------------------------------
+  function Collection(db, name, options) {
+    this.db = db;
+    this.name = name;
+    this.indexes = (options && options.indexes) || [];
+    this.items = new Map();
+    this.indexMaps = {};
+    this.dirty = new Set();
+    this.deleted = new Set();
+    this.listeners = [];
+    this.timer = null;
+    this.notifyQueued = false;
+    this.pending = Promise.resolve();
+  }
+
+  Collection.prototype._load = function (records) {
+    var self = this;
+    records.forEach(function (r) { self.items.set(r.id, r); });
+    this._reindex();
+  };
+
+  Collection.prototype._reindex = function () {
+    var self = this;
+    this.indexMaps = {};
+    this.indexes.forEach(function (field) { self.indexMaps[field] = new Map(); });
+    this.items.forEach(function (item) { self._indexAdd(item); });
+  };
+
+  Collection.prototype._indexAdd = function (item) {
+    for (var field in this.indexMaps) {
+      var key = item[field];
+      var bucket = this.indexMaps[field].get(key);
+      if (!bucket) this.indexMaps[field].set(key, bucket = new Set());
+      bucket.add(item.id);
+    }
+  };
+
+  Collection.prototype._indexRemove = function (item) {
+    for (var field in this.indexMaps) {
+      var bucket = this.indexMaps[field].get(item[field]);
+      if (bucket) bucket.delete(item.id);
+    }
+  };
+
+  Collection.prototype._changed = function (id, removed) {
+    if (removed) {
+      this.dirty.delete(id);
+      this.deleted.add(id);
+    } else {
+      this.deleted.delete(id);
+      this.dirty.add(id);
+    }
+    this._schedule();
+    this._notify();
+  };
+
+  Collection.prototype._schedule = function () {
+    var self = this;
+    if (this.timer) return;
+    this.timer = setTimeout(function () { self.flush(); }, FLUSH_DELAY_MS);
+  };
+
+  Collection.prototype._notify = function () {
+    // Coalesce: many changes in one task produce one notification with one snapshot
+    var self = this;
+    if (this.notifyQueued || !this.listeners.length) return;
+    this.notifyQueued = true;
+    Promise.resolve().then(function () {
+      self.notifyQueued = false;
+      var snapshot = self.all();
+      self.listeners.forEach(function (fn) {
+        try { fn(snapshot); } catch (e) { console.error(e); }
+      });
+    });
+  };
+
+  Collection.prototype.flush = function () {
+    var self = this;
+    if (this.timer) { clearTimeout(this.timer); this.timer = null; }
+    if (!this.dirty.size && !this.deleted.size) return this.pending;
+    var puts = [];
+    this.dirty.forEach(function (id) { if (self.items.has(id)) puts.push(self.items.get(id)); });
+    var deletes = Array.from(this.deleted);
+    this.dirty.clear();
+    this.deleted.clear();
+    var all = this.db.backend.kind === "localStorage" ? Array.from(this.items.values()) : null;
+    this.pending = this.pending
+      .then(function () { return self.db.backend.write(self.name, puts, deletes, all); })
+      .catch(function (e) { console.error("NexaData: failed to save '" + self.name + "'", e); });
+    return this.pending;
+  };
+
+  Collection.prototype.all = function () {
+    return Array.from(this.items.values());
+  };
+
+  Collection.prototype.get = function (id) {
+    return this.items.get(id);
+  };
+
+  Collection.prototype.count = function () {
+    return this.items.size;
+  };
+
+  Collection.prototype.where = function (field, value) {
+    var self = this;
+    if (this.indexMaps[field]) {
+      var bucket = this.indexMaps[field].get(value);
+      return bucket ? Array.from(bucket, function (id) { return self.items.get(id); }) : [];
+    }
+    return this.all().filter(function (item) { return item[field] === value; });
+  };
+
+  Collection.prototype.query = function (predicate) {
+    return this.all().filter(predicate);
+  };
+
+  Collection.prototype.add = function (data) {
+    var item = clone(data) || {};
+    if (item.id === undefined || item.id === null) item.id = uid();
+    if (!item.createdAt) item.createdAt = new Date().toISOString();
+    var existing = this.items.get(item.id);
+    if (existing) this._indexRemove(existing);
+    this.items.set(item.id, item);
+    this._indexAdd(item);
+    this._changed(item.id);
+    return item;
+  };
+
+  Collection.prototype.addMany = function (list) {
+    var self = this;
+    return list.map(function (d) { return self.add(d); });
+  };
+
+  Collection.prototype.update = function (id, patch) {
+    var existing = this.items.get(id);
+    if (!existing) return undefined;
+    this._indexRemove(existing);
+    var item = Object.assign({}, existing, clone(patch), { id: id, updatedAt: new Date().toISOString() });
+    this.items.set(id, item);
+    this._indexAdd(item);
+    this._changed(id);
+    return item;
+  };
+
+  Collection.prototype.remove = function (id) {
+    var existing = this.items.get(id);
+    if (!existing) return false;
+    this._indexRemove(existing);
+    this.items.delete(id);
+    this._changed(id, true);
+    return true;
+  };
+
+  Collection.prototype.clear = function () {
+    var self = this;
+    this.items.forEach(function (item, id) { self.deleted.add(id); });
+    this.dirty.clear();
+    this.items.clear();
+    this._reindex();
+    this._schedule();
+    this._notify();
+  };
+
+  Collection.prototype.subscribe = function (fn) {
+    var self = this;
+    this.listeners.push(fn);
+    return function () { self.listeners = self.listeners.filter(function (f) { return f !== fn; }); };
+  };
+
+  // ---------------------------------------------------------------
+  // Database
+  // ---------------------------------------------------------------
+  function Database(name, backend) {
+    this.name = name;
+    this.backend = backend;
+    this.collections = {};
+  }
+
+  Database.prototype.collection = function (name) {
+    var c = this.collections[name];
+    if (!c) throw new Error("NexaData: unknown collection '" + name + "'. Declare it in NexaData.open().");
+    return c;
+  };
+
+  Database.prototype.flush = function () {
+    var self = this;
+    return Promise.all(Object.keys(this.collections).map(function (n) { return self.collections[n].flush(); }));
+  };
+
+  function pickBackend(dbName, schema, preferred) {
+    var useLocal = function () {
+      try {
+        var probe = "nexa:probe";
+        global.localStorage.setItem(probe, "1");
+        global.localStorage.removeItem(probe);
+        return new LocalStorageBackend(dbName);
+      } catch (e) {
+        return new MemoryBackend();
+      }
+    };
+    if (preferred === "memory") return Promise.resolve(new MemoryBackend());
+    if (preferred === "localStorage") return Promise.resolve(useLocal());
+    return openIndexedDB(dbName, schema)
+      .then(function (db) { return new IndexedDBBackend(db); })
+      .catch(useLocal);
+  }
+
+  /**
+   * Opens (or creates) a database. `schema` maps collection names to
+   * { indexes: ["field", ...] }. Resolves once every collection is loaded into memory.
+   * options.backend can force "indexedDB", "localStorage" or "memory".
+   */
+  function open(dbName, schema, options) {
+    schema = schema || {};
+    return pickBackend(dbName, schema, options && options.backend).then(function (backend) {
+      var db = new Database(dbName, backend);
+      var names = Object.keys(schema);
+      names.forEach(function (n) { db.collections[n] = new Collection(db, n, schema[n]); });
+      if (global.addEventListener) {
+        var flushAll = function () { db.flush(); };
+        global.addEventListener("pagehide", flushAll);
+        global.addEventListener("visibilitychange", flushAll);
+      }
+      return Promise.all(names.map(function (n) {
+        return backend.load(n).then(function (records) { db.collections[n]._load(records); });
+      })).then(function () { return db; });
+    });
+  }
+
+  var NexaData = { version: VERSION, open: open };
+  if (typeof module !== "undefined" && module.exports) module.exports = NexaData;
+  global.NexaData = NexaData;
+})(typeof window !== "undefined" ? window : globalThis);
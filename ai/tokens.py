@@ -0,0 +1,404 @@
+# ai/tokens.py
+# Preflight token control for every model call: a fast local estimator
+# (calibrated against the usage the provider reports back), per-agent prompt
+# budgets, prompt compaction, per-session / per-tenant quotas, and a
+# process-wide requests/tokens-per-minute rate limit.
+
+import atexit
+import contextvars
+import hashlib
+import json
+import os
+import re
+import threading
+import time
+
+from ai.fileutil import locked_file
+
+CALIBRATION_PATH = os.environ.get("NEXABUILD_TOKEN_CALIBRATION", os.path.join(".nexabuild", "token_calibration.json"))
+
+# Max prompt tokens per caller (after compaction); override with NEXABUILD_TOKEN_BUDGET_<NAME>
+AGENT_BUDGETS = {
+    "ProductManager": 8000,
+    "Designer": 16000,
+    "Developer": 200000,
+    "WebsiteGenerator": 200000,
+    "NexaBot": 16000,
+}
+DEFAULT_BUDGET = 32000
+
+# Prompt + output tokens; 0 (the default) disables the quota, set the env vars to turn them on
+SESSION_QUOTA = int(os.environ.get("NEXABUILD_SESSION_TOKEN_QUOTA", "0"))
+TENANT_DAILY_QUOTA = int(os.environ.get("NEXABUILD_TENANT_TOKEN_QUOTA", "0"))
+DEFAULT_TENANT = os.environ.get("NEXABUILD_TENANT", "default")
+# Where quota counters live when several processes share them (API workers); unset = this process only
+USAGE_DIR = os.environ.get("NEXABUILD_USAGE_DIR") or (
+    os.path.join(os.environ["NEXABUILD_QUEUE_DIR"], "usage") if os.environ.get("NEXABUILD_QUEUE_DIR") else "")
+
+# Provider rate limits shared by every thread of this process; 0 disables
+RATE_LIMIT_RPM = int(os.environ.get("NEXABUILD_RATE_LIMIT_RPM", "0"))
+RATE_LIMIT_TPM = int(os.environ.get("NEXABUILD_RATE_LIMIT_TPM", "0"))
+
+CALIBRATION_ALPHA = 0.2       # weight of each new observation
+CALIBRATION_BOUNDS = (0.5, 2.0)
+# The calibration file is rewritten after this many new samples or seconds, not on every call
+CALIBRATION_SAVE_EVERY = 20
+CALIBRATION_SAVE_SECONDS = 60
+DEDUPE_MIN_CHARS = 80         # shorter repeated paragraphs are left alone
+
+
+class TokenBudgetError(RuntimeError):
+    """A prompt is over its agent budget, or the session/tenant quota is used up."""
+
+
+# -----------------------------------------------------
+# Estimation
+# -----------------------------------------------------
+_PIECES = re.compile(r"[A-Za-z]+|\d+|[^\sA-Za-z\d]|\n")
+
+
+def _raw_estimate(text):
+    # Subword tokenizers split long words and digit runs; punctuation and non-ASCII are ~1 token each
+    tokens = 0
+    for piece in _PIECES.findall(text or ""):
+        if piece[0].isalpha() and piece.isascii():
+            tokens += 1 + (len(piece) - 1) // 6
+        elif piece[0].isdigit():
+            tokens += 1 + (len(piece) - 1) // 3
+        else:
+            tokens += 1
+    return tokens
+
+
+_calibration = None
+_calibration_lock = threading.Lock()
+_calibration_pending = 0
+_calibration_saved_at = time.time()
+
+
+def _load_calibration():
+    global _calibration
+    if _calibration is None:
+        _calibration = {}
+        try:
+            with open(CALIBRATION_PATH, encoding="utf-8") as f:
+                _calibration = json.load(f)
+        except (OSError, ValueError):
+            pass
+    return _calibration
+
+
+def estimate_tokens(text, model=None):
+    """Local token estimate, scaled by the model's calibration factor when one has been observed."""
+    raw = _raw_estimate(text)
+    if model:
+        factor = _load_calibration().get(model, {}).get("factor", 1.0)
+        return int(raw * factor + 0.5)
+    return raw
+
+
+def calibrate(model, text, actual):
+    """Folds one provider-reported prompt size into the model's estimate/actual ratio."""
+    raw = _raw_estimate(text)
+    if not model or not raw or not actual:
+        return
+    low, high = CALIBRATION_BOUNDS
+    with _calibration_lock:
+        entry = _load_calibration().setdefault(model, {"factor": 1.0, "samples": 0})
+        ratio = min(high, max(low, actual / raw))
+        entry["factor"] = ratio if not entry["samples"] else \
+            entry["factor"] * (1 - CALIBRATION_ALPHA) + ratio * CALIBRATION_ALPHA
+        entry["samples"] += 1
+        global _calibration_pending
+        _calibration_pending += 1
+        if _calibration_pending >= CALIBRATION_SAVE_EVERY or \
+                time.time() - _calibration_saved_at >= CALIBRATION_SAVE_SECONDS:
+            _save_calibration()
+
+
+def _save_calibration():
+    """
+    Writes the factors atomically under a cross-process lock, keeping models only
+    other processes have seen. Callers hold _calibration_lock.
+    """
+    global _calibration_pending, _calibration_saved_at
+    try:
+        os.makedirs(os.path.dirname(CALIBRATION_PATH) or ".", exist_ok=True)
+        with locked_file(CALIBRATION_PATH + ".lock"):
+            try:
+                with open(CALIBRATION_PATH, encoding="utf-8") as f:
+                    merged = json.load(f)
+            except (OSError, ValueError):
+                merged = {}
+            merged.update(_calibration)
+            tmp = f"{CALIBRATION_PATH}.{os.getpid()}.tmp"
+            with open(tmp, "w", encoding="utf-8") as f:
+                json.dump(merged, f)
+            os.replace(tmp, CALIBRATION_PATH)
+        _calibration_pending = 0
+        _calibration_saved_at = time.time()
+    except OSError as e:
+        print(f"Could not save token calibration: {e}")
+
+
+@atexit.register
+def flush_calibration():
+    with _calibration_lock:
+        if _calibration_pending:
+            _save_calibration()
+
+
+# -----------------------------------------------------
+# Compaction
+# -----------------------------------------------------
+def compact_prompt(text):
+    """
+    Lossless cleanup for a whole prompt, which carries user text, chat history and
+    the code being edited: strips trailing whitespace and collapses blank-line runs.
+    """
+    return re.sub(r"\n{3,}", "\n\n", "\n".join(line.rstrip() for line in text.splitlines())).strip()
+
+
+def compact_template(text):
+    """
+    Compaction for static system instructions only: strips the indentation of
+    triple-quoted prompt templates and drops paragraphs that already appeared
+    verbatim earlier. Never use it on text that contains user content or code.
+    """
+    lines = [line.strip() for line in text.splitlines()]
+    paragraphs, current = [], []
+    for line in lines:
+        if line:
+            current.append(line)
+        elif current:
+            paragraphs.append("\n".join(current))
+            current = []
+    if current:
+        paragraphs.append("\n".join(current))
+    seen, kept = set(), []
+    for paragraph in paragraphs:
+        if len(paragraph) >= DEDUPE_MIN_CHARS:
+            if paragraph in seen:
+                continue
+            seen.add(paragraph)
+        kept.append(paragraph)
+    return "\n\n".join(kept)
+
+
+# -----------------------------------------------------
+# Quotas
+# -----------------------------------------------------
+_context = contextvars.ContextVar("nexabuild_token_context", default=("anonymous", DEFAULT_TENANT))
+
+
+def _new_usage():
+    return {"prompt": 0, "output": 0, "saved": 0, "calls": 0}
+
+
+class MemoryUsageStore:
+    """Quota counters of this process: session -> usage, (tenant, day) -> tokens."""
+
+    def __init__(self):
+        self.sessions = {}
+        self.tenants = {}
+        self.lock = threading.Lock()
+
+    def check(self, session, tenant, day, estimate, saved):
+        """Raises TokenBudgetError if `estimate` more tokens would break a quota; records `saved`."""
+        with self.lock:
+            u = self.sessions.setdefault(session, _new_usage())
+            _check_quotas(u, self.tenants.get((tenant, day), 0), tenant, estimate)
+            u["saved"] += saved
+
+    def add(self, session, tenant, day, prompt_tokens, output_tokens):
+        with self.lock:
+            u = self.sessions.setdefault(session, _new_usage())
+            u["prompt"] += prompt_tokens
+            u["output"] += output_tokens
+            u["calls"] += 1
+            self.tenants[(tenant, day)] = self.tenants.get((tenant, day), 0) + prompt_tokens + output_tokens
+
+    def session(self, session):
+        with self.lock:
+            return dict(self.sessions.get(session) or _new_usage())
+
+
+class DirectoryUsageStore:
+    """
+    The same counters as JSON files in a shared directory, one per session and per
+    tenant-day, updated under an exclusive file lock so every API worker process
+    enforces the same quotas.
+    """
+
+    def __init__(self, root):
+        self.root = root
+        for kind in ("sessions", "tenants"):
+            os.makedirs(os.path.join(root, kind), exist_ok=True)
+
+    def _path(self, kind, key):
+        safe = re.sub(r"[^A-Za-z0-9_.-]+", "_", key)[:40]
+        return os.path.join(self.root, kind, f"{safe}-{hashlib.sha1(key.encode('utf-8')).hexdigest()[:10]}.json")
+
+    def _update(self, kind, key, fn):
+        """Runs fn(data) -> new data (or None to leave it) with the file locked; returns the data."""
+        with locked_file(self._path(kind, key)) as f:
+            raw = f.read()
+            data = json.loads(raw) if raw.strip() else {}
+            new = fn(data)
+            if new is not None:
+                f.seek(0)
+                f.truncate()
+                f.write(json.dumps(new))
+                f.flush()
+            return new if new is not None else data
+
+    def check(self, session, tenant, day, estimate, saved):
+        used = self._update("tenants", f"{tenant}@{day}", lambda data: None).get("tokens", 0)
+
+        def update(data):
+            u = dict(_new_usage(), **data)
+            _check_quotas(u, used, tenant, estimate)
+            u["saved"] += saved
+            return u
+        self._update("sessions", session, update)
+
+    def add(self, session, tenant, day, prompt_tokens, output_tokens):
+        def session_update(data):
+            u = dict(_new_usage(), **data)
+            u["prompt"] += prompt_tokens
+            u["output"] += output_tokens
+            u["calls"] += 1
+            return u
+        self._update("sessions", session, session_update)
+        self._update("tenants", f"{tenant}@{day}",
+                     lambda data: {"tokens": data.get("tokens", 0) + prompt_tokens + output_tokens})
+
+    def session(self, session):
+        return dict(_new_usage(), **self._update("sessions", session, lambda data: None))
+
+
+def _check_quotas(u, tenant_used, tenant, estimate):
+    if SESSION_QUOTA and u["prompt"] + u["output"] + estimate > SESSION_QUOTA:
+        raise TokenBudgetError(f"This session has used its {SESSION_QUOTA:,}-token quota.")
+    if TENANT_DAILY_QUOTA and tenant_used + estimate > TENANT_DAILY_QUOTA:
+        raise TokenBudgetError(f"Daily token quota for '{tenant}' is used up.")
+
+
+_store = DirectoryUsageStore(USAGE_DIR) if USAGE_DIR else MemoryUsageStore()
+
+
+def set_session(session_id, tenant=None):
+    """Binds the calling thread/context to a session (and tenant) for quota accounting."""
+    _context.set((session_id or "anonymous", tenant or DEFAULT_TENANT))
+
+
+def usage(session=None):
+    session = session or _context.get()[0]
+    u = _store.session(session)
+    u["total"] = u["prompt"] + u["output"]
+    u["quota"] = SESSION_QUOTA
+    return u
+
+
+# -----------------------------------------------------
+# Rate limit
+# -----------------------------------------------------
+class RateLimiter:
+    """Sliding one-minute window over requests and estimated prompt tokens; acquire() waits for room."""
+
+    WINDOW = 60.0
+
+    def __init__(self, rpm=0, tpm=0):
+        self.rpm = rpm
+        self.tpm = tpm
+        self.calls = []   # (time, tokens)
+        self.waited = 0.0
+        self.lock = threading.Lock()
+
+    def _delay(self, tokens, now):
+        self.calls = [c for c in self.calls if now - c[0] < self.WINDOW]
+        delay = 0.0
+        if self.rpm and len(self.calls) >= self.rpm:
+            delay = self.calls[len(self.calls) - self.rpm][0] + self.WINDOW - now
+        if self.tpm and self.calls:
+            # Oldest calls that must leave the window before this one fits
+            excess = sum(t for _, t in self.calls) + min(tokens, self.tpm) - self.tpm
+            for when, used in self.calls:
+                if excess <= 0:
+                    break
+                excess -= used
+                delay = max(delay, when + self.WINDOW - now)
+        return delay
+
+    def acquire(self, tokens=0):
+        if not self.rpm and not self.tpm:
+            return 0.0
+        waited = 0.0
+        while True:
+            with self.lock:
+                now = time.time()
+                delay = self._delay(tokens, now)
+                if delay <= 0:
+                    self.calls.append((now, tokens))
+                    self.waited += waited
+                    return waited
+            time.sleep(delay)
+            waited += delay
+
+
+_rate_limiter = RateLimiter(RATE_LIMIT_RPM, RATE_LIMIT_TPM)
+
+
+def set_rate_limits(rpm=0, tpm=0):
+    """Changes the process-wide limits (0 disables); e.g. from the batch CLI flags."""
+    with _rate_limiter.lock:
+        _rate_limiter.rpm, _rate_limiter.tpm = rpm, tpm
+
+
+def rate_limit_wait():
+    """Total seconds model calls have spent waiting for the rate limit."""
+    return _rate_limiter.waited
+
+
+def budget_for(agent):
+    env = os.environ.get(f"NEXABUILD_TOKEN_BUDGET_{agent.upper()}")
+    return int(env) if env else AGENT_BUDGETS.get(agent, DEFAULT_BUDGET)
+
+
+def preflight(agent, prompt, model=None):
+    """
+    Compacts `prompt`, checks it against the agent budget and the remaining quotas,
+    waits for the rate limit, and returns (prompt_to_send, estimated_tokens).
+    Raises TokenBudgetError.
+    """
+    session, tenant = _context.get()
+    compacted = compact_prompt(prompt)
+    estimate = estimate_tokens(compacted, model)
+    saved = max(0, estimate_tokens(prompt, model) - estimate)
+
+    budget = budget_for(agent)
+    if estimate > budget:
+        raise TokenBudgetError(f"{agent} prompt is ~{estimate:,} tokens, over its {budget:,}-token budget. "
+                               "Try a smaller request or fewer files.")
+    _store.check(session, tenant, time.strftime("%Y-%m-%d"), estimate, saved)
+    _rate_limiter.acquire(estimate)
+    return compacted, estimate
+
+
+def settle(agent, prompt, estimate, response=None, output_text="", model=None):
+    """
+    Records what a call actually used. Prefers the provider's usage metadata (and
+    calibrates the estimator with it); falls back to local estimates.
+    """
+    session, tenant = _context.get()
+    meta = getattr(response, "usage_metadata", None) if response is not None else None
+    prompt_tokens = getattr(meta, "prompt_token_count", 0) or 0
+    output_tokens = getattr(meta, "candidates_token_count", 0) or 0
+    if prompt_tokens:
+        calibrate(model, prompt, prompt_tokens)
+    else:
+        prompt_tokens = estimate
+    if not output_tokens:
+        output_tokens = estimate_tokens(output_text, model)
+    _store.add(session, tenant, time.strftime("%Y-%m-%d"), prompt_tokens, output_tokens)
+    return prompt_tokens, output_tokens
@@ -3,54 +3,29 @@
 
 import os
 import json
-import streamlit as st
-import google.generativeai as genai
-import io
-import zipfile
+from ai.config import DEFAULT_MODEL, get_model
+from ai.export import export_archive
+from ai.datalayer import DATA_LAYER_FILE
+from ai.preview import bundle_inline
+from ai.jsonrepair import JSONRepairError, describe, parse_json
+from ai.tokens import preflight, settle
 
 
-# API_KEY = st.secrets["API_KEY"]
-API_KEY = st.secrets["API_KEY"]
-genai.configure(api_key=API_KEY)
-
-DEFAULT_MODEL = "gemini-2.5-flash"
-
 # -----------------------------------------------------
 # Force valid JSON from Gemini output
 # -----------------------------------------------------
 def force_json(text):
     """
     Gemini sometimes outputs JSON with extra words or markdown.
-    This function extracts and fixes JSON safely.
+    Extracts and repairs it in one pass (ai/jsonrepair.py); raises ValueError if nothing usable is found.
     """
-    text = text.strip()
-
-    # Try direct JSON
     try:
-        return json.loads(text)
-    except:
-        pass
-
-    # Remove code fences
-    if "```" in text:
-        text = text.split("```")[1]
-        text = text.replace("json", "").strip()
-        try:
-            return json.loads(text)
-        except:
-            pass
-
-    # Extract JSON manually using first '{' to last '}'
-    start = text.find("{")
-    end = text.rfind("}")
-    if start != -1 and end != -1:
-        try:
-            extracted = text[start:end+1]
-            return json.loads(extracted)
-        except:
-            pass
-
-    raise ValueError("Gemini returned invalid JSON:\n" + text)
+        data, diagnostics = parse_json(text)
+    except JSONRepairError as e:
+        raise ValueError(f"Gemini returned invalid JSON ({describe(e.diagnostics)}):\n" + text[:500]) from e
+    if not diagnostics["fast_path"]:
+        print(f"WebsiteGenerator: {describe(diagnostics)}")
+    return data
 
 
 # -----------------------------------------------------
@@ -82,10 +57,11 @@ Rules:
 - MUST return pure JSON.
 """
 
-        full_prompt = system + "\nUser Request:\n" + prompt
+        full_prompt, estimate = preflight("WebsiteGenerator", system + "\nUser Request:\n" + prompt, self.model)
 
-        model = genai.GenerativeModel(self.model)
+        model = get_model(self.model)
         response = model.generate_content(full_prompt)
+        settle("WebsiteGenerator", full_prompt, estimate, response, model=self.model)
 
         text = response.text
         return force_json(text)
@@ -117,10 +93,16 @@ Return ONLY JSON of updated files.
     # ------------------------------
     # Live preview
     # ------------------------------
-    def combine_to_html(self, files):
+    def combine_to_html(self, files, page="index.html"):
+        # Full multi-file resolution (links, scripts, assets, other pages) lives in ai/preview.py
+        bundled = bundle_inline(files, page)
+        if bundled is not None:
+            return bundled
+
         html = files.get("index.html", "")
         css = files.get("styles.css", "")
         js = files.get("script.js", "")
+        data_layer = files.get(DATA_LAYER_FILE, "")
 
         return f"""
 <!doctype html>
@@ -131,6 +113,7 @@ Return ONLY JSON of updated files.
 </head>
 <body>
 {html}
+<script>{data_layer}</script>
 <script>{js}</script>
 </body>
 </html>
@@ -141,9 +124,5 @@ Return ONLY JSON of updated files.
 # ZIP creator
 # -----------------------------------------------------
 def create_zip_bytes(files: dict) -> bytes:
-    buf = io.BytesIO()
-    with zipfile.ZipFile(buf, "w", zipfile.ZIP_DEFLATED) as z:
-        for name, content in files.items():
-            z.writestr(name, content.encode("utf-8"))
-    buf.seek(0)
-    return buf.getvalue()
+    # Deterministic + cached by content hash; see ai/export.py for tar.gz / zstd and streaming
+    return export_archive(files, "zip")
@@ -0,0 +1,301 @@
+# ai/validate.py
+# Fast structural validation of a generated project, before preview and deploy.
+# Pure Python: parses the HTML, checks JS syntax with ai/jslex.py, and
+# cross-references ids, classes and asset links across files. Issues use the
+# same shape as ai/audit.py findings, and fix_request() turns the errors into
+# a repair prompt that shows the model only the broken lines.
+
+import bisect
+import posixpath
+import re
+import time
+from html.parser import HTMLParser
+
+from ai.datalayer import DATA_LAYER_FILE
+from ai.jslex import JSLexError, tokenize
+
+SEVERITY_WEIGHTS = {"error": 15, "warning": 5}
+VOID_TAGS = {"area", "base", "br", "col", "embed", "hr", "img", "input", "link", "meta", "source", "track", "wbr"}
+OPTIONAL_END_TAGS = {"p", "li", "dt", "dd", "option", "optgroup", "tr", "td", "th", "thead", "tbody", "tfoot",
+                     "colgroup", "rb", "rt", "rp", "html", "head", "body"}
+# Attributes that load a file; <a href> is checked separately (a missing page is a broken link, not a crash)
+ASSET_ATTRS = {"script": "src", "img": "src", "source": "src", "video": "src", "audio": "src",
+               "iframe": "src", "link": "href"}
+BRACKETS = {"(": ")", "[": "]", "{": "}"}
+CLOSERS = set(BRACKETS.values())
+CONTEXT_LINES = 2
+MAX_EXCERPT_LINES = 12
+MAX_PER_RULE = 5   # per file; the rest are folded into one "and N more" note
+
+
+def _issue(rule, severity, file, message, line=None):
+    return {"rule": rule, "severity": severity, "file": file, "line": line, "message": message}
+
+
+def _is_local(ref):
+    return bool(ref) and not re.match(r"^([a-z][a-z0-9+.-]*:|//|#|\$\{|\{\{)", ref.strip(), re.I)
+
+
+def _resolve(page, ref):
+    path = ref.split("?")[0].split("#")[0].strip()
+    if not path:
+        return None
+    return posixpath.normpath(posixpath.join(posixpath.dirname(page), path)).lstrip("/")
+
+
+# -----------------------------------------------------
+# HTML
+# -----------------------------------------------------
+class _HTMLCheck(HTMLParser):
+    def __init__(self):
+        super().__init__()
+        self.stack = []          # (tag, line)
+        self.stray = []          # (tag, line)
+        self.unclosed = []       # (tag, line) implicitly closed by an outer end tag
+        self.ids = {}            # id -> first line
+        self.duplicate_ids = []  # (id, line)
+        self.classes = set()
+        self.assets = []         # (tag, ref, line)
+        self.links = []          # (ref, line)
+        self.scripts = []        # (line offset, inline body)
+        self._script = None
+
+    def handle_starttag(self, tag, attrs):
+        line = self.getpos()[0]
+        attrs = dict(attrs)
+        if attrs.get("id"):
+            if attrs["id"] in self.ids:
+                self.duplicate_ids.append((attrs["id"], line))
+            else:
+                self.ids[attrs["id"]] = line
+        self.classes.update((attrs.get("class") or "").split())
+        attr = ASSET_ATTRS.get(tag)
+        if attr and attrs.get(attr):
+            rel = (attrs.get("rel") or "").lower()
+            if tag != "link" or rel in ("stylesheet", "icon", "manifest", "preload", "modulepreload"):
+                self.assets.append((tag, attrs[attr], line))
+        elif tag == "a" and attrs.get("href"):
+            self.links.append((attrs["href"], line))
+        if tag == "script" and not attrs.get("src"):
+            self._script = [line - 1, []]
+        if tag not in VOID_TAGS:
+            self.stack.append((tag, line))
+
+    def handle_startendtag(self, tag, attrs):
+        self.handle_starttag(tag, attrs)
+        if tag not in VOID_TAGS and self.stack and self.stack[-1][0] == tag:
+            self.stack.pop()
+
+    def handle_endtag(self, tag):
+        if tag in VOID_TAGS:
+            return
+        if tag == "script" and self._script is not None:
+            self.scripts.append((self._script[0], "".join(self._script[1])))
+            self._script = None
+        if not any(t == tag for t, _ in self.stack):
+            self.stray.append((tag, self.getpos()[0]))
+            return
+        while self.stack:
+            top, line = self.stack.pop()
+            if top == tag:
+                break
+            if top not in OPTIONAL_END_TAGS:
+                self.unclosed.append((top, line))
+
+    def handle_data(self, data):
+        if self._script is not None:
+            self._script[1].append(data)
+
+
+def _check_html(name, html, files, issues, defined):
+    scan = _HTMLCheck()
+    try:
+        scan.feed(html)
+        scan.close()
+    except Exception as e:
+        issues.append(_issue("html-parse", "error", name, f"HTML could not be parsed: {e}"))
+        return
+    unclosed = scan.unclosed + [(t, l) for t, l in scan.stack if t not in OPTIONAL_END_TAGS]
+    for tag, line in unclosed:
+        issues.append(_issue("html-unclosed-tag", "error", name, f"<{tag}> is never closed.", line))
+    for tag, line in scan.stray:
+        issues.append(_issue("html-stray-end-tag", "warning", name, f"</{tag}> has no matching <{tag}>.", line))
+    for element_id, line in scan.duplicate_ids:
+        issues.append(_issue("duplicate-id", "warning", name, f'id="{element_id}" is used more than once.', line))
+    for tag, ref, line in scan.assets:
+        path = _resolve(name, ref) if _is_local(ref) else None
+        if path and path not in files and path != DATA_LAYER_FILE:
+            issues.append(_issue("missing-asset", "error", name, f'<{tag}> loads "{ref}", which is not in the project.', line))
+    for ref, line in scan.links:
+        path = _resolve(name, ref) if _is_local(ref) else None
+        if path and path.endswith((".html", ".htm")) and path not in files:
+            issues.append(_issue("broken-link", "warning", name, f'Link to "{ref}" points to a page that does not exist.', line))
+    defined["ids"].update(scan.ids)
+    defined["classes"].update(scan.classes)
+    for offset, body in scan.scripts:
+        _check_js(name, body, issues, defined, offset)
+
+
+# -----------------------------------------------------
+# JavaScript
+# -----------------------------------------------------
+_ID_LOOKUP = re.compile(r"""getElementById\(\s*(["'])([\w-]+)\1\s*\)""")
+_SELECTOR_LOOKUP = re.compile(r"""querySelector(?:All)?\(\s*(["'])([^"']+)\1\s*\)""")
+_CLASS_LOOKUP = re.compile(r"""getElementsByClassName\(\s*(["'])([\w-]+)\1\s*\)""")
+# Ids/classes the JS itself creates, e.g. innerHTML templates, el.id = "x", classList.add("x")
+_JS_MARKUP_ID = re.compile(r"""\bid\s*=\s*\\?["'`]?([\w-]+)""")
+_JS_MARKUP_CLASS = re.compile(r"""\bclass(?:Name)?\s*=\s*\\?["'`]([^"'`$]+)""")
+_JS_CLASS_CALL = re.compile(r"""classList\.(?:add|toggle|replace)\(([^)]*)\)""")
+_JS_ID_SETTERS = re.compile(r"""setAttribute\(\s*["']id["']\s*,\s*["']([\w-]+)""")
+
+
+def _check_js(name, js, issues, defined, line_offset=0):
+    try:
+        tokens = list(tokenize(js))
+    except JSLexError as e:
+        issues.append(_issue("js-syntax", "error", name, str(e).rsplit(" (line", 1)[0] + ".", e.line + line_offset))
+        return
+    stack, line = [], 1 + line_offset
+    for kind, text in tokens:
+        if kind == "punct":
+            if text in BRACKETS:
+                stack.append((text, line))
+            elif text in CLOSERS:
+                if not stack or BRACKETS[stack[-1][0]] != text:
+                    issues.append(_issue("js-syntax", "error", name, f"Unexpected '{text}'.", line))
+                    return
+                stack.pop()
+        elif kind == "newline":
+            line += 1
+        elif kind in ("comment", "template", "string"):
+            line += text.count("\n")
+    if stack:
+        opener, opened = stack[-1]
+        issues.append(_issue("js-syntax", "error", name, f"'{opener}' is never closed.", opened))
+
+    starts = [0] + [m.end() for m in re.finditer("\n", js)]
+
+    def line_of(pos):
+        return line_offset + bisect.bisect_right(starts, pos)
+
+    defined["created_ids"].update(_JS_MARKUP_ID.findall(js))
+    defined["created_ids"].update(_JS_ID_SETTERS.findall(js))
+    for value in _JS_MARKUP_CLASS.findall(js):
+        defined["created_classes"].update(value.split())
+    for args in _JS_CLASS_CALL.findall(js):
+        defined["created_classes"].update(re.findall(r"""["']([\w-]+)["']""", args))
+    for m in _ID_LOOKUP.finditer(js):
+        defined["id_lookups"].append((name, m.group(2), line_of(m.start())))
+    for m in _CLASS_LOOKUP.finditer(js):
+        defined["class_lookups"].append((name, m.group(2), line_of(m.start())))
+    for m in _SELECTOR_LOOKUP.finditer(js):
+        # Only simple "#id" / ".class" selectors can be checked without a DOM
+        selector = m.group(2).strip()
+        where = (name, selector[1:], line_of(m.start()))
+        if re.fullmatch(r"#[\w-]+", selector):
+            defined["id_lookups"].append(where)
+        elif re.fullmatch(r"\.[\w-]+", selector):
+            defined["class_lookups"].append(where)
+
+
+# -----------------------------------------------------
+# Public API
+# -----------------------------------------------------
+def validate_project(files):
+    """
+    Validates a {filename: content} dict.
+    Returns {"ok": no errors, "issues": [...], "counts": {severity: n}, "score": 0-100, "ms": elapsed}.
+    """
+    started = time.perf_counter()
+    issues = []
+    defined = {"ids": {}, "classes": set(), "created_ids": set(), "created_classes": set(),
+               "id_lookups": [], "class_lookups": []}
+    css_text = ""
+    pages = [n for n in files if n.lower().endswith((".html", ".htm")) and isinstance(files[n], str)]
+    if not pages:
+        issues.append(_issue("no-html-entry", "error", "index.html", "The project has no HTML page."))
+
+    for name in sorted(files):
+        content = files[name]
+        if not isinstance(content, str) or name == DATA_LAYER_FILE:
+            continue
+        lower = name.lower()
+        if lower.endswith((".html", ".htm")):
+            _check_html(name, content, files, issues, defined)
+            css_text += "\n".join(re.findall(r"<style[^>]*>(.*?)</style>", content, re.S | re.I))
+        elif lower.endswith((".js", ".mjs")):
+            _check_js(name, content, issues, defined)
+        elif lower.endswith(".css"):
+            css_text += content
+
+    if pages:
+        for file, element_id, line in defined["id_lookups"]:
+            if element_id not in defined["ids"] and element_id not in defined["created_ids"]:
+                issues.append(_issue("missing-dom-id", "error", file,
+                                     f'JS looks up id "{element_id}", but no HTML element has it.', line))
+        css_classes = set(re.findall(r"\.(-?[_a-zA-Z][\w-]*)", css_text))
+        known = defined["classes"] | defined["created_classes"] | css_classes
+        for file, class_name, line in defined["class_lookups"]:
+            if class_name not in known:
+                issues.append(_issue("missing-class", "warning", file,
+                                     f'JS looks up class "{class_name}", which no HTML, CSS or JS defines.', line))
+
+    issues = _fold_repeats(issues)
+    counts = {sev: 0 for sev in SEVERITY_WEIGHTS}
+    for issue in issues:
+        counts[issue["severity"]] += 1
+    order = list(SEVERITY_WEIGHTS)
+    issues.sort(key=lambda i: (order.index(i["severity"]), i["file"], i["line"] or 0))
+    score = max(0, 100 - sum(SEVERITY_WEIGHTS[i["severity"]] for i in issues))
+    return {"ok": not counts["error"], "issues": issues, "counts": counts, "score": score,
+            "ms": round((time.perf_counter() - started) * 1000, 2)}
+
+
+def _fold_repeats(issues):
+    kept, seen = [], {}
+    for issue in issues:
+        key = (issue["rule"], issue["file"])
+        seen[key] = seen.get(key, 0) + 1
+        if seen[key] <= MAX_PER_RULE:
+            kept.append(issue)
+    for (rule, file), n in seen.items():
+        if n > MAX_PER_RULE:
+            last = [i for i in kept if i["rule"] == rule and i["file"] == file][-1]
+            last["message"] += f" (and {n - MAX_PER_RULE} more like this in {file})"
+    return kept
+
+
+def _excerpt(content, line):
+    lines = content.splitlines()
+    start = max(1, line - CONTEXT_LINES)
+    end = min(len(lines), line + CONTEXT_LINES)
+    return "\n".join(f"{n:>5} | {lines[n - 1]}" for n in range(start, end + 1))
+
+
+def fix_request(report, files, max_issues=10):
+    """
+    Turns validation errors into (request, files_to_send) for Developer.modify_code:
+    each error with a few lines of context, and only the files involved.
+    """
+    errors = [i for i in report["issues"] if i["severity"] == "error"][:max_issues]
+    if not errors:
+        return None, {}
+    parts, involved = [], set()
+    for issue in errors:
+        where = f"{issue['file']}:{issue['line']}" if issue["line"] else issue["file"]
+        parts.append(f"- [{issue['rule']}] {where}: {issue['message']}")
+        content = files.get(issue["file"])
+        if isinstance(content, str) and issue["line"]:
+            excerpt = _excerpt(content, issue["line"])
+            if excerpt.count("\n") < MAX_EXCERPT_LINES:
+                parts.append(excerpt)
+        if issue["file"] in files:
+            involved.add(issue["file"])
+        if issue["rule"] in ("missing-dom-id", "missing-asset"):
+            # The fix may belong on either side of the reference
+            involved.update(n for n in files if n.lower().endswith((".html", ".htm")))
+    request = (
+        "Repair pass: fix ONLY these errors found by a validator. Change as little as possible, keep all "
+        "features and the design unchanged, and return only the files you change.\n" + "\n".join(parts)
+    )
+    return request, {n: files[n] for n in sorted(involved)}
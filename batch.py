@@ -0,0 +1,270 @@
+# batch.py — Bulk site generation from a spreadsheet of prompts
+#
+#   python batch.py prompts.csv --out sites/ --concurrency 4 --format zip
+#
+# Input is CSV (a "prompt" column, optional "id"/"name") or JSONL (one object
+# per line with the same keys). Each finished item is appended to a checkpoint
+# in the output directory, so rerunning the same command resumes where an
+# interrupted run stopped; failed items are retried.
+
+import argparse
+import csv
+import hashlib
+import json
+import os
+import re
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+from ai.export import ARCHIVE_FORMATS, archive_filename, iter_archive
+from ai.tokens import rate_limit_wait, set_rate_limits, set_session, usage
+
+CHECKPOINT_FILE = "batch_checkpoint.jsonl"
+SUMMARY_FILE = "batch_summary.json"
+OUTPUT_FORMATS = ("dir",) + tuple(ARCHIVE_FORMATS)
+
+
+# -----------------------------------------------------
+# Input
+# -----------------------------------------------------
+def _slug(text):
+    return re.sub(r"[^A-Za-z0-9._-]+", "-", str(text)).strip(".-")[:80]
+
+
+def prompt_hash(prompt):
+    return hashlib.sha256(prompt.encode("utf-8")).hexdigest()[:16]
+
+
+def read_items(path):
+    """[{"id", "prompt"}] from a .csv or .jsonl file; ids default to the row number."""
+    if path.lower().endswith(".csv"):
+        with open(path, newline="", encoding="utf-8-sig") as f:
+            rows = list(csv.DictReader(f))
+    else:
+        rows = []
+        with open(path, encoding="utf-8") as f:
+            for n, line in enumerate(f, 1):
+                if line.strip():
+                    try:
+                        rows.append(json.loads(line))
+                    except ValueError as e:
+                        raise ValueError(f"{path}:{n}: invalid JSON ({e})") from e
+    items, seen = [], set()
+    for n, row in enumerate(rows, 1):
+        if isinstance(row, str):
+            row = {"prompt": row}
+        prompt = str(row.get("prompt") or "").strip()
+        if not prompt:
+            print(f"Skipping row {n}: no prompt")
+            continue
+        item_id = _slug(row.get("id") or row.get("name") or "") or f"site-{n:04d}"
+        if item_id in seen:
+            raise ValueError(f"Duplicate id '{item_id}' (row {n}); ids name the output and the checkpoint entry.")
+        seen.add(item_id)
+        items.append({"id": item_id, "prompt": prompt})
+    return items
+
+
+# -----------------------------------------------------
+# Checkpoint
+# -----------------------------------------------------
+class Checkpoint:
+    """Append-only JSONL record of finished items; the last entry per id wins."""
+
+    def __init__(self, path):
+        self.path = path
+        self.lock = threading.Lock()
+        self.entries = {}
+        if os.path.exists(path):
+            with open(path, encoding="utf-8") as f:
+                for line in f:
+                    try:
+                        entry = json.loads(line)
+                    except ValueError:
+                        continue   # a line cut short by a crash
+                    self.entries[entry["id"]] = entry
+
+    def is_done(self, item):
+        entry = self.entries.get(item["id"])
+        return bool(entry) and entry["status"] == "done" and entry.get("prompt_hash") == prompt_hash(item["prompt"])
+
+    def write(self, entry):
+        with self.lock:
+            self.entries[entry["id"]] = entry
+            with open(self.path, "a", encoding="utf-8") as f:
+                f.write(json.dumps(entry) + "\n")
+                f.flush()
+                os.fsync(f.fileno())
+
+
+# -----------------------------------------------------
+# Pipeline
+# -----------------------------------------------------
+def flatten_files(data, path=""):
+    """Same flattening the UI applies: nested folders become "dir/file" names, contents become text."""
+    files = {}
+    for key, value in (data or {}).items():
+        name = f"{path}/{key}" if path else str(key)
+        if isinstance(value, dict):
+            files.update(flatten_files(value, name))
+        elif isinstance(value, (bytes, bytearray)):
+            files[name] = value.decode("utf-8", "replace")
+        else:
+            files[name] = value if isinstance(value, str) else str(value)
+    return files
+
+
+def write_output(out_dir, item_id, files, fmt):
+    if fmt == "dir":
+        root = os.path.realpath(os.path.join(out_dir, item_id))
+        for name, content in files.items():
+            target = os.path.realpath(os.path.join(root, name))
+            if not target.startswith(root + os.sep):
+                raise RuntimeError(f"Refusing to write '{name}' outside the project directory.")
+            os.makedirs(os.path.dirname(target), exist_ok=True)
+            with open(target, "w", encoding="utf-8") as f:
+                f.write(content)
+        return root
+    path = os.path.join(out_dir, archive_filename(item_id, fmt))
+    tmp = path + ".tmp"
+    with open(tmp, "wb") as f:
+        for chunk in iter_archive(files, fmt):
+            f.write(chunk)
+    os.replace(tmp, path)
+    return path
+
+
+def generate(item, args, manager_factory=None):
+    """Runs the agent pipeline for one prompt and writes the project; returns the checkpoint entry."""
+    from agents.manager import ProjectManager
+    from agents.status import StatusReporter
+
+    session = f"batch-{item['id']}"
+    set_session(session, args.tenant)
+    started = time.time()
+    entry = {"id": item["id"], "prompt_hash": prompt_hash(item["prompt"])}
+    try:
+        manager = (manager_factory or ProjectManager)(reporter=StatusReporter())
+        result = manager.create_website(item["prompt"], variants=args.variants)
+        files = flatten_files((result or {}).get("files"))
+        if not files:
+            raise RuntimeError("the agents returned no files")
+        if args.repair:
+            from ai.validate import validate_project
+            report = validate_project(files)
+            updates = manager.repair_website(report, files) if not report["ok"] else None
+            if updates:
+                files.update(flatten_files(updates))
+            entry["validation_errors"] = validate_project(files)["counts"]["error"]
+        if args.optimize:
+            from ai.audit import audit_project
+            report = audit_project(files)
+            updates = manager.optimize_website(report, files)
+            if updates:
+                files.update(flatten_files(updates))
+        entry.update(status="done", output=write_output(args.out, item["id"], files, args.format),
+                     files=len(files), template=result.get("template"),
+                     plan_reused=bool(result.get("plan_reuse")))
+    except Exception as e:
+        entry.update(status="failed", error=f"{type(e).__name__}: {e}")
+    tokens = usage(session)
+    entry.update(seconds=round(time.time() - started, 2), prompt_tokens=tokens["prompt"],
+                 output_tokens=tokens["output"], model_calls=tokens["calls"])
+    return entry
+
+
+def _percentile(values, q):
+    if not values:
+        return 0.0
+    values = sorted(values)
+    return values[min(len(values) - 1, int(q * len(values)))]
+
+
+def summarize(entries, skipped, elapsed):
+    done = [e for e in entries if e["status"] == "done"]
+    failed = [e for e in entries if e["status"] == "failed"]
+    seconds = [e["seconds"] for e in done]
+    return {
+        "processed": len(entries),
+        "done": len(done),
+        "failed": len(failed),
+        "skipped": skipped,
+        "elapsed_seconds": round(elapsed, 1),
+        "sites_per_minute": round(len(done) / elapsed * 60, 2) if elapsed else 0.0,
+        "latency_p50": _percentile(seconds, 0.5),
+        "latency_p95": _percentile(seconds, 0.95),
+        "prompt_tokens": sum(e.get("prompt_tokens", 0) for e in entries),
+        "output_tokens": sum(e.get("output_tokens", 0) for e in entries),
+        "model_calls": sum(e.get("model_calls", 0) for e in entries),
+        "rate_limit_wait_seconds": round(rate_limit_wait(), 1),
+        "failures": {e["id"]: e["error"] for e in failed},
+    }
+
+
+def run(args, manager_factory=None):
+    os.makedirs(args.out, exist_ok=True)
+    items = read_items(args.input)
+    checkpoint = Checkpoint(os.path.join(args.out, CHECKPOINT_FILE))
+    todo = [item for item in items if not checkpoint.is_done(item)]
+    skipped = len(items) - len(todo)
+    if args.limit:
+        todo = todo[:args.limit]
+    set_rate_limits(args.rpm, args.tpm)
+    print(f"{len(items)} prompts · {skipped} already done · {len(todo)} to run · concurrency {args.concurrency}")
+
+    entries, started = [], time.time()
+    executor = ThreadPoolExecutor(max_workers=args.concurrency)
+    try:
+        futures = {executor.submit(generate, item, args, manager_factory): item for item in todo}
+        for future in as_completed(futures):
+            entry = future.result()
+            checkpoint.write(entry)
+            entries.append(entry)
+            mark = "✓" if entry["status"] == "done" else "✗"
+            detail = entry.get("output") if entry["status"] == "done" else entry["error"]
+            print(f"[{len(entries)}/{len(todo)}] {mark} {entry['id']} {entry['seconds']}s  {detail}")
+    except KeyboardInterrupt:
+        print("Interrupted; finished items are checkpointed. Rerun the same command to resume.")
+        executor.shutdown(wait=False, cancel_futures=True)
+    else:
+        executor.shutdown()
+
+    summary = summarize(entries, skipped, time.time() - started)
+    with open(os.path.join(args.out, SUMMARY_FILE), "w", encoding="utf-8") as f:
+        json.dump(summary, f, indent=2)
+    print(f"Done {summary['done']} · failed {summary['failed']} · skipped {summary['skipped']} in "
+          f"{summary['elapsed_seconds']}s ({summary['sites_per_minute']} sites/min, "
+          f"p50 {summary['latency_p50']}s, p95 {summary['latency_p95']}s) · "
+          f"tokens {summary['prompt_tokens']:,} in / {summary['output_tokens']:,} out "
+          f"over {summary['model_calls']} calls · rate-limit wait {summary['rate_limit_wait_seconds']}s")
+    return summary
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Generate NexaBuild sites in bulk from a CSV/JSONL file of prompts.")
+    parser.add_argument("input", help="CSV with a 'prompt' column, or JSONL with {\"prompt\": ...} per line")
+    parser.add_argument("--out", default="batch_output", help="Output directory (also holds the checkpoint)")
+    parser.add_argument("--format", choices=OUTPUT_FORMATS, default="dir", help="One directory or archive per site")
+    parser.add_argument("--concurrency", type=int, default=int(os.environ.get("NEXABUILD_BATCH_CONCURRENCY", "4")))
+    parser.add_argument("--rpm", type=int, default=int(os.environ.get("NEXABUILD_RATE_LIMIT_RPM", "0")),
+                        help="Max model requests per minute across all workers (0 = unlimited)")
+    parser.add_argument("--tpm", type=int, default=int(os.environ.get("NEXABUILD_RATE_LIMIT_TPM", "0")),
+                        help="Max prompt tokens per minute across all workers (0 = unlimited)")
+    parser.add_argument("--variants", type=int, default=1,
+                        help="Write up to 4 versions of each site concurrently and keep the best-scoring one")
+    parser.add_argument("--repair", action="store_true",
+                        help="Send validation errors (ai/validate.py) back to the Developer for one repair pass")
+    parser.add_argument("--optimize", action="store_true", help="Run the audit-driven optimization pass on each site")
+    parser.add_argument("--limit", type=int, default=0, help="Only run the first N pending prompts")
+    parser.add_argument("--tenant", default=None, help="Tenant charged for the tokens (daily quota)")
+    args = parser.parse_args(argv)
+    if args.concurrency < 1:
+        parser.error("--concurrency must be at least 1")
+    return args
+
+
+if __name__ == "__main__":
+    summary = run(parse_args())
+    sys.exit(1 if summary["failed"] else 0)
@@ -0,0 +1,56 @@
+# benchmarks/bench_deploy.py
+# Times the local deploy targets end to end (no network needed), full and
+# incremental (only index.html changed since the previous release).
+#   python benchmarks/bench_deploy.py [rounds] [asset_files]
+
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from ai.deploy import get_deploy_target
+
+
+def sample_project(i, assets=0):
+    files = {
+        "index.html": f"<!doctype html><html><head><link rel='stylesheet' href='styles.css'></head>"
+                      f"<body><h1>Build {i}</h1><script src='script.js'></script></body></html>",
+        "styles.css": "body { background: #0d1117; color: #c9d1d9; }\n" * 50,
+        "script.js": f"const BUILD = {i};\n" + "function noop() {}\n" * 200,
+    }
+    for n in range(assets):
+        files[f"assets/part{n}.js"] = f"export const PART = {n};\n" + "function noop() {}\n" * 200
+    return files
+
+
+def bench(kind, rounds, assets, incremental):
+    with tempfile.TemporaryDirectory() as root:
+        target = get_deploy_target(kind, root=root)
+        if not target.available():
+            print(f"{kind:8s} skipped (not available)")
+            return
+        files = sample_project(0, assets)
+        base = target.deploy("bench-site", files)["base"]
+        timings = []
+        for i in range(1, rounds + 1):
+            files = dict(files, **{"index.html": sample_project(i)["index.html"]})
+            start = time.perf_counter()
+            if incremental:
+                base = target.deploy("bench-site", files, changed={"index.html"}, base=base)["base"]
+            else:
+                target.deploy("bench-site", files)
+            timings.append((time.perf_counter() - start) * 1000)
+        timings.sort()
+        label = f"{kind} {'incr' if incremental else 'full'}"
+        print(f"{label:12s} files={len(files)} rounds={rounds} median={timings[len(timings) // 2]:.2f}ms "
+              f"p95={timings[int(len(timings) * 0.95) - 1]:.2f}ms max={timings[-1]:.2f}ms")
+
+
+if __name__ == "__main__":
+    rounds = int(sys.argv[1]) if len(sys.argv) > 1 else 20
+    assets = int(sys.argv[2]) if len(sys.argv) > 2 else 50
+    for kind in ("static", "git"):
+        for incremental in (False, True):
+            bench(kind, rounds, assets, incremental)
@@ -0,0 +1,44 @@
+# benchmarks/bench_export.py
+# Build time, cache-hit time and peak Python memory of the archive exporter.
+#   python benchmarks/bench_export.py [size_mb]
+
+import os
+import sys
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from ai import export
+
+
+def sample_project(size_mb):
+    line = "function handler(e) { console.log('event', e.type); }\n"
+    return {
+        "index.html": "<!doctype html><html><body><script src='script.js'></script></body></html>",
+        "styles.css": "body { margin: 0; }\n" * 1000,
+        "script.js": line * (size_mb * 1024 * 1024 // len(line)),
+    }
+
+
+def bench(fmt, files):
+    export._cache.clear()
+    tracemalloc.start()
+    start = time.perf_counter()
+    total = sum(len(chunk) for chunk in export.iter_archive(files, fmt))
+    build_ms = (time.perf_counter() - start) * 1000
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    start = time.perf_counter()
+    export.export_archive(files, fmt)
+    hit_ms = (time.perf_counter() - start) * 1000
+    print(f"{fmt:8s} size={total / 1024:.0f}KB build={build_ms:.1f}ms cached={hit_ms:.2f}ms "
+          f"peak_alloc={peak / 1024 / 1024:.1f}MB")
+
+
+if __name__ == "__main__":
+    size_mb = int(sys.argv[1]) if len(sys.argv) > 1 else 4
+    files = sample_project(size_mb)
+    for fmt in export.available_formats():
+        bench(fmt, files)
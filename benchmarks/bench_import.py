@@ -0,0 +1,69 @@
+# benchmarks/bench_import.py
+# Cold import cost of what main.py loads before the first paint, measured in
+# fresh interpreters with `python -X importtime`, and the one-off cost paid
+# later on the first model call.
+#   python benchmarks/bench_import.py [runs]
+
+import os
+import subprocess
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# The module-level imports of main.py (streamlit itself is loaded by the server before main runs)
+STARTUP = [
+    "ai.export", "ai.build", "ai.audit", "ai.preview",
+    "agents.plan_cache", "ai.memory", "ai.tokens",
+]
+# Loaded on first use
+DEFERRED = {
+    "agents": ["agents.manager", "ai.chatbot", "ai.utils", "ai.deploy"],
+    "first model call": ["google.generativeai"],
+}
+HEAVY = ("google.generativeai", "requests")
+
+
+def import_profile(modules, preload=("streamlit",)):
+    """(total_ms, {top-level package: cumulative_ms}, heavy modules loaded) for one cold run."""
+    code = ";".join([f"import {m}" for m in preload]
+                    + ["import sys", "sys.stderr.write('--start--\\n')"]
+                    + [f"import {m}" for m in modules]
+                    + [f"sys.stderr.write('heavy:' + ','.join(m for m in {HEAVY!r} if m in sys.modules) + '\\n')"])
+    proc = subprocess.run([sys.executable, "-X", "importtime", "-c", code], cwd=ROOT,
+                          capture_output=True, text=True)
+    if proc.returncode:
+        raise RuntimeError(proc.stderr[-2000:])
+    lines = proc.stderr.split("--start--\n", 1)[1].splitlines()
+    total, packages, heavy = 0, {}, []
+    for line in lines:
+        if line.startswith("heavy:"):
+            heavy = [m for m in line[6:].split(",") if m]
+            continue
+        if not line.startswith("import time:") or "|" not in line:
+            continue
+        _, cumulative, name = line[len("import time:"):].split("|")
+        if not cumulative.strip().isdigit():   # header line
+            continue
+        depth = len(name) - len(name.lstrip())
+        if depth == 1:   # top-level imports of this run only; nested ones are included in their cumulative time
+            us = int(cumulative)
+            total += us
+            top = name.strip().split(".")[0]
+            packages[top] = packages.get(top, 0) + us
+    return total / 1000, {k: v / 1000 for k, v in packages.items()}, heavy
+
+
+def best_of(runs, modules, preload=("streamlit",)):
+    results = [import_profile(modules, preload) for _ in range(runs)]
+    return min(results, key=lambda r: r[0])
+
+
+if __name__ == "__main__":
+    runs = int(sys.argv[1]) if len(sys.argv) > 1 else 5
+    total, packages, heavy = best_of(runs, STARTUP)
+    print(f"startup imports    {total:7.1f}ms  heavy loaded: {', '.join(heavy) or 'none'}")
+    for name, ms in sorted(packages.items(), key=lambda kv: -kv[1])[:8]:
+        print(f"  {name:22s} {ms:7.1f}ms")
+    for label, modules in DEFERRED.items():
+        total, _, heavy = best_of(runs, modules, ("streamlit",) + tuple(STARTUP))
+        print(f"{label:18s} {total:7.1f}ms  heavy loaded: {', '.join(heavy) or 'none'}")
@@ -0,0 +1,108 @@
+# benchmarks/bench_jsonrepair.py
+# Success rate and parse time of ai/jsonrepair.py against the two parsers it
+# replaced, on large model-style replies with the defects seen in practice.
+#   python benchmarks/bench_jsonrepair.py [size_kb]
+
+import json
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from ai.jsonrepair import JSONRepairError, parse_json
+
+
+# ------------------------------
+# Previous parsers, kept here as the baseline
+# ------------------------------
+def legacy_clean_json(text):
+    text = text.strip()
+    if text.startswith("```json"):
+        text = text.replace("```json", "").replace("```", "")
+    elif text.startswith("```"):
+        text = text.replace("```", "")
+    try:
+        return json.loads(text)
+    except ValueError:
+        start = text.find("{")
+        end = text.rfind("}") + 1
+        if start != -1 and end != -1:
+            try:
+                return json.loads(text[start:end])
+            except ValueError:
+                pass
+        return {}
+
+
+def legacy_force_json(text):
+    text = text.strip()
+    try:
+        return json.loads(text)
+    except ValueError:
+        pass
+    if "```" in text:
+        text = text.split("```")[1]
+        text = text.replace("json", "").strip()
+        try:
+            return json.loads(text)
+        except ValueError:
+            pass
+    start = text.find("{")
+    end = text.rfind("}")
+    if start != -1 and end != -1:
+        try:
+            return json.loads(text[start:end + 1])
+        except ValueError:
+            pass
+    raise ValueError("invalid JSON")
+
+
+# ------------------------------
+# Model-style replies
+# ------------------------------
+def sample_files(size_kb):
+    js_line = 'document.querySelector("#list").addEventListener("click", e => { if (/\\d+/.test(e.target.id)) save(e); });\n'
+    css_line = ".card { padding: 1rem; border-radius: 8px; }\n"
+    html_line = '<div class="card"><h2 class="title">Item</h2><p>Text</p></div>\n'
+    third = size_kb * 1024 // 3
+    return {
+        "index.html": html_line * (third // len(html_line)),
+        "styles.css": css_line * (third // len(css_line)),
+        "script.js": js_line * (third // len(js_line)),
+    }
+
+
+def variants(files):
+    clean = json.dumps(files)
+    # Raw newlines, inner quotes and regex backslashes left unescaped inside the code strings
+    raw = "{" + ",".join(f'"{k}": "{v}"' for k, v in files.items()) + "}"
+    return {
+        "clean": clean,
+        "fenced+prose": "Sure! Here is your website:\n```json\n" + json.dumps(files, indent=2) + "\n```\nLet me know!",
+        "trailing-comma": clean[:-1] + ",}",
+        "unescaped-code": "```json\n" + raw + "\n```",
+        "truncated": clean[: int(len(clean) * 0.9)],
+    }
+
+
+def bench(name, parser, text, repeat=3):
+    best, ok = None, False
+    for _ in range(repeat):
+        start = time.perf_counter()
+        try:
+            result = parser(text)
+            ok = bool(result[0] if isinstance(result, tuple) else result)
+        except (ValueError, JSONRepairError):
+            ok = False
+        elapsed = (time.perf_counter() - start) * 1000
+        best = elapsed if best is None else min(best, elapsed)
+    return f"{name}={'ok' if ok else 'FAIL'} {best:.1f}ms"
+
+
+if __name__ == "__main__":
+    size_kb = int(sys.argv[1]) if len(sys.argv) > 1 else 300
+    for label, text in variants(sample_files(size_kb)).items():
+        print(f"{label:15s} {len(text) / 1024:.0f}KB  "
+              + "  ".join(bench(n, p, text) for n, p in
+                          (("engine", parse_json), ("_clean_json", legacy_clean_json), ("force_json", legacy_force_json))))
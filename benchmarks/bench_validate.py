@@ -0,0 +1,39 @@
+# benchmarks/bench_validate.py
+# Time of the local validation pass (ai/validate.py) on generated-size projects.
+#   python benchmarks/bench_validate.py [size_kb]
+
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from ai.validate import validate_project
+
+
+def sample_project(size_kb):
+    html_line = '<div class="card" id="item-{n}"><h2 class="title">Item</h2><p>Text</p></div>\n'
+    js_line = 'document.getElementById("item-{n}").addEventListener("click", e => {{ if (/\\d+/.test(e.target.id)) save({{id: {n}}}); }});\n'
+    css_line = ".card {{ padding: 1rem; }} .title-{n} {{ font-weight: 700; }}\n"
+    third = size_kb * 1024 // 3
+    count = third // len(js_line)
+    body = "".join(html_line.format(n=n) for n in range(count))
+    return {
+        "index.html": '<!DOCTYPE html><html><head><link rel="stylesheet" href="styles.css"></head><body>\n'
+                      + body + '<script src="script.js" defer></script></body></html>',
+        "styles.css": "".join(css_line.format(n=n) for n in range(third // len(css_line))),
+        "script.js": "".join(js_line.format(n=n) for n in range(count)),
+    }
+
+
+if __name__ == "__main__":
+    size_kb = int(sys.argv[1]) if len(sys.argv) > 1 else 60
+    files = sample_project(size_kb)
+    best, report = None, None
+    for _ in range(5):
+        start = time.perf_counter()
+        report = validate_project(files)
+        elapsed = (time.perf_counter() - start) * 1000
+        best = elapsed if best is None else min(best, elapsed)
+    total = sum(len(v) for v in files.values()) / 1024
+    print(f"{total:.0f}KB project: {best:.1f}ms  errors={report['counts']['error']} warnings={report['counts']['warning']}")
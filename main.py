@@ -6,11 +6,21 @@ import base64
 import uuid
 import json
 
-# Import WebsiteGenerator to combine files for preview
-from ai.utils import create_zip_bytes, WebsiteGenerator
-from ai.deploy import GitHubDeployer
-from agents.manager import ProjectManager
-from ai.chatbot import NexaBot 
+# Agents (local or, with NEXABUILD_API_URL, the remote API client), NexaBot,
+# WebsiteGenerator and deploy targets are imported where they are
+# first used, and the Gemini SDK only on the first model call (ai/config.py),
+# so the home page paints without loading any of them.
+from ai.export import ARCHIVE_FORMATS, archive_filename, available_formats, export_archive, project_hash
+from ai.build import build_project
+from ai.audit import audit_project
+from ai.validate import validate_project
+from ai.preview import get_preview_server, list_pages
+from agents.plan_cache import get_plan_index
+from ai.memory import ConversationMemory, EditMemory
+from ai.tokens import set_session, usage as token_usage
+from ai.editor import WINDOW_LINES, ChangeTracker, apply_patch, make_patch
+from ai.faq import faq_metrics
+from ai.profiling import PROFILE_QUERY_ENABLED, finish_rerun, format_spans, resolve_mode, span, start_rerun, traced
 
 # -------------------------------------------------------
 # 0. Asset Helper & Config
@@ -40,13 +50,21 @@ if st.query_params.get("nav") == "home":
     st.session_state.page = "home"
     st.session_state.files = {}
     st.session_state.chat = []
+    st.session_state.edit_memory = EditMemory()
     st.session_state.project_meta = {}
     st.query_params.clear()
     st.rerun()
 
+# --- PROFILING (opt-in: NEXABUILD_PROFILE=1|cprofile; ?profile=1|cprofile|0 with NEXABUILD_PROFILE_QUERY=1) ---
+if "session_id" not in st.session_state: st.session_state.session_id = str(uuid.uuid4())[:8]
+if PROFILE_QUERY_ENABLED and "profile" in st.query_params:
+    st.session_state.profile_mode = resolve_mode(st.query_params.get("profile"))
+start_rerun(st.session_state.get("profile_mode", resolve_mode()), st.session_state.get("session_id"))
+
 # -------------------------------------------------------
 # 1. CSS & Styling
 # -------------------------------------------------------
+@traced()
 def load_custom_css():
     # Cleaned CSS: reduced duplication, removed borders for NexaBot popover/chat and adjusted NexaBot button colors.
     st.markdown("""
@@ -305,6 +323,7 @@ load_custom_css()
 # 2. Helper Functions
 # -------------------------------------------------------
 
+@traced()
 def sanitize_files(data):
     flat_files = {}
     def recurse(obj, path=""):
@@ -322,22 +341,100 @@ def sanitize_files(data):
     recurse(data)
     return flat_files
 
+@traced()
+def run_audit(files):
+    # Cached by content hash, so reruns only re-audit after generation or an edit
+    key = project_hash(files)
+    if st.session_state.get("audit_key") != key:
+        st.session_state.audit = audit_project(files)
+        st.session_state.audit_key = key
+    return st.session_state.audit
+
+@traced()
+def run_validation(files):
+    # Structural checks (ai/validate.py); milliseconds, cached the same way as the audit
+    key = project_hash(files)
+    if st.session_state.get("validation_key") != key:
+        st.session_state.validation = validate_project(files)
+        st.session_state.validation_key = key
+    return st.session_state.validation
+
+@traced()
+def render_validation():
+    report = run_validation(st.session_state.files)
+    if report["ok"]:
+        note = f", {report['counts']['warning']} warning(s)" if report["counts"]["warning"] else ""
+        st.caption(f"✅ Validation passed in {report['ms']:.0f} ms{note}")
+        return
+    with st.expander(f"🩺 Validation found {report['counts']['error']} error(s) — preview may be broken", expanded=True):
+        icons = {"error": "🔴", "warning": "🟠"}
+        for i in report["issues"]:
+            where = f"{i['file']}:{i['line']}" if i["line"] else i["file"]
+            st.markdown(f"{icons[i['severity']]} **{i['rule']}** `{where}` — {i['message']}")
+        if st.button(f"🩹 Auto-fix {report['counts']['error']} error(s)"):
+            from agents.remote import get_project_manager
+            mgr = get_project_manager()
+            with st.spinner("Repairing..."):
+                try:
+                    updates = mgr.repair_website(report, st.session_state.files, st.session_state.edit_memory)
+                    if updates:
+                        st.session_state.files.update(sanitize_files(updates))
+                        st.session_state.chat.append(("ai", f"Repair pass applied ({report['counts']['error']} errors)."))
+                        st.rerun()
+                    else:
+                        st.info("The team could not produce a fix; try describing the problem in the chat.")
+                except Exception as e:
+                    st.error(f"Error during repair: {e}")
+
+def sync_auto_optimize():
+    st.session_state.auto_optimize_pref = st.session_state.auto_optimize_toggle
+
+def guard_window_move(name):
+    # Unsaved edits live only in the window's text area, which Streamlit drops once it is not shown
+    first, key, chunk = st.session_state.editor_open.get(name, (0, None, None))
+    if key and st.session_state.get(key, chunk) != chunk:
+        st.session_state[f"window_{name}"] = first + 1
+        st.session_state.editor_blocked = name
+
+def auto_optimize(manager):
+    if not st.session_state.auto_optimize_pref or not st.session_state.files:
+        return
+    report = run_audit(st.session_state.files)
+    updates = manager.optimize_website(report, st.session_state.files, st.session_state.edit_memory)
+    if updates:
+        st.session_state.files.update(sanitize_files(updates))
+        st.session_state.chat.append(("ai", f"Performance pass applied ({len(report['findings'])} findings)."))
+
 # Session State
+CHAT_DISPLAY_LIMIT = 20
 if "files" not in st.session_state: st.session_state.files = {}
 if "page" not in st.session_state: st.session_state.page = "home"
 if "chat" not in st.session_state: st.session_state.chat = []
 if "project_meta" not in st.session_state: st.session_state.project_meta = {}
-if "session_id" not in st.session_state: st.session_state.session_id = str(uuid.uuid4())[:8]
+set_session(st.session_state.session_id)
 if "nexabot_history" not in st.session_state: st.session_state.nexabot_history = []
+if "nexabot_memory" not in st.session_state: st.session_state.nexabot_memory = ConversationMemory()
+if "edit_memory" not in st.session_state: st.session_state.edit_memory = EditMemory()
+# Plain key, not the checkbox's: Streamlit drops widget state while the Performance tab isn't rendered
+if "auto_optimize_pref" not in st.session_state: st.session_state.auto_optimize_pref = False
+# Change log of st.session_state.files; kept across home resets so deploy records stay valid
+if "changes" not in st.session_state: st.session_state.changes = ChangeTracker()
+if "deploys" not in st.session_state: st.session_state.deploys = {}
+if "editor_open" not in st.session_state: st.session_state.editor_open = {}   # file -> (first line, text area key, window text)
 
 # -------------------------------------------------------
 # 3. UI Components
 # -------------------------------------------------------
 
 # --- NEW: Bot Logic Separated ---
+@traced()
 def render_nexabot():
     with st.popover("🤖 NexaBot", use_container_width=True):
         st.caption("Hey Buddy! Do you need help? Ask NexaBot")
+        faq = faq_metrics()
+        if faq["questions"]:
+            st.caption(f"⚡ {faq['faq_hits']}/{faq['questions']} answered instantly ({faq['hit_ratio']:.0%}) · "
+                       f"{faq['faq_avg_ms']:.1f} ms vs {faq['model_avg_ms']:.0f} ms from the model")
         for msg in st.session_state.nexabot_history:
             st.chat_message(msg["role"]).write(msg["content"])
 
@@ -346,20 +443,24 @@ def render_nexabot():
             st.rerun()
 
         if st.session_state.nexabot_history and st.session_state.nexabot_history[-1]["role"] == "user":
-            with st.spinner("Thinking..."):
-                try:
-                    bot = NexaBot()
-                    history_context = []
-                    for m in st.session_state.nexabot_history[:-1]:
-                        role_api = "user" if m["role"] == "user" else "model"
-                        history_context.append({"role": role_api, "parts": m["content"]})
-
-                    response_text = bot.ask(st.session_state.nexabot_history[-1]["content"], history_context)
-                    st.session_state.nexabot_history.append({"role": "assistant", "content": response_text})
-                    st.rerun()
-                except Exception as e:
-                    st.error(f"AI Error: {e}")
+            question = st.session_state.nexabot_history[-1]["content"]
+            memory = st.session_state.nexabot_memory
+            try:
+                from ai.chatbot import NexaBot
+                bot = NexaBot()
+                # Rendered token by token; only the bounded memory is sent, not the full transcript
+                with st.chat_message("assistant"):
+                    response_text = st.write_stream(bot.ask_stream(question, memory))
+                if not isinstance(response_text, str):
+                    response_text = "".join(str(part) for part in response_text)
+                st.session_state.nexabot_history.append({"role": "assistant", "content": response_text})
+                memory.add("user", question)
+                memory.add("model", response_text)
+                st.rerun()
+            except Exception as e:
+                st.error(f"AI Error: {e}")
 
+@traced()
 def render_header():
     logo_html = "⚡ NexaBuild"
     if os.path.exists("images"):
@@ -388,6 +489,7 @@ def render_header():
     </div>
     """, unsafe_allow_html=True)
 
+@traced()
 def render_footer():
     st.markdown("""
     <div class="footer-container">
@@ -401,6 +503,7 @@ def render_footer():
 # -------------------------------------------------------
 # 4. Page: Home
 # -------------------------------------------------------
+@traced()
 def render_home():
     render_header()
     
@@ -429,19 +532,28 @@ def render_home():
         with st.form("create_form"):
             prompt = st.text_area("Describe your project" , height=150,
                                   placeholder="E.g., A Todo app where I can add, delete and save tasks permanently.")
+            variants = st.slider("Parallel variants", 1, 4, 1,
+                                 help="Write several versions at once and keep the best-scoring one. "
+                                      "Faster than retrying, but uses more tokens.")
             submitted = st.form_submit_button("🚀 Generate")
         
         if submitted and prompt:
-            manager = ProjectManager()
+            from agents.remote import get_project_manager
+            manager = get_project_manager()
             with st.spinner("Agents working..."):
                 try:
-                    result = manager.create_website(prompt)
+                    result = manager.create_website(prompt, variants=variants)
                     if result:
                         clean_files = sanitize_files(result.get("files", {}))
                         st.session_state.files = clean_files
-                        st.session_state.project_meta = {"plan": result.get("plan"), "design": result.get("design")}
+                        st.session_state.edit_memory = EditMemory()
+                        st.session_state.project_meta = {"plan": result.get("plan"), "design": result.get("design"),
+                                                         "plan_reuse": result.get("plan_reuse"),
+                                                         "template": result.get("template"),
+                                                         "variants": result.get("variants")}
                         st.session_state.chat.extend(
                             [("user", prompt), ("ai", "Project ready! JavaScript Logic Generated.")])
+                        auto_optimize(manager)
                         st.session_state.page = "workspace"
                         st.rerun()
                 except Exception as e:
@@ -459,24 +571,50 @@ def render_home():
 # -------------------------------------------------------
 # 5. Page: Workspace
 # -------------------------------------------------------
+@traced()
 def render_workspace():
     # Sanitize session state on load
     if st.session_state.files:
         st.session_state.files = sanitize_files(st.session_state.files)
+    changes = st.session_state.changes
+    changes.sync(st.session_state.files)
+    last_deploy = max(st.session_state.deploys.values(), key=lambda d: d["version"], default=None)
 
     render_header()
     st.subheader("🛠️ Developer Workspace")
     st.markdown("---")
 
-    with st.sidebar:
+    with st.sidebar, span("workspace.sidebar"):
         st.subheader("💬 Team Chat")
+        tokens = token_usage()
+        quota = f" of {tokens['quota']:,}" if tokens["quota"] else ""
+        st.caption(f"🔢 Tokens: {tokens['total']:,}{quota} used this session · "
+                   f"{tokens['saved']:,} saved by prompt compaction")
         if st.session_state.project_meta:
             with st.expander("Plan"): 
+                reuse = st.session_state.project_meta.get("plan_reuse")
+                stats = get_plan_index().metrics()
+                if reuse:
+                    # The index is shared across users, so the earlier prompt itself is never shown
+                    st.caption(f"♻️ Reused a stored plan ({reuse['similarity']:.0%} similar to an earlier request)")
+                if st.session_state.project_meta.get("template"):
+                    st.caption(f"🧩 Built on the `{st.session_state.project_meta['template']}` skeleton")
+                picked = st.session_state.project_meta.get("variants")
+                if picked:
+                    st.caption(f"🧪 Picked variant {picked['picked']} of {len(picked['variants']) + picked['cancelled']} "
+                               f"(score {picked['score']}/100, {picked['cancelled']} cancelled early)")
+                st.caption(f"Plan index: {stats['entries']} plans · hit rate {stats['hit_rate']:.0%} "
+                           f"({stats['hits']}/{stats['lookups']}) · threshold {stats['threshold']:.2f}")
                 try:
                     st.json(st.session_state.project_meta.get("plan"))
                 except Exception:
                     st.write(st.session_state.project_meta.get("plan"))
-        for r, m in st.session_state.chat:
+        # Older messages live on only as the edit memory's summary
+        hidden = len(st.session_state.chat) - CHAT_DISPLAY_LIMIT
+        if hidden > 0:
+            st.caption(f"{hidden} earlier message(s) hidden · "
+                       f"{st.session_state.edit_memory.stats()['summarized_turns']} older edit(s) summarized for the team")
+        for r, m in st.session_state.chat[-CHAT_DISPLAY_LIMIT:]:
             if r == "user":
                 st.info(f"You: {m}")
             else:
@@ -485,38 +623,55 @@ def render_workspace():
         chat_input_val = st.chat_input("Changes?") if hasattr(st, "chat_input") else st.text_input("Changes?")
         if chat_input_val:
             st.session_state.chat.append(("user", chat_input_val))
-            mgr = ProjectManager()
+            from agents.remote import get_project_manager
+            mgr = get_project_manager()
             with st.spinner("Coding..."):
                 try:
-                    u = mgr.edit_website(chat_input_val, st.session_state.files)
+                    u = mgr.edit_website(chat_input_val, st.session_state.files, st.session_state.edit_memory)
                     if u:
                         clean_updates = sanitize_files(u)
                         st.session_state.files.update(clean_updates)
                         st.session_state.chat.append(("ai", "Updated."))
+                        auto_optimize(mgr)
                         st.rerun()
                 except Exception as e:
                     st.error(f"Error during edit: {e}")
 
-    t1, t2, t3 = st.tabs(["👁️ Preview", "💻 Code", "🚀 Deploy"])
+    t1, t2, t3, t4 = st.tabs(["👁️ Preview", "💻 Code", "🚀 Deploy", "⚡ Performance"])
     
     # --- PREVIEW TAB ---
-    with t1:
+    with t1, span("workspace.preview"):
         if st.session_state.files:
-            try:
-                gen = WebsiteGenerator()
-                html_content = gen.combine_to_html(st.session_state.files)
-            except Exception as e:
-                st.error(f"Error generating preview: {e}")
-                html_content = None
+            render_validation()
+            pages = list_pages(st.session_state.files, st.session_state.project_meta.get("plan"))
+            page = st.selectbox("Page", pages) if len(pages) > 1 else (pages[0] if pages else "index.html")
+            server = get_preview_server()
+            if server:
+                # The iframe URL never changes, so Streamlit keeps the same iframe across reruns;
+                # publish() pushes CSS swaps / reloads to it over the server's event stream
+                # Republished only when the project changed since this session last published it
+                publish_key = (id(server), changes.version)
+                if st.session_state.get("preview_key") != publish_key or not server.touch(st.session_state.session_id):
+                    server.publish(st.session_state.session_id, st.session_state.files)
+                    st.session_state.preview_key = publish_key
+                st.components.v1.iframe(server.url(st.session_state.session_id, page), height=800, scrolling=True)
+            else:
+                try:
+                    from ai.utils import WebsiteGenerator
+                    gen = WebsiteGenerator()
+                    html_content = gen.combine_to_html(st.session_state.files, page)
+                except Exception as e:
+                    st.error(f"Error generating preview: {e}")
+                    html_content = None
 
-            if html_content:
-                # Keep iframe nicely padded and scrollable
-                st.components.v1.html(html_content, height=800, scrolling=True)
+                if html_content:
+                    # Keep iframe nicely padded and scrollable
+                    st.components.v1.html(html_content, height=800, scrolling=True)
         else:
             st.warning("No files generated yet.")
 
     # --- CODE TAB ---
-    with t2:
+    with t2, span("workspace.code"):
         col_list, col_editor = st.columns([1, 4])
 
         with col_list:
@@ -524,30 +679,63 @@ def render_workspace():
             file_keys = list(st.session_state.files.keys()) if st.session_state.files else []
             if file_keys:
                 selected_file = st.radio("Select File", file_keys, label_visibility="collapsed")
+                if last_deploy:
+                    dirty = sorted(changes.changed_since(last_deploy["version"]) & set(file_keys))
+                    st.caption("Changed since last deploy: " + (", ".join(dirty) if dirty else "nothing"))
             else:
                 selected_file = None
 
         with col_editor:
             if selected_file:
                 st.markdown(f"##### Editing: `{selected_file}`")
+                index = changes.line_index(selected_file, st.session_state.files[selected_file])
+                first = 0
+                if index.line_count > WINDOW_LINES:
+                    # Large files are edited a window at a time; only the window goes to the browser
+                    st.session_state.setdefault(f"window_{selected_file}", 1)   # seeded here: guard_window_move sets it
+                    first = st.number_input(f"First line (of {index.line_count:,})", min_value=1,
+                                            max_value=index.line_count, step=WINDOW_LINES,
+                                            key=f"window_{selected_file}",
+                                            on_change=guard_window_move, args=(selected_file,)) - 1
+                    if st.session_state.pop("editor_blocked", None) == selected_file:
+                        st.warning("Save your changes to these lines before moving to another part of the file.")
+                first, end, chunk = index.window(first)
+                if index.line_count > WINDOW_LINES:
+                    st.caption(f"Showing lines {first + 1:,}–{end:,}. Saving patches only the lines you changed.")
+                if last_deploy:
+                    lines = changes.changed_lines(selected_file, last_deploy["version"])
+                    if lines is None:
+                        st.caption("● Replaced since last deploy")
+                    elif lines:
+                        spans = ", ".join(f"{a + 1}" if a == b else f"{a + 1}–{b + 1}" for a, b in lines)
+                        st.caption(f"● Edited since last deploy: line{'s' if ',' in spans or '–' in spans else ''} {spans}")
+                # Keyed by the file's version, so chat edits and saves reload the window
+                editor_key = f"editor_{selected_file}_{first}_{changes.changed_at.get(selected_file, 0)}"
+                st.session_state.editor_open[selected_file] = (first, editor_key, chunk)
                 new_code = st.text_area(
                     "Code Editor",
-                    value=st.session_state.files[selected_file],
+                    value=chunk,
                     height=600,
                     label_visibility="collapsed",
-                    key=f"editor_{selected_file}"
+                    key=editor_key
                 )
 
-                if new_code != st.session_state.files[selected_file]:
+                if new_code != chunk:
                     if st.button(f"💾 Save Changes to {selected_file}"):
-                        st.session_state.files[selected_file] = new_code
-                        st.success("File Saved!")
-                        st.rerun()
+                        patch = make_patch(selected_file, index, first, end, new_code)
+                        try:
+                            if patch:
+                                changes.record(patch, apply_patch(st.session_state.files, patch))
+                        except RuntimeError as e:
+                            st.error(str(e))
+                        else:
+                            st.success("File Saved!")
+                            st.rerun()
             else:
                 st.info("Select a file to edit.")
     
     # --- DEPLOY TAB ---
-    with t3:
+    with t3, span("workspace.deploy"):
         st.markdown("### 📦 Export Project")
 
         # Download Box
@@ -558,40 +746,140 @@ def render_workspace():
         </div>
         """, unsafe_allow_html=True)
 
+        if st.session_state.files and not run_validation(st.session_state.files)["ok"]:
+            st.warning("Validation found errors in this project; see the Preview tab before deploying.")
+
+        # Optional production build; everything below (download + deploy) uses its output
+        release_files = dict(st.session_state.files)
+        with st.expander("⚙️ Production Build"):
+            optimize = st.checkbox("Minify HTML/CSS/JS and purge unused CSS", value=False)
+            compress = st.checkbox("Add precompressed .gz/.br siblings (for self-hosted targets)", value=False)
+            if st.session_state.files and (optimize or compress):
+                build_key = (project_hash(st.session_state.files), optimize, compress)
+                if st.session_state.get("build_key") != build_key:
+                    with span("build_project"):
+                        st.session_state.build_output = build_project(
+                            st.session_state.files, minify=optimize, purge_unused_css=optimize, compress=compress)
+                    st.session_state.build_key = build_key
+                release_files, report = st.session_state.build_output
+                saved = report["before"] - report["after"]
+                st.caption(f"{report['before']:,} → {report['after']:,} bytes "
+                           f"({saved / max(report['before'], 1):.0%} smaller)")
+                st.table([{k: (f"{v:,}" if isinstance(v, int) else v) for k, v in row.items()} for row in report["files"]])
+
         if st.session_state.files:
-            zip_bytes = create_zip_bytes(st.session_state.files)
+            archive_fmt = st.selectbox("Archive Format", available_formats(), index=0)
+            export_files = release_files
             st.download_button(
-                label="⬇️ Download ZIP Package",
-                data=zip_bytes,
-                file_name="my-website-project.zip",
-                mime="application/zip",
+                label=f"⬇️ Download {archive_fmt.upper()} Package",
+                # Built only when clicked (after this rerun's profile has closed), and cached by content
+                # hash. Streamlit holds the whole archive in memory; only batch.py streams archives to disk
+                data=lambda: export_archive(export_files, archive_fmt),
+                file_name=archive_filename("my-website-project", archive_fmt),
+                mime=ARCHIVE_FORMATS[archive_fmt]["mime"],
                 type="primary"
             )
 
         st.markdown("---")
-        st.markdown("### 🐙 GitHub Pages Deploy")
+        st.markdown("### 🌍 Deploy")
+
+        target_labels = {"github": "🐙 GitHub Pages", "git": "📚 Local Git (bare repo)", "static": "🗂️ Static Directory"}
+        target_kind = st.radio("Deploy Target", list(target_labels), format_func=target_labels.get, horizontal=True)
 
         col_d1, col_d2 = st.columns(2)
         with col_d1:
-            repo_name = st.text_input("Repository Name", "my-ai-site")
+            repo_name = st.text_input("Repository Name" if target_kind == "github" else "Site Name", "my-ai-site")
         with col_d2:
-            gh_token = st.text_input("GitHub Token", type="password")
+            gh_token = st.text_input("GitHub Token", type="password") if target_kind == "github" else None
 
-        if st.button("🚀 Deploy to GitHub"):
-            if not gh_token:
+        if st.button(f"🚀 Deploy to {target_labels[target_kind].split(' ', 1)[1]}"):
+            if target_kind == "github" and not gh_token:
                 st.error("GitHub Token is required.")
             else:
                 with st.spinner("Deploying..."):
                     try:
-                        deployer = GitHubDeployer(gh_token)
-                        res = deployer.deploy_to_github_pages(repo_name, st.session_state.files)
+                        options = {"token": gh_token} if target_kind == "github" else {}
+                        from ai.deploy import get_deploy_target
+                        deployer = get_deploy_target(target_kind, **options)
+                        # Redeploying the same site only writes what changed since the last deploy;
+                        # minify/purge output depends on every file, so optimized builds go out whole
+                        deploy_key = (target_kind, repo_name, optimize, compress)
+                        last = st.session_state.deploys.get(deploy_key)
+                        changed = changes.changed_since(last["version"]) if last and not optimize else None
+                        if changed == set():
+                            res = {"url": last["url"], "base": last["base"], "written": 0}
+                        else:
+                            res = deployer.deploy(repo_name, release_files, changed=changed,
+                                                  base=last["base"] if changed is not None else None)
+                        st.session_state.deploys[deploy_key] = {"version": changes.version, "url": res["url"],
+                                                                "base": res.get("base")}
                         st.success(f"Live at: {res['url']}")
-                        st.markdown(f"[Open Website]({res['url']})")
+                        if "written" in res:
+                            st.caption(f"{res['written']} of {len(release_files)} file(s) written")
+                        if res["url"].startswith("http"):
+                            st.markdown(f"[Open Website]({res['url']})")
                     except Exception as e:
                         st.error(f"Deploy failed: {e}")
+
+    # --- PERFORMANCE TAB ---
+    with t4, span("workspace.performance"):
+        st.markdown("### ⚡ Performance Audit")
+        st.checkbox("Auto-optimize after generation and every edit", value=st.session_state.auto_optimize_pref,
+                    key="auto_optimize_toggle", on_change=sync_auto_optimize)
+        if st.session_state.files:
+            report = run_audit(st.session_state.files)
+            c_score, c_err, c_warn, c_info = st.columns(4)
+            c_score.metric("Score", f"{report['score']}/100")
+            c_err.metric("Errors", report["counts"]["error"])
+            c_warn.metric("Warnings", report["counts"]["warning"])
+            c_info.metric("Info", report["counts"]["info"])
+
+            icons = {"error": "🔴", "warning": "🟠", "info": "🔵"}
+            for f in report["findings"]:
+                where = f"{f['file']}:{f['line']}" if f["line"] else f["file"]
+                st.markdown(f"{icons[f['severity']]} **{f['rule']}** `{where}` — {f['message']}")
+            if not report["findings"]:
+                st.success("No performance issues found.")
+            elif st.button("✨ Run Optimization Pass"):
+                from agents.remote import get_project_manager
+                mgr = get_project_manager()
+                with st.spinner("Optimizing..."):
+                    try:
+                        updates = mgr.optimize_website(report, st.session_state.files, st.session_state.edit_memory)
+                        if updates:
+                            st.session_state.files.update(sanitize_files(updates))
+                            st.session_state.chat.append(("ai", "Performance pass applied."))
+                            st.rerun()
+                        else:
+                            st.info("Nothing actionable to fix.")
+                    except Exception as e:
+                        st.error(f"Error during optimization: {e}")
+        else:
+            st.warning("No files generated yet.")
     render_footer()
 
-if st.session_state.page == "home":
-    render_home()
-else:
-    render_workspace()
+def render_debug_panel(report):
+    # Only shown in profiling mode; the same report is appended to the trace log
+    with st.expander(f"🐞 Rerun profile · {report['total_ms']:.0f} ms total · {report['cpu_ms']:.0f} ms CPU"):
+        st.caption(f"Rerun {report['rerun']} · spans below · also in the trace log")
+        if any(s.get("ms") is not None and s.get("peak_kb") is None for s in report["spans"]):
+            st.caption("Peak KB is left out where another session was profiled at the same time.")
+        st.dataframe(format_spans(report), hide_index=True)
+        if report.get("cprofile"):
+            st.markdown("###### cProfile (top functions by cumulative time)")
+            st.dataframe(report["cprofile"], hide_index=True)
+        faq = faq_metrics()
+        if faq["questions"]:
+            st.caption(f"NexaBot: {faq['faq_hits']}/{faq['questions']} answered from the FAQ "
+                       f"({faq['hit_ratio']:.0%}) · FAQ {faq['faq_avg_ms']:.1f} ms avg · model {faq['model_avg_ms']:.0f} ms avg")
+
+try:
+    if st.session_state.page == "home":
+        render_home()
+    else:
+        render_workspace()
+finally:
+    # Also closes the profile when st.rerun() cuts the run short
+    profile_report = finish_rerun()
+if profile_report:
+    render_debug_panel(profile_report)
@@ -0,0 +1,175 @@
+# server.py — Headless NexaBuild API (Flask)
+#
+#   python server.py                 API + NEXABUILD_WORKERS in-process workers
+#   python server.py --workers 0     API only (workers run elsewhere)
+#   python server.py --worker-only   workers only
+#
+# With NEXABUILD_QUEUE_DIR set, every process shares that directory as the job
+# queue, so API replicas and worker processes scale independently. Without it
+# jobs live in memory and API and workers must share one process.
+
+import argparse
+import hashlib
+import hmac
+import json
+import os
+import time
+
+from flask import Flask, Response, g, jsonify, request
+from flask_cors import CORS
+
+from agents.jobs import JOB_KINDS, TERMINAL, get_queue, public_view, start_workers
+from ai.tokens import DEFAULT_TENANT
+
+WORKERS = int(os.environ.get("NEXABUILD_WORKERS", "2"))
+# Bearer token required on every request when set
+API_TOKEN = os.environ.get("NEXABUILD_API_TOKEN", "")
+# More tokens, each bound to a tenant: "token1=tenant-a,token2=tenant-b"
+API_TOKENS = dict(pair.strip().split("=", 1) for pair in os.environ.get("NEXABUILD_API_TOKENS", "").split(",") if "=" in pair)
+if API_TOKEN:
+    API_TOKENS.setdefault(API_TOKEN, DEFAULT_TENANT)
+# Without tokens every request is refused unless the operator opts into an open API
+OPEN_API = os.environ.get("NEXABUILD_API_OPEN", "").lower() in ("1", "true", "yes")
+# Browser origins allowed to call the API, comma separated; none by default
+CORS_ORIGINS = [o.strip() for o in os.environ.get("NEXABUILD_API_CORS_ORIGINS", "").split(",") if o.strip()]
+MAX_REQUEST_BYTES = int(os.environ.get("NEXABUILD_API_MAX_BYTES", str(20 * 1024 * 1024)))
+STREAM_KEEPALIVE = 15   # seconds between SSE comments while nothing happens
+
+app = Flask(__name__)
+app.config["MAX_CONTENT_LENGTH"] = MAX_REQUEST_BYTES
+if CORS_ORIGINS:
+    CORS(app, origins=CORS_ORIGINS)
+
+
+def _identity(header):
+    """
+    (session, tenant) for an Authorization header, or None if it isn't accepted.
+    Quotas are charged to this identity, never to anything the client sends.
+    """
+    if not API_TOKENS:
+        # Open API (opt-in): every caller shares one session, quota and job list
+        return ("api", DEFAULT_TENANT) if OPEN_API else None
+    token = header[7:] if header.startswith("Bearer ") else ""
+    for known, tenant in API_TOKENS.items():
+        if hmac.compare_digest(token.encode(), known.encode()):
+            return "api-" + hashlib.sha256(known.encode()).hexdigest()[:12], tenant
+    return None
+
+
+@app.before_request
+def check_token():
+    if request.endpoint == "health":
+        return None
+    identity = _identity(request.headers.get("Authorization", ""))
+    if identity is None:
+        return jsonify({"error": "Unauthorized"}), 401
+    g.session, g.tenant = identity
+
+
+def _job_or_404(job_id):
+    job = get_queue().get(job_id)
+    # Jobs are only visible to the token that submitted them
+    if job is None or job["session"] != g.session:
+        return None, (jsonify({"error": f"No job '{job_id}'"}), 404)
+    return job, None
+
+
+@app.get("/api/health")
+def health():
+    return jsonify({"ok": True, "kinds": list(JOB_KINDS)})
+
+
+@app.post("/api/jobs")
+def submit():
+    """Body: {"kind": "create"|"edit"|"optimize"|"repair", "prompt", "variants", "files", "report", "edit_history"}"""
+    body = request.get_json(silent=True)
+    if not isinstance(body, dict):
+        return jsonify({"error": "Expected a JSON object."}), 400
+    kind = body.get("kind", "create")
+    params = {k: body[k] for k in ("prompt", "files", "report", "edit_history", "variants") if k in body}
+    try:
+        job_id = get_queue().submit(kind, params, g.session, g.tenant)
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    return jsonify({"id": job_id, "status": "queued"}), 202, {"Location": f"/api/jobs/{job_id}"}
+
+
+@app.get("/api/jobs/<job_id>")
+def status(job_id):
+    job, error = _job_or_404(job_id)
+    return error or jsonify(public_view(job))
+
+
+@app.get("/api/jobs/<job_id>/result")
+def result(job_id):
+    job, error = _job_or_404(job_id)
+    if error:
+        return error
+    if job["status"] == "failed":
+        return jsonify(public_view(job)), 500
+    if job["status"] != "done":
+        return jsonify(public_view(job)), 409
+    return jsonify(public_view(job, with_result=True))
+
+
+@app.get("/api/jobs/<job_id>/stream")
+def stream(job_id):
+    """Server-sent events: one `status`/`error` event per progress update, then `end` with the job status."""
+    job, error = _job_or_404(job_id)
+    if error:
+        return error
+    try:
+        seen = max(0, int(request.args.get("since", 0)))
+    except ValueError:
+        return jsonify({"error": "'since' must be an integer."}), 400
+
+    def events():
+        nonlocal seen
+        queue = get_queue()
+        current = job
+        while True:
+            if len(current["events"]) < seen:
+                seen = 0   # the job was requeued after its worker died; replay the retry's events
+            for event in current["events"][seen:]:
+                yield f"event: {event.get('type', 'status')}\ndata: {json.dumps(event)}\n\n"
+            seen = len(current["events"])
+            if current["status"] in TERMINAL:
+                yield f"event: end\ndata: {json.dumps(public_view(current))}\n\n"
+                return
+            current = queue.wait(job_id, seen, STREAM_KEEPALIVE)
+            if current is None:
+                yield f"event: end\ndata: {json.dumps({'id': job_id, 'status': 'expired'})}\n\n"
+                return
+            if len(current["events"]) == seen and current["status"] not in TERMINAL:
+                yield ": keepalive\n\n"
+
+    return Response(events(), mimetype="text/event-stream",
+                    headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"})
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Headless NexaBuild API")
+    parser.add_argument("--host", default=os.environ.get("NEXABUILD_API_HOST", "127.0.0.1"))
+    parser.add_argument("--port", type=int, default=int(os.environ.get("NEXABUILD_API_PORT", "8600")))
+    parser.add_argument("--workers", type=int, default=WORKERS)
+    parser.add_argument("--worker-only", action="store_true")
+    args = parser.parse_args()
+
+    if args.worker_only and not os.environ.get("NEXABUILD_QUEUE_DIR"):
+        raise SystemExit("--worker-only needs a shared NEXABUILD_QUEUE_DIR")
+    if not args.worker_only and not API_TOKENS and not OPEN_API:
+        print("NexaBuild: no NEXABUILD_API_TOKEN(S) set; every API request will be refused "
+              "(set NEXABUILD_API_OPEN=1 to serve without authentication)")
+    queue = get_queue()
+    workers = start_workers(queue, args.workers)
+    print(f"NexaBuild: {len(workers)} worker(s) on {type(queue).__name__}")
+    if args.worker_only:
+        if not workers:
+            raise SystemExit("--worker-only needs at least one worker")
+        try:
+            while True:
+                time.sleep(3600)
+        except KeyboardInterrupt:
+            pass
+    else:
+        app.run(host=args.host, port=args.port, threaded=True)
@@ -0,0 +1,31 @@
+import pytest
+
+from ai.jsonrepair import JSONRepairError, parse_json
+
+
+def test_top_level_array_is_not_cut_to_its_first_object():
+    value, diagnostics = parse_json('[{"a": 1}, {"b": 2}]')
+    assert value == [{"a": 1}, {"b": 2}]
+    assert diagnostics["fast_path"] and diagnostics["start"] == 0
+    assert not diagnostics["trailing_text"]
+
+
+def test_fenced_array_after_prose():
+    value, _ = parse_json('Here you go:\n```json\n[{"name": "index.html"}, {"name": "app.js"}]\n```')
+    assert value == [{"name": "index.html"}, {"name": "app.js"}]
+
+
+def test_object_containing_arrays():
+    value, diagnostics = parse_json('{"pages": [{"filename": "index.html"}], "features": []}')
+    assert value == {"pages": [{"filename": "index.html"}], "features": []}
+    assert diagnostics["start"] == 0
+
+
+def test_bracket_in_leading_prose_does_not_hide_the_object():
+    value, _ = parse_json('Sure [note]: {"a": 1}')
+    assert value == {"a": 1}
+
+
+def test_truncated_output_is_rejected():
+    with pytest.raises(JSONRepairError):
+        parse_json('{"index.html": "<html>')
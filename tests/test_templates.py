@@ -0,0 +1,37 @@
+import pytest
+
+from agents.templates import match_archetype
+
+# Real prompts as users type them; the plan's generated features are deliberately noisy
+PROMPTS = [
+    ("A Todo app where I can add, delete and save tasks permanently.", "todo"),
+    ("todo list", "todo"),
+    ("A checklist for my weekly chores", "todo"),
+    ("Shopping list that remembers what I bought", "todo"),
+    ("Build a personal finance tracker", "tracker"),
+    ("Expense tracker with categories", "tracker"),
+    ("A habit tracker with streaks", "tracker"),
+    ("Log my workouts and see progress", "tracker"),
+    ("Monthly budget planner for a family", "tracker"),
+    ("Sales analytics dashboard", "dashboard"),
+    ("An admin dashboard for my shop", "dashboard"),
+    ("Inventory management for a small warehouse", "dashboard"),
+    ("My portfolio website as a photographer", "portfolio"),
+    ("Online resume for a software engineer", "portfolio"),
+    ("A recipe app with a dashboard of favourites", None),
+    ("A quiz app that tracks your score", None),
+    ("Snake game that logs high scores", None),
+    ("Landing page for a coffee shop", None),
+    ("Weather app", None),
+]
+
+
+@pytest.mark.parametrize("prompt, expected", PROMPTS)
+def test_match_archetype_on_real_prompts(prompt, expected):
+    plan = {"project_name": "My App", "features": ["Dashboard", "Track progress", "Task list"]}
+    assert match_archetype(plan, prompt)[0] == expected
+
+
+def test_generated_features_do_not_pick_a_skeleton():
+    plan = {"project_name": "Recipe Box", "features": ["Dashboard with stats", "Track favourites", "Log meals"]}
+    assert match_archetype(plan, "A recipe collection")[0] is None